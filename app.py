@@ -1,18 +1,49 @@
-from flask import Flask, request, jsonify
+from flask import (Blueprint, Flask, Response, current_app, has_app_context, request, jsonify, render_template,
+                   stream_with_context)
 from flask_cors import CORS
 from flask_sqlalchemy import SQLAlchemy
-from flask_migrate import Migrate
-from datetime import datetime
-
-app = Flask(__name__)
-CORS(app)
-
-# SQLAlchemy Configuration
-app.config['SQLALCHEMY_DATABASE_URI'] = 'mysql://root:@localhost/projects'
-app.config['SQLALCHEMY_TRACK_MODIFICATIONS'] = False
-
-db = SQLAlchemy(app)
-migrate = Migrate(app, db)
+from flask_migrate import Migrate, upgrade
+from sqlalchemy import event, inspect
+from sqlalchemy.dialects.mysql import match as mysql_match
+from sqlalchemy.exc import IntegrityError
+from sqlalchemy.orm.exc import StaleDataError
+from datetime import datetime, date, timedelta
+from decimal import Decimal
+from cache import make_cache
+from config import Config
+from db_pool import engine_options, is_memory_sqlite, is_sqlite, pool_status
+from events import make_event_bus
+import instrumentation
+from search import SearchIndex, tokenize
+from serializers import ModelSerializer, dumps_bytes
+from validation import Schema, integer, iso_date, money, parse_date, text, to_money
+from concurrent.futures import ThreadPoolExecutor
+import base64
+import click
+import functools
+import contextvars
+import csv
+import hashlib
+import io
+import json
+import operator
+import os
+
+db = SQLAlchemy()
+migrate = Migrate()
+
+MIGRATIONS_DIRECTORY = os.path.join(os.path.dirname(os.path.abspath(__file__)), 'migrations')
+
+# All routes and CLI commands live on this blueprint; create_app() registers it
+api = Blueprint('api', __name__, cli_group=None)
+
+# Where the database has partial indexes (SQLite, PostgreSQL) the indexes of
+# soft-deleted tables only cover live rows, and reads filter on the same
+# "deleted_at IS NULL" predicate so they can use them. The deleted_at index
+# itself only covers deleted rows, which keeps planners from picking it for
+# the live-row filter. MySQL gets plain indexes.
+def partial_index(name, *columns, where):
+    return db.Index(name, *columns, sqlite_where=where, postgresql_where=where)
 
 # Models
 class Client(db.Model):
@@ -23,6 +54,17 @@ class Client(db.Model):
     contact = db.Column(db.String(15), nullable=False)
     address = db.Column(db.String(255), nullable=True)
     company = db.Column(db.String(100), nullable=True)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=db.func.current_timestamp())
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        partial_index('ix_clients_name', 'name', where=deleted_at.is_(None)),
+        partial_index('ix_clients_company', 'company', where=deleted_at.is_(None)),
+        partial_index('ix_clients_deleted_at', 'deleted_at', where=deleted_at.isnot(None)),
+    )
+    __mapper_args__ = {'version_id_col': version}
 
 class TeamMember(db.Model):
     __tablename__ = 'team_members'
@@ -31,6 +73,13 @@ class TeamMember(db.Model):
     job_role = db.Column(db.String(100), nullable=False)
     email = db.Column(db.String(100), nullable=False)
     contact = db.Column(db.String(15), nullable=False)
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.Index('ix_team_members_name', 'name'),
+        db.Index('ix_team_members_job_role', 'job_role'),
+    )
 
 class Project(db.Model):
     __tablename__ = 'projects'
@@ -41,7 +90,19 @@ class Project(db.Model):
     start_date = db.Column(db.Date, nullable=True)
     end_date = db.Column(db.Date, nullable=True)
     status = db.Column(db.String(50), nullable=False, default='Ongoing')
-  
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=db.func.current_timestamp())
+    deleted_at = db.Column(db.DateTime, nullable=True)
+
+    __table_args__ = (
+        partial_index('ix_projects_name', 'name', where=deleted_at.is_(None)),
+        partial_index('ix_projects_client_id_name', 'client_id', 'name', where=deleted_at.is_(None)),
+        partial_index('ix_projects_status', 'status', where=deleted_at.is_(None)),
+        partial_index('ix_projects_start_date', 'start_date', where=deleted_at.is_(None)),
+        partial_index('ix_projects_deleted_at', 'deleted_at', where=deleted_at.isnot(None)),
+    )
+    __mapper_args__ = {'version_id_col': version}
 
     client = db.relationship('Client', backref='projects')
 
@@ -50,9 +111,19 @@ class Payment(db.Model):
     id = db.Column(db.Integer, primary_key=True)
     client_id = db.Column(db.Integer, db.ForeignKey('clients.id'), nullable=False)
     project_id = db.Column(db.Integer, db.ForeignKey('projects.id'), nullable=False)
-    total_amount = db.Column(db.Float, nullable=False)
-    paid_amount = db.Column(db.Float, nullable=False, default=0)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False)
+    paid_amount = db.Column(db.Numeric(12, 2), nullable=False, default=0)
     payment_date = db.Column(db.Date, nullable=False, default=datetime.utcnow)
+    version = db.Column(db.Integer, nullable=False, default=1, server_default='1')
+    updated_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow, onupdate=datetime.utcnow,
+                           server_default=db.func.current_timestamp())
+
+    __table_args__ = (
+        db.Index('ix_payments_payment_date_id', 'payment_date', 'id'),
+        db.Index('ix_payments_client_id_payment_date', 'client_id', 'payment_date', 'id'),
+        db.Index('ix_payments_project_id', 'project_id'),
+    )
+    __mapper_args__ = {'version_id_col': version}
 
     client = db.relationship('Client', backref='payments')
     project = db.relationship('Project', backref='payments')
@@ -61,7 +132,8 @@ project_team_members = db.Table(
     'project_team_members',
     db.Column('project_id', db.Integer, db.ForeignKey('projects.id'), primary_key=True),
     db.Column('team_member_id', db.Integer, db.ForeignKey('team_members.id'), primary_key=True),
-    db.Column('role', db.String(50), nullable=True, default='Member')
+    db.Column('role', db.String(50), nullable=True, default='Member'),
+    db.Index('ix_project_team_members_allocation', 'team_member_id', 'project_id', 'role')
 )
 
 Project.team_members = db.relationship(
@@ -76,34 +148,929 @@ TeamMember.projects = db.relationship(
     back_populates='team_members'
 )
 
-# Create all tables
-with app.app_context():
-    db.create_all()
+# Running totals shown on the dashboard. A single row, kept up to date by the
+# write handlers in the same transaction as the change itself.
+class DashboardTotals(db.Model):
+    __tablename__ = 'dashboard_totals'
+    id = db.Column(db.Integer, primary_key=True)
+    total_clients = db.Column(db.Integer, nullable=False, default=0)
+    total_team_members = db.Column(db.Integer, nullable=False, default=0)
+    total_projects = db.Column(db.Integer, nullable=False, default=0)
+    total_payments = db.Column(db.Integer, nullable=False, default=0)
+    total_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    pending_amount = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+DASHBOARD_TOTALS_ID = 1
+
+# Responses of POST requests sent with an Idempotency-Key header. The key is
+# claimed in the same transaction as the write it guards, so a retried
+# request either replays the stored response or waits for the first attempt.
+class IdempotencyKey(db.Model):
+    __tablename__ = 'idempotency_keys'
+    key = db.Column(db.String(255), primary_key=True)
+    fingerprint = db.Column(db.String(64), nullable=False)
+    status_code = db.Column(db.Integer, nullable=True)
+    content_type = db.Column(db.String(100), nullable=True)
+    response_body = db.Column(db.Text, nullable=True)
+    response_headers = db.Column(db.Text, nullable=True)
+    created_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_idempotency_keys_created_at', 'created_at'),
+    )
+
+# Outbox of committed changes for GET /api/changes. Write handlers add one
+# row per record they create, update or delete, in the same transaction. A
+# delete leaves a tombstone whose payload keeps the references of the row.
+class ChangeLog(db.Model):
+    __tablename__ = 'change_log'
+    id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), primary_key=True)
+    entity = db.Column(db.String(20), nullable=False)
+    entity_id = db.Column(db.Integer, nullable=False)
+    op = db.Column(db.String(10), nullable=False)
+    payload = db.Column(db.Text, nullable=True)
+    changed_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+    __table_args__ = (
+        db.Index('ix_change_log_changed_at', 'changed_at'),
+    )
+
+CHANGE_UPSERT = 'upsert'
+CHANGE_DELETE = 'delete'
+
+# Receivables aging per client and project: the pending amount of each pair
+# split by days since payment_date. Rebuilt by "flask reports refresh-aging",
+# which only recomputes the pairs touched since its previous run.
+class ReceivableAging(db.Model):
+    __tablename__ = 'receivable_aging'
+    client_id = db.Column(db.Integer, primary_key=True)
+    project_id = db.Column(db.Integer, primary_key=True)
+    pending_count = db.Column(db.Integer, nullable=False, default=0)
+    days_0_30 = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    days_31_60 = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    days_61_90 = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+    days_over_90 = db.Column(db.Numeric(14, 2), nullable=False, default=0)
+
+# Where each incremental report job stopped: the last change log id it
+# processed and the date its buckets were computed for
+class ReportRun(db.Model):
+    __tablename__ = 'report_runs'
+    name = db.Column(db.String(50), primary_key=True)
+    last_change_id = db.Column(db.BigInteger().with_variant(db.Integer, 'sqlite'), nullable=False, default=0)
+    as_of = db.Column(db.Date, nullable=False)
+    finished_at = db.Column(db.DateTime, nullable=False, default=datetime.utcnow)
+
+# Archive tables: "flask archive run" moves old completed or soft-deleted
+# projects here with their payments and team rows, and soft-deleted clients
+# once nothing references them, so the hot tables stay small. No foreign
+# keys: the rows they pointed at may be archived or gone.
+class ArchivedClient(db.Model):
+    __tablename__ = 'archived_clients'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    email = db.Column(db.String(100), nullable=False)
+    contact = db.Column(db.String(15), nullable=False)
+    address = db.Column(db.String(255), nullable=True)
+    company = db.Column(db.String(100), nullable=True)
+    deleted_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+class ArchivedProject(db.Model):
+    __tablename__ = 'archived_projects'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    name = db.Column(db.String(100), nullable=False)
+    client_id = db.Column(db.Integer, nullable=False)
+    description = db.Column(db.Text, nullable=True)
+    start_date = db.Column(db.Date, nullable=True)
+    end_date = db.Column(db.Date, nullable=True)
+    status = db.Column(db.String(50), nullable=False)
+    deleted_at = db.Column(db.DateTime, nullable=True)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_archived_projects_client_id', 'client_id'),
+    )
+
+class ArchivedPayment(db.Model):
+    __tablename__ = 'archived_payments'
+    id = db.Column(db.Integer, primary_key=True, autoincrement=False)
+    client_id = db.Column(db.Integer, nullable=False)
+    project_id = db.Column(db.Integer, nullable=False)
+    total_amount = db.Column(db.Numeric(12, 2), nullable=False)
+    paid_amount = db.Column(db.Numeric(12, 2), nullable=False)
+    payment_date = db.Column(db.Date, nullable=False)
+    archived_at = db.Column(db.DateTime, nullable=False)
+
+    __table_args__ = (
+        db.Index('ix_archived_payments_project_id', 'project_id'),
+        db.Index('ix_archived_payments_client_id_payment_date', 'client_id', 'payment_date'),
+    )
+
+archived_project_team_members = db.Table(
+    'archived_project_team_members',
+    db.Column('project_id', db.Integer, primary_key=True),
+    db.Column('team_member_id', db.Integer, primary_key=True),
+    db.Column('role', db.String(50), nullable=True),
+    db.Column('archived_at', db.DateTime, nullable=False)
+)
 
 #====================================================================================================================================#
 
-#----------------------------Clients Backends---------------------------#
+#----------------------------List Pagination Helpers---------------------------#
 
-#Get all clients
-@app.route('/api/clients', methods=['GET'])
-def get_clients():
+DEFAULT_PAGE_SIZE = 100
+MAX_PAGE_SIZE = 1000
+
+# Cursors are opaque to callers: the keyset values of the last row on a page,
+# JSON encoded and base64url wrapped
+def encode_cursor(values):
+    raw = json.dumps([value.isoformat() if isinstance(value, date) else value for value in values])
+    return base64.urlsafe_b64encode(raw.encode()).decode()
+
+def decode_cursor(cursor, key_columns):
     try:
-        clients = Client.query.all()
-        clients_list = [
-            {
-                'id' : client.id,
-                'name' : client.name,
-                'email' : client.email,
-                'contact' : client.contact,
-                'address' : client.address,
-                'company' : client.company
-            }
-            for client in clients
+        values = json.loads(base64.urlsafe_b64decode(cursor.encode()))
+        if not isinstance(values, list) or len(values) != len(key_columns):
+            raise ValueError
+        return [
+            date.fromisoformat(value) if column.type.python_type is date else column.type.python_type(value)
+            for column, value in zip(key_columns, values)
         ]
+    except (ValueError, TypeError):
+        raise ValueError('Invalid cursor')
+
+# Row-value comparison (a, b) > (x, y) spelled out as a > x OR (a = x AND b > y)
+# so every database can turn it into an index range scan
+def keyset_condition(key_columns, values, descending=False):
+    compare = operator.lt if descending else operator.gt
+    condition = compare(key_columns[-1], values[-1])
+    for column, value in zip(reversed(key_columns[:-1]), reversed(values[:-1])):
+        condition = db.or_(compare(column, value), db.and_(column == value, condition))
+    return condition
+
+def page_limit():
+    try:
+        limit = int(request.args.get('limit', DEFAULT_PAGE_SIZE))
+    except ValueError:
+        raise ValueError('limit must be an integer')
+    return max(1, min(limit, MAX_PAGE_SIZE))
+
+def wants_total():
+    return request.args.get('include_total', '').lower() in ('1', 'true', 'yes')
+
+def date_arg(name):
+    value = request.args.get(name)
+    if not value:
+        return None
+    try:
+        return parse_date(value)
+    except ValueError as e:
+        raise ValueError(f'{name} {e}')
+
+def int_arg(name):
+    value = request.args.get(name)
+    if value is None or value == '':
+        return None
+    try:
+        return int(value)
+    except ValueError:
+        raise ValueError(f'{name} must be an integer')
+
+# Resolve ?fields= against the columns an endpoint exposes, keeping the
+# endpoint's own ordering. Without the parameter every field is returned.
+def selected_fields(available):
+    requested = request.args.get('fields')
+    if not requested:
+        return list(available)
+    names = {name.strip() for name in requested.split(',') if name.strip()}
+    unknown = names - set(available)
+    if unknown:
+        raise ValueError(f"Unknown fields: {', '.join(sorted(unknown))}")
+    return [name for name in available if name in names]
+
+# Money is stored and summed as exact decimals; it only becomes a JSON number
+# at the edge, once any arithmetic is done
+def format_value(value):
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    if isinstance(value, Decimal):
+        return float(value)
+    return value
+
+def format_csv_value(value):
+    if isinstance(value, date):
+        return value.strftime('%Y-%m-%d')
+    return value
+
+# Run one keyset page of a query. The select list is built from the requested
+# fields plus the key columns, so only the needed columns are read.
+def keyset_page(query, columns, fields, key_names, descending=False):
+    page_query, limit = keyset_page_query(query, columns, fields, key_names, descending)
+    return keyset_page_result(page_query.all(), limit, key_names)
+
+# The two halves of keyset_page, for callers that execute the page query
+# themselves (e.g. alongside other reads with run_concurrently)
+def keyset_page_query(query, columns, fields, key_names, descending=False):
+    key_columns = [columns[name] for name in key_names]
+    select_names = list(dict.fromkeys(
+        [name for name in fields if name in columns] + list(key_names)
+    ))
+    query = query.with_entities(*[columns[name].label(name) for name in select_names])
+
+    cursor = request.args.get('cursor')
+    if cursor:
+        query = query.filter(keyset_condition(key_columns, decode_cursor(cursor, key_columns), descending))
+
+    limit = page_limit()
+    order = [column.desc() if descending else column for column in key_columns]
+    return query.order_by(*order).limit(limit + 1), limit
+
+def keyset_page_result(rows, limit, key_names):
+    next_cursor = None
+    if len(rows) > limit:
+        rows = rows[:limit]
+        next_cursor = encode_cursor([getattr(rows[-1], name) for name in key_names])
+    return rows, next_cursor
+
+def page_response(key, items, next_cursor, count_query):
+    response = {
+        key: items,
+        'next_cursor': next_cursor,
+        'status': 'success'
+    }
+    if wants_total():
+        response['total'] = count_query.order_by(None).count()
+    return jsonify(response)
+
+def bad_request(e):
+    return jsonify({
+        'error': str(e),
+        'status': 'error'
+    }), 400
+
+def invalid_fields(errors):
+    return jsonify({
+        'error': 'Invalid fields',
+        'errors': errors,
+        'status': 'error'
+    }), 400
+
+# Parse the JSON body of a write with its schema. A body that isn't a JSON
+# object is a ValueError; field problems come back as errors.
+def request_values(schema, partial=False):
+    data = request.get_json(silent=True)
+    if not isinstance(data, dict) or (partial and not data):
+        raise ValueError('Expected a JSON object with the fields to change' if partial else 'Expected a JSON object')
+    return schema.validate(data, partial)
+
+# Ids in a write body must name live rows; one primary key read each, before
+# the write, instead of a foreign key error from it
+REFERENCES = {
+    'client_id': (Client, 'client does not exist'),
+    'project_id': (Project, 'project does not exist'),
+}
+
+def missing_references(values):
+    errors = {}
+    for name, (model, message) in REFERENCES.items():
+        if values.get(name) is None:
+            continue
+        if not db.session.query(model.id).filter(model.id == values[name], *live(model)).first():
+            errors[name] = message
+    return errors
+
+#----------------------------Streaming Export Helpers---------------------------#
+
+EXPORT_BATCH_SIZE = 1000
+
+# Stream every row of a query as NDJSON or CSV. Rows are fetched from a
+# server-side cursor in batches and written out as they arrive, so memory
+# stays flat regardless of the table size.
+def export_response(query, serializer, fields, order_by, filename):
+    export_format = request.args.get('format', 'ndjson').lower()
+    if export_format not in ('ndjson', 'csv'):
+        raise ValueError('format must be ndjson or csv')
+
+    columns = serializer.columns
+    serialize = serializer.for_fields(fields)
+    query = query.with_entities(*[columns[name].label(name) for name in fields]) \
+                 .order_by(*order_by) \
+                 .yield_per(EXPORT_BATCH_SIZE)
+
+    def generate_ndjson():
+        lines = []
+        for row in query:
+            lines.append(dumps_bytes(serialize(row)))
+            if len(lines) >= EXPORT_BATCH_SIZE:
+                yield b'\n'.join(lines) + b'\n'
+                lines = []
+        if lines:
+            yield b'\n'.join(lines) + b'\n'
+
+    def generate_csv():
+        buffer = io.StringIO()
+        writer = csv.writer(buffer)
+        writer.writerow(fields)
+        for count, row in enumerate(query, 1):
+            writer.writerow([format_csv_value(value) for value in row])
+            if count % EXPORT_BATCH_SIZE == 0:
+                yield buffer.getvalue()
+                buffer.seek(0)
+                buffer.truncate()
+        yield buffer.getvalue()
+
+    if export_format == 'csv':
+        body, mimetype = generate_csv(), 'text/csv'
+    else:
+        body, mimetype = generate_ndjson(), 'application/x-ndjson'
+
+    return Response(
+        stream_with_context(body),
+        mimetype=mimetype,
+        headers={'Content-Disposition': f'attachment; filename={filename}.{export_format}'}
+    )
+
+#====================================================================================================================================#
+
+#----------------------------Dashboard Totals Helpers---------------------------#
+
+# Recompute every dashboard total from the base tables in one round-trip.
+# Payments of soft-deleted clients and projects still count (see live()).
+def dashboard_aggregates():
+    return {
+        'total_clients': db.select(db.func.count(Client.id)).where(*live(Client)),
+        'total_team_members': db.select(db.func.count(TeamMember.id)),
+        'total_projects': db.select(db.func.count(Project.id)).where(*live(Project)),
+        'total_payments': db.select(db.func.count(Payment.id)),
+        'total_amount': db.select(db.func.sum(Payment.total_amount)),
+        'pending_amount': db.select(db.func.sum(Payment.total_amount - Payment.paid_amount))
+    }
+
+# Full recount of the dashboard totals. Inside a write transaction the
+# aggregates run as one statement on the session so they see its flushed
+# changes; otherwise the six scans run side by side on separate connections.
+def compute_dashboard_totals(concurrently=False):
+    aggregates = dashboard_aggregates()
+    if concurrently:
+        results = run_concurrently(*aggregates.values())
+        return {key: result[0][0] or 0 for key, result in zip(aggregates, results)}
+
+    row = db.session.query(
+        *[statement.scalar_subquery().label(key) for key, statement in aggregates.items()]
+    ).one()
+    return {key: value or 0 for key, value in row._asdict().items()}
+
+# Apply counter deltas to the dashboard row inside the caller's transaction.
+# The increment is done by the database, so concurrent writers don't lose
+# updates. The row is built by "flask init-db" and "flask dashboard rebuild",
+# never by a request: until then there is nothing to bump and no event is
+# sent. /api/events listeners get the deltas once the transaction commits.
+def bump_dashboard_totals(**deltas):
+    values = {
+        name: getattr(DashboardTotals, name) + delta
+        for name, delta in deltas.items() if delta
+    }
+    if not values:
+        return
+    db.session.flush()
+    result = db.session.execute(
+        db.update(DashboardTotals).where(DashboardTotals.id == DASHBOARD_TOTALS_ID).values(**values)
+    )
+    if result.rowcount == 0:
+        return
+    queue_event('dashboard', {'deltas': dashboard_event({name: deltas[name] for name in values})})
+
+def payment_amounts(payment):
+    total = to_money(payment.total_amount or 0)
+    paid = to_money(payment.paid_amount or 0)
+    return total, total - paid
+
+def rebuild_dashboard_totals():
+    totals = compute_dashboard_totals(concurrently=True)
+    row = db.session.get(DashboardTotals, DASHBOARD_TOTALS_ID)
+    if row is None:
+        row = DashboardTotals(id=DASHBOARD_TOTALS_ID)
+        db.session.add(row)
+    for name, value in totals.items():
+        setattr(row, name, value)
+    db.session.commit()
+    return row
+
+dashboard_cli = click.Group('dashboard', help='Maintain the materialized dashboard totals.')
+api.cli.add_command(dashboard_cli)
+
+@dashboard_cli.command('rebuild')
+def rebuild_dashboard_command():
+    """Recompute the dashboard totals from scratch."""
+    rebuild_dashboard_totals()
+    click.echo('Dashboard totals rebuilt.')
+
+@dashboard_cli.command('verify')
+def verify_dashboard_command():
+    """Compare the stored totals with a full recount and report any drift."""
+    expected = compute_dashboard_totals(concurrently=True)
+    row = db.session.get(DashboardTotals, DASHBOARD_TOTALS_ID)
+    if row is None:
+        raise click.ClickException('Dashboard totals have not been built yet; run "flask dashboard rebuild".')
+
+    drift = {
+        name: (getattr(row, name), value)
+        for name, value in expected.items()
+        if getattr(row, name) != value
+    }
+    for name, (stored, actual) in drift.items():
+        click.echo(f'{name}: stored {stored}, actual {actual}')
+    if drift:
+        raise click.ClickException(f'{len(drift)} dashboard total(s) drifted.')
+    click.echo('Dashboard totals match.')
+
+#----------------------------Concurrent Read Helpers---------------------------#
+
+# Run independent read statements side by side, each on its own pooled
+# connection, and return their rows in the order given. Worker threads come
+# from the app's bounded read pool and run inside a copy of the caller's
+# context, so current_app and the request instrumentation keep working.
+# Each statement sees the last committed data, not the caller's open
+# transaction: only use this for reads. With a single-connection database
+# (in-memory SQLite) or READ_POOL_WORKERS below 2 (the default on SQLite)
+# the statements run one after another on the session instead.
+def run_concurrently(*statements):
+    executor = current_app.extensions['read_executor']
+    if executor is None or len(statements) < 2:
+        return [db.session.execute(statement).all() for statement in statements]
+
+    def read(statement):
+        with db.engine.connect() as connection:
+            return connection.execute(statement).all()
+
+    futures = [executor.submit(contextvars.copy_context().run, read, statement) for statement in statements]
+    return [future.result() for future in futures]
+
+DEFAULT_READ_POOL_WORKERS = 4
+
+def make_read_executor(app):
+    uri = app.config['SQLALCHEMY_DATABASE_URI']
+    workers = app.config['READ_POOL_WORKERS']
+    if workers is None:
+        workers = 0 if is_sqlite(uri) else DEFAULT_READ_POOL_WORKERS
+    if workers < 2 or is_memory_sqlite(uri):
+        return None
+    return ThreadPoolExecutor(max_workers=workers, thread_name_prefix='db-read')
+
+#----------------------------Response Cache Helpers---------------------------#
+
+def get_response_cache():
+    return current_app.extensions['response_cache']
+
+# Serve a JSON payload from the response cache, building it on a miss. The
+# ETag lets browsers revalidate with If-None-Match and get a 304 back.
+def cached_json_response(key, build):
+    entry = get_response_cache().get(key)
+    if entry is None:
+        body = current_app.json.dumps(build())
+        entry = {'etag': hashlib.sha1(body.encode()).hexdigest(), 'body': body}
+        get_response_cache().set(key, entry)
+
+    response = current_app.response_class(entry['body'], mimetype='application/json')
+    response.set_etag(entry['etag'])
+    response.cache_control.no_cache = True
+    return response.make_conditional(request)
+
+# Drop cached responses once a write to their entity has been committed
+def invalidate_cached(*keys):
+    for key in keys:
+        get_response_cache().delete(key)
+
+#----------------------------Change Log Helpers---------------------------#
+
+# Record a change in the caller's transaction; the id must already be known
+# (flush new records first)
+def record_change(entity, entity_id, op=CHANGE_UPSERT, **references):
+    db.session.add(ChangeLog(
+        entity=entity,
+        entity_id=entity_id,
+        op=op,
+        payload=json.dumps(references) if references else None
+    ))
+
+# Log every row of a model matching some conditions with one INSERT ... SELECT
+def record_changes_where(entity, model, *conditions):
+    db.session.execute(db.insert(ChangeLog).from_select(
+        ['entity', 'entity_id', 'op', 'changed_at'],
+        db.select(
+            db.literal(entity), model.id, db.literal(CHANGE_UPSERT), db.literal(datetime.utcnow(), db.DateTime)
+        ).where(*conditions)
+    ))
+
+# Bulk inserts don't return their ids: log every row above the highest id
+# seen before the insert. Rows inserted concurrently by someone else may be
+# logged twice, which readers tolerate.
+def record_inserted_changes(entity, model, after_id):
+    record_changes_where(entity, model, model.id > after_id)
+
+# Project and payment rows in the feed also show their client's name, their
+# project's name and the project's team. When one of those changes, the rows
+# showing it are logged in the same transaction, so delta syncs see it.
+def record_client_renamed(client_id):
+    record_changes_where('projects', Project, Project.client_id == client_id, *live(Project))
+    record_changes_where('payments', Payment, Payment.client_id == client_id)
+
+def record_project_renamed(project_id):
+    record_changes_where('payments', Payment, Payment.project_id == project_id)
+
+# Call before the member's association rows are deleted
+def record_team_member_changed(team_member_id):
+    record_changes_where('projects', Project, Project.id.in_(
+        db.select(project_team_members.c.project_id).where(project_team_members.c.team_member_id == team_member_id)
+    ), *live(Project))
+
+# A payment that moved to another client or project keeps its previous
+# references in the change log, so consumers can update both sides
+def moved_payment_references(old, client_id, project_id):
+    if (old['client_id'], old['project_id']) == (client_id, project_id):
+        return {}
+    return {'previous_client_id': old['client_id'], 'previous_project_id': old['project_id']}
+
+#----------------------------Soft Delete Helpers---------------------------#
+
+# Clients and projects are soft deleted: the API sets deleted_at and every
+# read of clients and projects filters on live() until "flask archive run"
+# moves the rows out of the hot tables. Payments are not filtered by their
+# parents: they are money still owed or received, so they stay in the
+# payment list, the reports, the aging buckets and the dashboard money
+# totals until the archive job takes them out with their project. Filter
+# conditions for the live rows of any model:
+def live(model):
+    return [model.deleted_at.is_(None)] if hasattr(model, 'deleted_at') else []
+
+def get_live(model, id):
+    record = db.session.get(model, id)
+    if record is None or getattr(record, 'deleted_at', None) is not None:
+        return None
+    return record
+
+#----------------------------Event Stream Helpers---------------------------#
+
+EVENT_CHANNELS = ('dashboard', 'payments')
+
+# Dashboard totals as they are named in /api/dashboard-data
+DASHBOARD_EVENT_KEYS = {
+    'total_clients': 'totalClients',
+    'total_team_members': 'totalTeamMembers',
+    'total_projects': 'totalProjects',
+    'total_amount': 'totalAmount',
+    'pending_amount': 'pendingAmount',
+    'total_payments': 'totalPayments',
+}
+
+def get_event_bus():
+    return current_app.extensions['event_bus']
+
+# Queue an event for /api/events subscribers. It is published once the
+# caller's transaction commits and dropped if it rolls back, so listeners
+# never hear about writes that didn't happen.
+def queue_event(channel, data):
+    db.session.info.setdefault('pending_events', []).append((channel, data))
+
+@event.listens_for(db.session, 'after_commit')
+def publish_queued_events(session):
+    pending = session.info.pop('pending_events', None)
+    if not pending:
+        return
+    bus = get_event_bus()
+    for channel, data in pending:
+        try:
+            bus.publish(channel, data)
+        except Exception as e:
+            # The write is already committed; a lost event only delays listeners
+            print(f"Error publishing {channel} event: {e}")
+
+# A rolled back savepoint keeps the outer transaction, and its events, alive
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_queued_events(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('pending_events', None)
+
+def dashboard_event(totals):
+    return {DASHBOARD_EVENT_KEYS[name]: format_value(value) for name, value in totals.items()}
+
+# "dashboard" event data carrying every total, to replace rather than apply
+def dashboard_snapshot(row):
+    return {'totals': dashboard_event({name: getattr(row, name) for name in DASHBOARD_EVENT_KEYS})}
+
+def payment_event(op, payment_id, **fields):
+    return {'op': op, 'id': payment_id, **{name: format_value(value) for name, value in fields.items()}}
+
+def payment_event_fields(payment):
+    return {
+        'client_id': payment.client_id,
+        'project_id': payment.project_id,
+        'total_amount': payment.total_amount,
+        'paid_amount': payment.paid_amount,
+        'payment_date': payment.payment_date,
+    }
+
+#----------------------------Search Helpers---------------------------#
+
+# Searchable records: the model, the text fields with their ranking weight,
+# and the field shown next to the name in results
+SEARCH_SOURCES = {
+    'client': {'model': Client, 'fields': {'name': 2.0, 'company': 1.5, 'email': 1.0}, 'detail': 'company'},
+    'project': {'model': Project, 'fields': {'name': 2.0, 'description': 1.0}, 'detail': 'status'},
+    'team_member': {'model': TeamMember, 'fields': {'name': 2.0, 'job_role': 1.0}, 'detail': 'job_role'},
+}
+
+def search_document(kind, record):
+    source = SEARCH_SOURCES[kind]
+    return {name: getattr(record, name) for name in (*source['fields'], source['detail'])}
+
+# (id, document) of the live records of one kind, from a column-projected scan
+def search_documents(kind, *conditions):
+    source = SEARCH_SOURCES[kind]
+    model = source['model']
+    names = list(dict.fromkeys((*source['fields'], source['detail'])))
+    rows = db.session.query(model.id, *(getattr(model, name) for name in names)) \
+        .filter(*live(model), *conditions) \
+        .execution_options(yield_per=EXPORT_BATCH_SIZE)
+    for row in rows:
+        yield row[0], dict(zip(names, row[1:]))
+
+# Full load for the in-process index, one scan per model
+def load_search_documents():
+    for kind in SEARCH_SOURCES:
+        for doc_id, document in search_documents(kind):
+            yield kind, doc_id, document
+
+def make_search_index(app):
+    # Rebuilds after the first run in a background thread, outside any request
+    def load():
+        if has_app_context():
+            yield from load_search_documents()
+        else:
+            with app.app_context():
+                yield from load_search_documents()
+
+    return SearchIndex(
+        {kind: source['fields'] for kind, source in SEARCH_SOURCES.items()},
+        load,
+        max_age=app.config['SEARCH_INDEX_MAX_AGE']
+    )
+
+def get_search_index():
+    return current_app.extensions['search_index']
+
+# MySQL answers searches from its FULLTEXT indexes; everything else uses the
+# in-process index
+def uses_fulltext_search():
+    backend = current_app.config['SEARCH_BACKEND']
+    if backend == 'auto':
+        return db.engine.dialect.name == 'mysql'
+    return backend == 'fulltext'
+
+# Keep the in-process index in step with committed writes. A no-op until
+# the first search has built it.
+def index_for_search(kind, record):
+    get_search_index().put(kind, record.id, search_document(kind, record))
+
+def unindex_for_search(kind, id):
+    get_search_index().remove(kind, id)
+
+# index_for_search once the caller's transaction commits (see after_commit).
+# The document is read now, while the record is still loaded.
+def index_after_commit(kind, record):
+    after_commit(get_search_index().put, kind, record.id, search_document(kind, record))
+
+# Bulk inserts don't return their ids: index every live row above the
+# highest id seen before the insert, once the caller's transaction commits
+def index_inserted_for_search(kind, after_id):
+    if not get_search_index().built:
+        return
+    model = SEARCH_SOURCES[kind]['model']
+    for doc_id, document in search_documents(kind, model.id > after_id):
+        after_commit(get_search_index().put, kind, doc_id, document)
+
+# For writes that don't have the record at hand (PATCH). Reads the document
+# back only when this worker's in-process index has been built.
+def refresh_search_document(kind, id):
+    if not get_search_index().built:
+        return
+    source = SEARCH_SOURCES[kind]
+    record = db.session.query(source['model']).filter(source['model'].id == id, *live(source['model'])).first()
+    if record is None:
+        unindex_for_search(kind, id)
+    else:
+        index_for_search(kind, record)
+
+#----------------------------Write Precondition Helpers---------------------------#
+
+# Clients, projects and payments carry a version that every update bumps. It
+# is served as the ETag of write responses and as the "version" field of the
+# list endpoints; sending it back in If-Match makes an update conditional.
+
+# Versions named by If-Match, or None for an unconditional request. Tags that
+# aren't version numbers can never match.
+def expected_versions():
+    if not request.if_match or request.if_match.star_tag:
+        return None
+    versions = set()
+    for tag in request.if_match.as_set():
+        try:
+            versions.add(int(tag))
+        except ValueError:
+            pass
+    return versions
+
+def version_matches(version):
+    versions = expected_versions()
+    return versions is None or version in versions
+
+def versioned_response(body, version):
+    body['version'] = version
+    response = jsonify(body)
+    response.set_etag(str(version))
+    return response
+
+# Response to a POST that created a record: the record's URL in Location
+# and, for versioned models, its first version as the ETag
+def created_response(body, location, version=None):
+    response = jsonify(body) if version is None else versioned_response(body, version)
+    response.headers['Location'] = location
+    return response
+
+def precondition_failed(version):
+    response = jsonify({
+        'error': 'The record was changed by someone else; reload it and retry',
+        'version': version,
+        'status': 'error'
+    })
+    response.set_etag(str(version))
+    return response, 412
+
+# The row changed between our read and the version-checked UPDATE
+def write_conflict():
+    db.session.rollback()
+    return jsonify({
+        'error': 'The record was changed by someone else; reload it and retry',
+        'status': 'error'
+    }), 409
+
+def request_fingerprint():
+    digest = hashlib.sha256()
+    for part in (request.method.encode(), request.path.encode(), request.get_data()):
+        digest.update(part)
+        digest.update(b'\0')
+    return digest.hexdigest()
+
+def replay_idempotent(key, fingerprint):
+    stored = db.session.get(IdempotencyKey, key)
+    if stored is None or stored.status_code is None:
+        return jsonify({
+            'error': 'A request with this Idempotency-Key is still in progress; retry shortly',
+            'status': 'error'
+        }), 409
+    if stored.fingerprint != fingerprint:
         return jsonify({
-            'clients' : clients_list,
-            'status' : 'success'
+            'error': 'This Idempotency-Key was already used for a different request',
+            'status': 'error'
+        }), 422
+
+    response = current_app.response_class(stored.response_body, status=stored.status_code,
+                                          content_type=stored.content_type)
+    response.headers.update(json.loads(stored.response_headers or '{}'))
+    response.headers['Idempotent-Replayed'] = 'true'
+    return response
+
+# Headers of the first response that a replay repeats
+IDEMPOTENT_REPLAYED_HEADERS = ('ETag', 'Location')
+
+# Commit a write handler's transaction. Under @idempotent only flush: the
+# wrapper commits the writes together with the stored response.
+def commit_write():
+    if 'idempotency_claim' in db.session.info:
+        db.session.flush()
+    else:
+        db.session.commit()
+
+# Run fn(*args) once the caller's transaction commits, and not at all if it
+# rolls back. Handlers that end with commit_write() use it for work that has
+# to follow the commit, such as cache invalidation and search indexing.
+def after_commit(fn, *args):
+    db.session.info.setdefault('after_commit_calls', []).append((fn, args))
+
+@event.listens_for(db.session, 'after_commit')
+def run_after_commit_calls(session):
+    for fn, args in session.info.pop('after_commit_calls', None) or []:
+        try:
+            fn(*args)
+        except Exception as e:
+            # The write is already committed; a stale cache or index entry is
+            # fixed by the next write or rebuild
+            print(f"Error running {fn.__name__} after commit: {e}")
+
+@event.listens_for(db.session, 'after_soft_rollback')
+def discard_after_commit_calls(session, previous_transaction):
+    if not previous_transaction.nested:
+        session.info.pop('after_commit_calls', None)
+
+# Make a POST handler safe to retry. With an Idempotency-Key header the key
+# is inserted first: a duplicate key fails on the primary key and gets the
+# first attempt's stored response instead of running the handler again.
+# The handler's commit_write() only flushes, and the writes, the key and the
+# response are committed in one transaction, so a key is never left without
+# its response. A failed attempt is rolled back with its key and can be
+# retried.
+def idempotent(handler):
+    @functools.wraps(handler)
+    def wrapper(*args, **kwargs):
+        key = request.headers.get('Idempotency-Key')
+        if not key:
+            return handler(*args, **kwargs)
+        if len(key) > 255:
+            return bad_request(ValueError('Idempotency-Key must be at most 255 characters'))
+
+        fingerprint = request_fingerprint()
+        claim = IdempotencyKey(key=key, fingerprint=fingerprint)
+        try:
+            db.session.add(claim)
+            db.session.flush()
+        except IntegrityError:
+            db.session.rollback()
+            return replay_idempotent(key, fingerprint)
+
+        db.session.info['idempotency_claim'] = claim
+        try:
+            response = current_app.make_response(handler(*args, **kwargs))
+        finally:
+            db.session.info.pop('idempotency_claim', None)
+        failed = response.status_code >= 400 or (
+            response.is_json and (response.get_json(silent=True) or {}).get('status') == 'error'
+        )
+        if failed or inspect(claim).transient:
+            db.session.rollback()
+            return response
+
+        claim.status_code = response.status_code
+        claim.content_type = response.content_type
+        claim.response_body = response.get_data(as_text=True)
+        claim.response_headers = json.dumps({
+            name: response.headers[name] for name in IDEMPOTENT_REPLAYED_HEADERS if name in response.headers
         })
+        db.session.commit()
+        return response
+    return wrapper
+
+idempotency_cli = click.Group('idempotency-keys', help='Maintain stored Idempotency-Key responses.')
+api.cli.add_command(idempotency_cli)
+
+@idempotency_cli.command('purge')
+@click.option('--max-age-hours', default=24, show_default=True, help='Delete keys older than this.')
+def purge_idempotency_keys_command(max_age_hours):
+    """Delete stored keys once retries of their request are no longer expected."""
+    cutoff = datetime.utcnow() - timedelta(hours=max_age_hours)
+    deleted = db.session.execute(
+        db.delete(IdempotencyKey).where(IdempotencyKey.created_at < cutoff)
+    ).rowcount
+    db.session.commit()
+    click.echo(f'Deleted {deleted} idempotency key(s).')
+
+#====================================================================================================================================#
+
+#----------------------------Clients Backends---------------------------#
+
+#Get all clients
+CLIENT_COLUMNS = {
+    'id': Client.id,
+    'name': Client.name,
+    'email': Client.email,
+    'contact': Client.contact,
+    'address': Client.address,
+    'company': Client.company,
+    'version': Client.version
+}
+CLIENT_SERIALIZER = ModelSerializer(CLIENT_COLUMNS)
+
+CLIENT_SCHEMA = Schema(
+    name=text(100),
+    email=text(100),
+    contact=text(15),
+    address=text(255, required=False),
+    company=text(100, required=False),
+)
+
+@api.route('/api/clients', methods=['GET'])
+def get_clients():
+    try:
+        fields = selected_fields(CLIENT_COLUMNS)
+        query = db.session.query(Client).filter(*live(Client))
+        if request.args.get('company'):
+            query = query.filter(Client.company == request.args['company'])
+
+        clients, next_cursor = keyset_page(query, CLIENT_COLUMNS, fields, ['id'])
+        serialize = CLIENT_SERIALIZER.for_fields(fields)
+        clients_list = [serialize(client) for client in clients]
+        return page_response('clients', clients_list, next_cursor, query)
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error fetching clients: {e}")
         return jsonify({
@@ -112,24 +1079,27 @@ def get_clients():
         })
 
 #Add a client
-@app.route('/api/clients', methods=['POST'])
+@api.route('/api/clients', methods=['POST'])
+@idempotent
 def add_client():
     try:
-        client_data = request.json
-        new_client = Client(
-            name=client_data.get('name'),
-            email=client_data.get('email'),
-            contact=client_data.get('contact'),
-            address=client_data.get('address'),
-            company=client_data.get('company')
-        )
+        values, errors = request_values(CLIENT_SCHEMA)
+        if errors:
+            return invalid_fields(errors)
+        new_client = Client(**values)
         db.session.add(new_client)  # Add the new client to the session
-        db.session.commit()  # Commit the transaction
-        return jsonify({
+        bump_dashboard_totals(total_clients=1)
+        record_change('clients', new_client.id)
+        after_commit(invalidate_cached, 'clients')
+        index_after_commit('client', new_client)
+        commit_write()  # Commit the transaction
+        return created_response({
             'id': new_client.id,
             'message': 'Client added successfully',
             'status': 'success'
-        })
+        }, f'/api/clients/{new_client.id}', new_client.version)
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error adding client: {e}")  # Debugging log
         return jsonify({
@@ -138,26 +1108,39 @@ def add_client():
         })
 
 # Update a client
-@app.route('/api/clients/<int:id>', methods=['PUT'])
+@api.route('/api/clients/<int:id>', methods=['PUT'])
 def update_client(id):
     try:
-        client_data = request.json
-        client = Client.query.get(id)  # Fetch the client by ID
+        values, errors = request_values(CLIENT_SCHEMA)
+        if errors:
+            return invalid_fields(errors)
+        client = get_live(Client, id)  # Fetch the client by ID
         if not client:
             return jsonify({'message': 'Client not found', 'status': 'error'}), 404
+        if not version_matches(client.version):
+            return precondition_failed(client.version)
+        renamed = values['name'] != client.name
 
         # Update client fields
-        client.name = client_data.get('name')
-        client.email = client_data.get('email')
-        client.contact = client_data.get('contact')
-        client.address = client_data.get('address')
-        client.company = client_data.get('company')
-
+        for name, value in values.items():
+            setattr(client, name, value)
+
+        db.session.flush()  # UPDATE ... WHERE id = ? AND version = ?
+        version = client.version
+        record_change('clients', client.id)
+        if renamed:
+            record_client_renamed(client.id)
         db.session.commit()  # Commit the changes
-        return jsonify({
+        invalidate_cached('clients')
+        index_for_search('client', client)
+        return versioned_response({
             'message': 'Client updated successfully',
             'status': 'success'
-        })
+        }, version)
+    except ValueError as e:
+        return bad_request(e)
+    except StaleDataError:
+        return write_conflict()
     except Exception as e:
         print(f"Error updating client: {e}")  # Debugging log
         return jsonify({
@@ -166,15 +1149,32 @@ def update_client(id):
         })
 
 # Delete a client
-@app.route('/api/clients/<int:id>', methods=['DELETE'])
+@api.route('/api/clients/<int:id>', methods=['DELETE'])
 def delete_client(id):
     try:
-        client = Client.query.get(id)  # Fetch the client by ID
+        client = get_live(Client, id)  # Fetch the client by ID
         if not client:
             return jsonify({'message': 'Client not found', 'status': 'error'}), 404
 
-        db.session.delete(client)  # Delete the client
+        # Soft delete the client and its live projects; their payments and
+        # team rows stay until the archive job moves them all out together
+        deleted_at = datetime.utcnow()
+        client.deleted_at = deleted_at
+        project_ids = [row.id for row in db.session.query(Project.id).filter(Project.client_id == id, *live(Project))]
+        if project_ids:
+            db.session.execute(
+                db.update(Project).where(Project.id.in_(project_ids)).values(deleted_at=deleted_at),
+                execution_options={'synchronize_session': False}
+            )
+        bump_dashboard_totals(total_clients=-1, total_projects=-len(project_ids))
+        record_change('clients', id, CHANGE_DELETE)
+        for project_id in project_ids:
+            record_change('projects', project_id, CHANGE_DELETE, client_id=id)
         db.session.commit()  # Commit the transaction
+        invalidate_cached('clients', 'projects')
+        unindex_for_search('client', id)
+        for project_id in project_ids:
+            unindex_for_search('project', project_id)
         return jsonify({
             'message': 'Client deleted successfully',
             'status': 'success'
@@ -185,27 +1185,131 @@ def delete_client(id):
             'error': str(e), 
             'status': 'error'
         })
-    
+
+# Payment history of a client with running balances. The window sums run
+# over this client's payments only (ix_payments_client_id_payment_date), in
+# chronological order, and pages are then cut newest first with a keyset on
+# (payment_date, id). The client lookup, the page and the first page's
+# per-project subtotals are independent reads and run concurrently.
+CLIENT_LEDGER_FIELDS = [
+    'id', 'project_id', 'project_name', 'payment_date', 'total_amount', 'paid_amount',
+    'pending_amount', 'running_total', 'running_paid', 'running_pending'
+]
+
+@api.route('/api/clients/<int:id>/payments', methods=['GET'])
+def get_client_payments(id):
+    try:
+        fields = selected_fields(CLIENT_LEDGER_FIELDS)
+        chronological = {'order_by': (Payment.payment_date, Payment.id), 'rows': (None, 0)}
+        ledger = db.session.query(
+            Payment.id.label('id'),
+            Payment.project_id.label('project_id'),
+            Project.name.label('project_name'),
+            Payment.payment_date.label('payment_date'),
+            Payment.total_amount.label('total_amount'),
+            Payment.paid_amount.label('paid_amount'),
+            (Payment.total_amount - Payment.paid_amount).label('pending_amount'),
+            db.func.sum(Payment.total_amount).over(**chronological).label('running_total'),
+            db.func.sum(Payment.paid_amount).over(**chronological).label('running_paid'),
+            db.func.sum(Payment.total_amount - Payment.paid_amount).over(**chronological).label('running_pending')
+        ).join(
+            Project, Payment.project_id == Project.id
+        ).filter(
+            Payment.client_id == id
+        ).subquery()
+
+        columns = {name: ledger.c[name] for name in CLIENT_LEDGER_FIELDS}
+        query = db.session.query(ledger)
+        date_from, date_to = date_arg('date_from'), date_arg('date_to')
+        if date_from:
+            query = query.filter(ledger.c.payment_date >= date_from)
+        if date_to:
+            query = query.filter(ledger.c.payment_date <= date_to)
+
+        page_query, limit = keyset_page_query(query, columns, fields, ['payment_date', 'id'], descending=True)
+        reads = [db.select(Client.id).where(Client.id == id, *live(Client)), page_query.statement]
+
+        # Per-project subtotals come with the first page only
+        first_page = not request.args.get('cursor')
+        if first_page:
+            reads.append(db.select(
+                Payment.project_id,
+                Project.name.label('project_name'),
+                db.func.count(Payment.id).label('payment_count'),
+                db.func.sum(Payment.total_amount).label('total_amount'),
+                db.func.sum(Payment.paid_amount).label('paid_amount'),
+                db.func.sum(Payment.total_amount - Payment.paid_amount).label('pending_amount')
+            ).join(
+                Project, Payment.project_id == Project.id
+            ).filter(
+                Payment.client_id == id
+            ).group_by(
+                Payment.project_id, Project.name
+            ).order_by(Project.name))
+
+        found, page_rows, *subtotals = run_concurrently(*reads)
+        if not found:
+            return jsonify({'message': 'Client not found', 'status': 'error'}), 404
+
+        rows, next_cursor = keyset_page_result(page_rows, limit, ['payment_date', 'id'])
+        serialize = ModelSerializer(columns).for_fields(fields)
+        response = {
+            'client_id': id,
+            'payments': [serialize(row) for row in rows],
+            'next_cursor': next_cursor,
+            'status': 'success'
+        }
+        if first_page:
+            response['projects'] = [
+                {key: format_value(value) for key, value in row._asdict().items()}
+                for row in subtotals[0]
+            ]
+
+        return jsonify(response)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error fetching client payments: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
 #=================================================================================================================#
 
 #----------------------------Team Memeber Backend------------------#
 
 # Get all team members
-@app.route('/api/teams', methods=['GET'])
+TEAM_COLUMNS = {
+    'id': TeamMember.id,
+    'name': TeamMember.name,
+    'contact': TeamMember.contact,
+    'email': TeamMember.email,
+    'job_role': TeamMember.job_role
+}
+TEAM_SERIALIZER = ModelSerializer(TEAM_COLUMNS)
+
+TEAM_SCHEMA = Schema(
+    name=text(100),
+    job_role=text(100),
+    email=text(100),
+    contact=text(15),
+)
+
+@api.route('/api/teams', methods=['GET'])
 def get_teams():
     try:
-        teams = TeamMember.query.all()  # Fetch all team members using ORM
-        teams_list = [
-            {
-                'id': team.id,
-                'name': team.name,
-                'contact': team.contact,
-                'email': team.email,
-                'job_role': team.job_role
-            }
-            for team in teams
-        ]
-        return jsonify({'team_members': teams_list, 'status': 'success'})
+        fields = selected_fields(TEAM_COLUMNS)
+        query = db.session.query(TeamMember)
+        if request.args.get('job_role'):
+            query = query.filter(TeamMember.job_role == request.args['job_role'])
+
+        teams, next_cursor = keyset_page(query, TEAM_COLUMNS, fields, ['id'])
+        serialize = TEAM_SERIALIZER.for_fields(fields)
+        teams_list = [serialize(team) for team in teams]
+        return page_response('team_members', teams_list, next_cursor, query)
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error fetching team members: {e}")  # Debugging log
         return jsonify({
@@ -214,23 +1318,27 @@ def get_teams():
         })
 
 # Add a team member
-@app.route('/api/teams', methods=['POST'])
+@api.route('/api/teams', methods=['POST'])
+@idempotent
 def add_team():
     try:
-        team_data = request.json
-        new_team_member = TeamMember(
-            name=team_data.get('name'),
-            email=team_data.get('email'),
-            contact=team_data.get('contact'),
-            job_role=team_data.get('job_role')
-        )
+        values, errors = request_values(TEAM_SCHEMA)
+        if errors:
+            return invalid_fields(errors)
+        new_team_member = TeamMember(**values)
         db.session.add(new_team_member)  # Add the new team member to the session
-        db.session.commit()  # Commit the transaction
-        return jsonify({
+        bump_dashboard_totals(total_team_members=1)
+        record_change('team_members', new_team_member.id)
+        after_commit(invalidate_cached, 'team_members')
+        index_after_commit('team_member', new_team_member)
+        commit_write()  # Commit the transaction
+        return created_response({
             'id': new_team_member.id,
             'message': 'Team member added successfully',
             'status': 'success'
-        })
+        }, f'/api/teams/{new_team_member.id}')
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error adding team member: {e}")  # Debugging log
         return jsonify({
@@ -240,25 +1348,33 @@ def add_team():
 
 
 # Update a team member
-@app.route('/api/teams/<int:id>', methods=['PUT'])
+@api.route('/api/teams/<int:id>', methods=['PUT'])
 def update_team(id):
     try:
-        team_data = request.json
-        team = TeamMember.query.get(id)  # Fetch the team member by ID
+        values, errors = request_values(TEAM_SCHEMA)
+        if errors:
+            return invalid_fields(errors)
+        team = db.session.get(TeamMember, id)  # Fetch the team member by ID
         if not team:
             return jsonify({'message': 'Team member not found', 'status': 'error'}), 404
+        renamed = values['name'] != team.name
 
         # Update team member fields
-        team.name = team_data.get('name')
-        team.email = team_data.get('email')
-        team.contact = team_data.get('contact')
-        team.job_role = team_data.get('job_role')
+        for name, value in values.items():
+            setattr(team, name, value)
 
+        record_change('team_members', team.id)
+        if renamed:
+            record_team_member_changed(team.id)
         db.session.commit()  # Commit the changes
+        invalidate_cached('team_members')
+        index_for_search('team_member', team)
         return jsonify({
             'message': 'Team member updated successfully',
             'status': 'success'
         })
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error updating team member: {e}")  # Debugging log
         return jsonify({
@@ -267,15 +1383,20 @@ def update_team(id):
         })
 
 # Delete a team member
-@app.route('/api/teams/<int:id>', methods=['DELETE'])
+@api.route('/api/teams/<int:id>', methods=['DELETE'])
 def delete_team(id):
     try:
-        team = TeamMember.query.get(id)  # Fetch the team member by ID
+        team = db.session.get(TeamMember, id)  # Fetch the team member by ID
         if not team:
             return jsonify({'message': 'Team member not found', 'status': 'error'}), 404
 
+        record_team_member_changed(id)
         db.session.delete(team)  # Delete the team member
+        bump_dashboard_totals(total_team_members=-1)
+        record_change('team_members', id, CHANGE_DELETE)
         db.session.commit()  # Commit the transaction
+        invalidate_cached('team_members')
+        unindex_for_search('team_member', id)
         return jsonify({
             'message': 'Team member deleted successfully',
             'status': 'success'
@@ -287,50 +1408,280 @@ def delete_team(id):
             'status': 'error'
         })
 
-#=================================================================================================================#
+# Workload of team members: their projects, roles, project statuses and the
+# payment totals of those projects, from one query. The member -> project walk
+# is answered from ix_project_team_members_allocation alone and payments are
+# aggregated per project before the join, only for the projects involved.
+def team_summaries(member_ids=None):
+    allocations = db.select(project_team_members.c.project_id)
+    if member_ids is not None:
+        allocations = allocations.where(project_team_members.c.team_member_id.in_(member_ids))
+
+    payment_totals = db.session.query(
+        Payment.project_id.label('project_id'),
+        db.func.count(Payment.id).label('payment_count'),
+        db.func.sum(Payment.total_amount).label('total_amount'),
+        db.func.sum(Payment.paid_amount).label('paid_amount')
+    ).filter(
+        Payment.project_id.in_(allocations)
+    ).group_by(Payment.project_id).subquery()
+
+    query = db.session.query(
+        TeamMember.id.label('team_member_id'),
+        TeamMember.name.label('team_member_name'),
+        TeamMember.job_role,
+        Project.id.label('project_id'),
+        Project.name.label('project_name'),
+        Project.status,
+        project_team_members.c.role,
+        payment_totals.c.payment_count,
+        payment_totals.c.total_amount,
+        payment_totals.c.paid_amount
+    ).outerjoin(
+        project_team_members, project_team_members.c.team_member_id == TeamMember.id
+    ).outerjoin(
+        Project, db.and_(Project.id == project_team_members.c.project_id, *live(Project))
+    ).outerjoin(
+        payment_totals, payment_totals.c.project_id == Project.id
+    )
+    if member_ids is not None:
+        query = query.filter(TeamMember.id.in_(member_ids))
+    rows = query.order_by(TeamMember.id, Project.id).all()
+
+    summaries = {}
+    for row in rows:
+        summary = summaries.get(row.team_member_id)
+        if summary is None:
+            summary = summaries[row.team_member_id] = {
+                'id': row.team_member_id,
+                'name': row.team_member_name,
+                'job_role': row.job_role,
+                'project_count': 0,
+                'projects_by_status': {},
+                'total_amount': Decimal('0'),
+                'paid_amount': Decimal('0'),
+                'pending_amount': Decimal('0'),
+                'projects': []
+            }
+        if row.project_id is None:
+            continue
+
+        total = row.total_amount or Decimal('0')
+        paid = row.paid_amount or Decimal('0')
+        summary['project_count'] += 1
+        summary['projects_by_status'][row.status] = summary['projects_by_status'].get(row.status, 0) + 1
+        summary['total_amount'] += total
+        summary['paid_amount'] += paid
+        summary['pending_amount'] += total - paid
+        summary['projects'].append({
+            'id': row.project_id,
+            'name': row.project_name,
+            'status': row.status,
+            'role': row.role,
+            'payment_count': row.payment_count or 0,
+            'total_amount': format_value(total),
+            'paid_amount': format_value(paid),
+            'pending_amount': format_value(total - paid)
+        })
 
-#-----------------------Project Details Backend-------------------------------#
+    for summary in summaries.values():
+        for key in ('total_amount', 'paid_amount', 'pending_amount'):
+            summary[key] = format_value(summary[key])
+    return list(summaries.values())
 
-#Get All Project Details
-@app.route('/api/projects', methods=['GET'])
-def get_projects():
+# Workload summary of every team member (or of ?ids=1,2,3) in one request
+@api.route('/api/teams/summary', methods=['GET'])
+def get_team_summaries():
     try:
-        projects = Project.query.all()  # Fetch all projects
-        projects_list = []
-
-        for project in projects:
-            project_dict = {
-                'id': project.id,
-                'name': project.name,
-                'client_id': project.client_id,
-                'client_name': project.client.name,
-                'description': project.description,
-                'start_date': project.start_date.strftime('%Y-%m-%d') if project.start_date else None,
-                'end_date': project.end_date.strftime('%Y-%m-%d') if project.end_date else None,
-                'status': project.status,
-                'team_members': []
-            }
+        member_ids = None
+        if request.args.get('ids'):
+            try:
+                member_ids = [int(value) for value in request.args['ids'].split(',')]
+            except ValueError:
+                raise ValueError('ids must be a comma separated list of integers')
 
-            # Fetch team members and their roles for the project
-            for team_member in project.team_members:
-                # Query the role from the association table
-                role = db.session.query(project_team_members.c.role).filter_by(
-                    project_id=project.id,
-                    team_member_id=team_member.id
-                ).scalar()
-
-                project_dict['team_members'].append({
-                    'id': team_member.id,
-                    'name': team_member.name,
-                    'role': role  # Include the role
-                })
+        return jsonify({
+            'team_members': team_summaries(member_ids),
+            'status': 'success'
+        })
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error fetching team summaries: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
 
-            projects_list.append(project_dict)
+# Workload summary of one team member
+@api.route('/api/teams/<int:id>/summary', methods=['GET'])
+def get_team_summary(id):
+    try:
+        summaries = team_summaries([id])
+        if not summaries:
+            return jsonify({'message': 'Team member not found', 'status': 'error'}), 404
 
         return jsonify({
-            'projects': projects_list,
+            'team_member': summaries[0],
             'status': 'success'
         })
+    except Exception as e:
+        print(f"Error fetching team summary: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+#=================================================================================================================#
+
+#-----------------------Project Details Backend-------------------------------#
+
+# Fetch team members with their association roles for a set of projects in a
+# single query, grouped by project id
+def team_members_by_project(project_ids):
+    members = {project_id: [] for project_id in project_ids}
+    if not members:
+        return members
+
+    rows = db.session.query(
+        project_team_members.c.project_id,
+        TeamMember.id,
+        TeamMember.name,
+        project_team_members.c.role
+    ).join(
+        TeamMember, TeamMember.id == project_team_members.c.team_member_id
+    ).filter(
+        project_team_members.c.project_id.in_(members.keys())
+    ).order_by(
+        project_team_members.c.project_id, TeamMember.id
+    ).all()
+
+    for row in rows:
+        members[row.project_id].append({
+            'id': row.id,
+            'name': row.name,
+            'role': row.role
+        })
+    return members
+
+# Make a project's roster match the given members (validated with
+# TEAM_ASSIGNMENT_SCHEMA) with one lookup of the member ids and at most one DELETE and one INSERT on the association table.
+# Members keep their current role unless a new one is given. Unknown member
+# ids are skipped and returned.
+def replace_project_team(project_id, members):
+    wanted = {}
+    for member in members:
+        wanted[member['team_member_id']] = member['role']
+
+    existing_ids = {
+        row.id for row in db.session.query(TeamMember.id).filter(TeamMember.id.in_(wanted.keys()))
+    } if wanted else set()
+    unknown_ids = sorted(set(wanted) - existing_ids)
+
+    current = dict(db.session.query(
+        project_team_members.c.team_member_id, project_team_members.c.role
+    ).filter(project_team_members.c.project_id == project_id).all())
+
+    roster = {
+        member_id: wanted[member_id] or current.get(member_id) or 'Member'
+        for member_id in existing_ids
+    }
+    # Rows whose role changed are replaced along with the removed ones
+    to_delete = [
+        member_id for member_id, role in current.items()
+        if roster.get(member_id) != role
+    ]
+    to_insert = [
+        {'project_id': project_id, 'team_member_id': member_id, 'role': role}
+        for member_id, role in roster.items()
+        if current.get(member_id) != role
+    ]
+
+    if to_delete:
+        db.session.execute(project_team_members.delete().where(
+            project_team_members.c.project_id == project_id,
+            project_team_members.c.team_member_id.in_(to_delete)
+        ))
+    if to_insert:
+        db.session.execute(project_team_members.insert(), to_insert)
+    return unknown_ids
+
+#Get All Project Details
+PROJECT_COLUMNS = {
+    'id': Project.id,
+    'name': Project.name,
+    'client_id': Project.client_id,
+    'client_name': Client.name,
+    'description': Project.description,
+    'start_date': Project.start_date,
+    'end_date': Project.end_date,
+    'status': Project.status,
+    'version': Project.version
+}
+PROJECT_SERIALIZER = ModelSerializer(PROJECT_COLUMNS)
+
+PROJECT_SCHEMA = Schema(
+    name=text(100),
+    client_id=integer(),
+    description=text(65535, required=False),
+    start_date=iso_date(required=False),
+    end_date=iso_date(required=False),
+    status=text(50, required=False, default='Ongoing'),
+)
+
+TEAM_ASSIGNMENT_SCHEMA = Schema(
+    team_member_id=integer(),
+    role=text(50, required=False),
+)
+
+# Project fields plus the optional team_members list of a project body
+def project_values():
+    values, errors = request_values(PROJECT_SCHEMA)
+    members, member_errors = TEAM_ASSIGNMENT_SCHEMA.validate_many(request.get_json().get('team_members') or [])
+    if member_errors:
+        errors['team_members'] = member_errors.get('_body', member_errors)
+    if not errors:
+        errors = missing_references(values)
+    return values, members, errors
+
+# Base query for project listings and exports with the request's filters applied
+def projects_query(fields):
+    query = db.session.query(Project).filter(*live(Project))
+    if 'client_name' in fields:
+        query = query.join(Client, Project.client_id == Client.id)
+    if request.args.get('status'):
+        query = query.filter(Project.status == request.args['status'])
+    client_id = int_arg('client_id')
+    if client_id is not None:
+        query = query.filter(Project.client_id == client_id)
+    start_from, start_to = date_arg('start_date_from'), date_arg('start_date_to')
+    if start_from:
+        query = query.filter(Project.start_date >= start_from)
+    if start_to:
+        query = query.filter(Project.start_date <= start_to)
+    return query
+
+@api.route('/api/projects', methods=['GET'])
+def get_projects():
+    try:
+        fields = selected_fields(list(PROJECT_COLUMNS) + ['team_members'])
+        query = projects_query(fields)
+
+        # Clients come back in the page query and all team members in one more
+        projects, next_cursor = keyset_page(query, PROJECT_COLUMNS, fields, ['id'])
+        members = {}
+        if 'team_members' in fields:
+            members = team_members_by_project([project.id for project in projects])
+
+        serialize = PROJECT_SERIALIZER.for_fields([field for field in fields if field != 'team_members'])
+        projects_list = [serialize(project) for project in projects]
+        if 'team_members' in fields:
+            for project, project_dict in zip(projects, projects_list):
+                project_dict['team_members'] = members[project.id]
+
+        return page_response('projects', projects_list, next_cursor, query)
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error fetching projects: {e}")
         return jsonify({
@@ -338,34 +1689,48 @@ def get_projects():
             'status': 'error'
         })
 
+#Export all projects as NDJSON or CSV
+@api.route('/api/projects/export', methods=['GET'])
+def export_projects():
+    try:
+        fields = selected_fields(PROJECT_COLUMNS)
+        return export_response(projects_query(fields), PROJECT_SERIALIZER, fields, [Project.id], 'projects')
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error exporting projects: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
 #Add a New Project
-@app.route('/api/projects', methods=['POST'])
+@api.route('/api/projects', methods=['POST'])
+@idempotent
 def add_project():
     try:
-        project_data = request.json
-        new_project = Project(
-            name=project_data.get('name'),
-            client_id=project_data.get('client_id'),
-            description=project_data.get('description'),
-            start_date=datetime.strptime(project_data.get('start_date'), '%Y-%m-%d') if project_data.get('start_date') else None,
-            end_date=datetime.strptime(project_data.get('end_date'), '%Y-%m-%d') if project_data.get('end_date') else None,
-            status=project_data.get('status', 'Ongoing')
-        )
+        values, members, errors = project_values()
+        if errors:
+            return invalid_fields(errors)
+        new_project = Project(**values)
         db.session.add(new_project)
-        db.session.commit()
+        db.session.flush()
 
         # Add team members to the project
-        for member in project_data.get('team_members', []):
-            team_member = TeamMember.query.get(member['team_member_id'])
-            if team_member:
-                new_project.team_members.append(team_member)
-        db.session.commit()
-
-        return jsonify({
+        replace_project_team(new_project.id, members)
+        bump_dashboard_totals(total_projects=1)
+        record_change('projects', new_project.id)
+        after_commit(invalidate_cached, 'projects')
+        index_after_commit('project', new_project)
+        commit_write()
+
+        return created_response({
             'message': 'Project added successfully', 
             'project_id': new_project.id, 
             'status': 'success'
-        })
+        }, f'/api/projects/{new_project.id}', new_project.version)
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error adding project: {e}")
         return jsonify({
@@ -374,34 +1739,42 @@ def add_project():
         })
 
 #Update a Project
-@app.route('/api/projects/<int:id>', methods=['PUT'])
+@api.route('/api/projects/<int:id>', methods=['PUT'])
 def update_project(id):
     try:
-        project_data = request.json
-        project = Project.query.get(id)
+        values, members, errors = project_values()
+        if errors:
+            return invalid_fields(errors)
+        project = get_live(Project, id)
         if not project:
             return jsonify({'message': 'Project not found', 'status': 'error'}), 404
+        if not version_matches(project.version):
+            return precondition_failed(project.version)
+        renamed = values['name'] != project.name
 
         # Update project fields
-        project.name = project_data.get('name')
-        project.client_id = project_data.get('client_id')
-        project.description = project_data.get('description')
-        project.start_date = datetime.strptime(project_data.get('start_date'), '%Y-%m-%d') if project_data.get('start_date') else None
-        project.end_date = datetime.strptime(project_data.get('end_date'), '%Y-%m-%d') if project_data.get('end_date') else None
-        project.status = project_data.get('status')
+        for name, value in values.items():
+            setattr(project, name, value)
 
         # Update team members
-        project.team_members = []  # Clear existing team members
-        for member in project_data.get('team_members', []):
-            team_member = TeamMember.query.get(member['team_member_id'])
-            if team_member:
-                project.team_members.append(team_member)
+        replace_project_team(project.id, members)
+        db.session.flush()
+        version = project.version
+        record_change('projects', project.id)
+        if renamed:
+            record_project_renamed(project.id)
         db.session.commit()
+        invalidate_cached('projects')
+        index_for_search('project', project)
 
-        return jsonify({
+        return versioned_response({
             'message': 'Project updated successfully', 
             'status': 'success'
-        })
+        }, version)
+    except ValueError as e:
+        return bad_request(e)
+    except StaleDataError:
+        return write_conflict()
     except Exception as e:
         print(f"Error updating project: {e}")
         return jsonify({
@@ -410,15 +1783,21 @@ def update_project(id):
         })
 
 #Delete a Project
-@app.route('/api/projects/<int:id>', methods=['DELETE'])
+@api.route('/api/projects/<int:id>', methods=['DELETE'])
 def delete_project(id):
     try:
-        project = Project.query.get(id)
+        project = get_live(Project, id)
         if not project:
             return jsonify({'message': 'Project not found', 'status': 'error'}), 404
 
-        db.session.delete(project)
+        # Soft delete: payments and team rows keep pointing at the project
+        # until the archive job moves them out with it
+        project.deleted_at = datetime.utcnow()
+        bump_dashboard_totals(total_projects=-1)
+        record_change('projects', id, CHANGE_DELETE, client_id=project.client_id)
         db.session.commit()
+        invalidate_cached('projects')
+        unindex_for_search('project', id)
         return jsonify({
             'message': 'Project deleted successfully', 
             'status': 'success'
@@ -430,16 +1809,49 @@ def delete_project(id):
             'status': 'error'
         })
 
+#Replace the whole team of a project
+@api.route('/api/projects/<int:project_id>/team', methods=['PUT'])
+def replace_team_members(project_id):
+    try:
+        data = request.get_json(silent=True)
+        members, errors = TEAM_ASSIGNMENT_SCHEMA.validate_many(
+            data.get('team_members', []) if isinstance(data, dict) else data
+        )
+        if errors:
+            return invalid_fields(errors)
+        if not db.session.query(Project.id).filter(Project.id == project_id, *live(Project)).first():
+            return jsonify({'message': 'Project not found', 'status': 'error'}), 404
+
+        unknown_ids = replace_project_team(project_id, members)
+        record_change('projects', project_id)
+        db.session.commit()
+
+        return jsonify({
+            'message': 'Project team updated successfully',
+            'team_members': team_members_by_project([project_id])[project_id],
+            'unknown_team_member_ids': unknown_ids,
+            'status': 'success'
+        })
+    except Exception as e:
+        print(f"Error updating project team: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
 #Assign Team Member to Projects
-@app.route('/api/projects/<int:project_id>/team', methods=['POST'])
+@api.route('/api/projects/<int:project_id>/team', methods=['POST'])
+@idempotent
 def assign_team_member(project_id):
     try:
-        data = request.json
-        project = Project.query.get(project_id)
+        values, errors = request_values(TEAM_ASSIGNMENT_SCHEMA)
+        if errors:
+            return invalid_fields(errors)
+        project = get_live(Project, project_id)
         if not project:
             return jsonify({'message': 'Project not found', 'status': 'error'}), 404
 
-        team_member = TeamMember.query.get(data.get('team_member_id'))
+        team_member = db.session.get(TeamMember, values['team_member_id'])
         if not team_member:
             return jsonify({'message': 'Team member not found', 'status': 'error'}), 404
 
@@ -449,33 +1861,26 @@ def assign_team_member(project_id):
 
         
         # Assign team member with default role if not provided
-        role = data.get('role', 'Member')  # Default to 'Member' if role is not provided
+        role = values['role'] or 'Member'  # Default to 'Member' if role is not provided
         db.session.execute(project_team_members.insert().values(
             project_id=project.id,
             team_member_id=team_member.id,
             role=role
         ))
-        db.session.commit()
+        record_change('projects', project.id)
+        commit_write()
 
         
         # Fetch updated team members for the project
-        updated_team_members = [
-            {
-                'id': member.id,
-                'name': member.name,
-                'role': db.session.query(project_team_members.c.role).filter_by(
-                    project_id=project.id,
-                    team_member_id=member.id
-                ).scalar()
-            }
-            for member in project.team_members
-        ]
+        updated_team_members = team_members_by_project([project.id])[project.id]
        
         return jsonify({
             'message': 'Team member assigned to project successfully',
             'team_members': updated_team_members,
             'status': 'success'
         })
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error assigning team member: {e}")
         return jsonify({
@@ -484,14 +1889,14 @@ def assign_team_member(project_id):
         })
 
 #Remove Team Member from Project
-@app.route('/api/projects/<int:project_id>/team/<int:team_member_id>', methods=['DELETE'])
+@api.route('/api/projects/<int:project_id>/team/<int:team_member_id>', methods=['DELETE'])
 def remove_team_member(project_id, team_member_id):
     try:
-        project = Project.query.get(project_id)
+        project = get_live(Project, project_id)
         if not project:
             return jsonify({'message': 'Project not found', 'status': 'error'}), 404
 
-        team_member = TeamMember.query.get(team_member_id)
+        team_member = db.session.get(TeamMember, team_member_id)
         if not team_member:
             return jsonify({'message': 'Team member not found', 'status': 'error'}), 404
 
@@ -499,6 +1904,7 @@ def remove_team_member(project_id, team_member_id):
             return jsonify({'message': 'Team member not assigned to this project', 'status': 'error'}), 404
 
         project.team_members.remove(team_member)
+        record_change('projects', project.id)
         db.session.commit()
         return jsonify({
             'message': 'Team member removed from project successfully', 
@@ -516,40 +1922,90 @@ def remove_team_member(project_id, team_member_id):
 #------------------------Payments Details Backend-----------------------#
 
 #Get all payments with clients and project Name
-@app.route('/api/payments', methods=['GET'])
+PAYMENT_COLUMNS = {
+    'id': Payment.id,
+    'client_id': Payment.client_id,
+    'project_id': Payment.project_id,
+    'total_amount': Payment.total_amount,
+    'paid_amount': Payment.paid_amount,
+    'pending_amount': Payment.total_amount - Payment.paid_amount,
+    'payment_date': Payment.payment_date,
+    'client_name': Client.name,
+    'project_name': Project.name,
+    'version': Payment.version
+}
+PAYMENT_SERIALIZER = ModelSerializer(PAYMENT_COLUMNS)
+
+PAYMENT_SCHEMA = Schema(
+    client_id=integer(),
+    project_id=integer(),
+    total_amount=money(),
+    paid_amount=money(required=False, default=Decimal('0.00')),
+    payment_date=iso_date(),
+)
+
+def payment_values():
+    values, errors = request_values(PAYMENT_SCHEMA)
+    return values, errors or missing_references(values)
+
+# Base query for payment listings, exports and reports: the client/project
+# joins are only added when their names are selected. Payments of
+# soft-deleted clients and projects are included on purpose (see live()).
+def payments_query(fields):
+    query = db.session.query(Payment)
+    if 'client_name' in fields:
+        query = query.join(Client, Payment.client_id == Client.id)
+    if 'project_name' in fields:
+        query = query.join(Project, Payment.project_id == Project.id)
+    client_id, project_id = int_arg('client_id'), int_arg('project_id')
+    if client_id is not None:
+        query = query.filter(Payment.client_id == client_id)
+    if project_id is not None:
+        query = query.filter(Payment.project_id == project_id)
+    date_from, date_to = date_arg('date_from'), date_arg('date_to')
+    if date_from:
+        query = query.filter(Payment.payment_date >= date_from)
+    if date_to:
+        query = query.filter(Payment.payment_date <= date_to)
+    return query
+
+@api.route('/api/payments', methods=['GET'])
 def get_payments():
     try:
-        payments = Payment.query.join(Client, Payment.client_id == Client.id) \
-                                .join(Project, Payment.project_id == Project.id) \
-                                .add_columns(
-                                    Payment.id,
-                                    Payment.total_amount,
-                                    Payment.paid_amount,
-                                    Payment.payment_date,
-                                    Client.name.label('client_name'),
-                                    Project.name.label('project_name'),
-                                    (Payment.total_amount - Payment.paid_amount).label('pending_amount')
-                                ).order_by(Payment.payment_date.desc()).all()
-
-        payments_list = [
-            {
-                'id': payment.id,
-                'total_amount': payment.total_amount,
-                'paid_amount': payment.paid_amount,
-                'pending_amount': payment.pending_amount,
-                'payment_date': payment.payment_date.strftime('%Y-%m-%d'),
-                'client_name': payment.client_name,
-                'project_name': payment.project_name
-            }
-            for payment in payments
-        ]
+        fields = selected_fields(PAYMENT_COLUMNS)
+        query = payments_query(fields)
 
+        # Newest first, keyed on (payment_date, id) so pages are stable
+        payments, next_cursor = keyset_page(
+            query, PAYMENT_COLUMNS, fields, ['payment_date', 'id'], descending=True
+        )
+        serialize = PAYMENT_SERIALIZER.for_fields(fields)
+        payments_list = [serialize(payment) for payment in payments]
+
+        return page_response('payments', payments_list, next_cursor, query)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error fetching payments: {e}")
         return jsonify({
-            'payments': payments_list,
-            'status': 'success'
+            'error': str(e),
+            'status': 'error'
         })
+
+
+#Export the payment ledger as NDJSON or CSV
+@api.route('/api/payments/export', methods=['GET'])
+def export_payments():
+    try:
+        fields = selected_fields(PAYMENT_COLUMNS)
+        return export_response(
+            payments_query(fields), PAYMENT_SERIALIZER, fields,
+            [Payment.payment_date.desc(), Payment.id.desc()], 'payments'
+        )
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
-        print(f"Error fetching payments: {e}")
+        print(f"Error exporting payments: {e}")
         return jsonify({
             'error': str(e),
             'status': 'error'
@@ -557,17 +2013,11 @@ def get_payments():
 
 
 #Get Project by client ID
-@app.route('/api/projects-by-client/<int:client_id>', methods=['GET'])
+@api.route('/api/projects-by-client/<int:client_id>', methods=['GET'])
 def get_projects_by_client(client_id):
     try:
-        projects = Project.query.filter_by(client_id=client_id).order_by(Project.name).all()
-        projects_list = [
-            {
-                'id': project.id,
-                'name': project.name
-            }
-            for project in projects
-        ]
+        projects = db.session.query(Project.id, Project.name).filter(Project.client_id == client_id, *live(Project)).order_by(Project.name).all()
+        projects_list = [{'id': project.id, 'name': project.name} for project in projects]
         return jsonify({
             'projects': projects_list,
             'status': 'success'
@@ -580,25 +2030,28 @@ def get_projects_by_client(client_id):
         })
 
 #Create a New paymnets
-@app.route('/api/payments', methods=['POST'])
+@api.route('/api/payments', methods=['POST'])
+@idempotent
 def create_payment():
     try:
-        data = request.json
-        new_payment = Payment(
-            client_id=data.get('client_id'),
-            project_id=data.get('project_id'),
-            total_amount=data.get('total_amount'),
-            paid_amount=data.get('paid_amount', 0),
-            payment_date=datetime.strptime(data.get('payment_date'), '%Y-%m-%d')
-        )
+        values, errors = payment_values()
+        if errors:
+            return invalid_fields(errors)
+        new_payment = Payment(**values)
         db.session.add(new_payment)
-        db.session.commit()
+        total, pending = payment_amounts(new_payment)
+        bump_dashboard_totals(total_payments=1, total_amount=total, pending_amount=pending)
+        record_change('payments', new_payment.id)
+        queue_event('payments', payment_event('created', new_payment.id, **payment_event_fields(new_payment)))
+        commit_write()
 
-        return jsonify({
+        return created_response({
             'message': 'Payment created successfully',
             'payment_id': new_payment.id,
             'status': 'success'
-        })
+        }, f'/api/payments/{new_payment.id}', new_payment.version)
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
         print(f"Error creating payment: {e}")
         return jsonify({
@@ -608,26 +2061,41 @@ def create_payment():
 
 #Update a Paymnets
 
-@app.route('/api/payments/<int:id>', methods=['PUT'])
+@api.route('/api/payments/<int:id>', methods=['PUT'])
 def update_payment(id):
     try:
-        data = request.json
-        payment = Payment.query.get(id)
+        values, errors = payment_values()
+        if errors:
+            return invalid_fields(errors)
+        payment = db.session.get(Payment, id)
         if not payment:
             return jsonify({'message': 'Payment not found', 'status': 'error'}), 404
+        if not version_matches(payment.version):
+            return precondition_failed(payment.version)
 
-        # Update payment fields
-        payment.client_id = data.get('client_id')
-        payment.project_id = data.get('project_id')
-        payment.total_amount = data.get('total_amount')
-        payment.paid_amount = data.get('paid_amount', 0)
-        payment.payment_date = datetime.strptime(data.get('payment_date'), '%Y-%m-%d')
+        old_total, old_pending = payment_amounts(payment)
+        old_references = {'client_id': payment.client_id, 'project_id': payment.project_id}
 
+        # Update payment fields
+        for name, value in values.items():
+            setattr(payment, name, value)
+
+        total, pending = payment_amounts(payment)
+        bump_dashboard_totals(total_amount=total - old_total, pending_amount=pending - old_pending)
+        moved_from = moved_payment_references(old_references, payment.client_id, payment.project_id)
+        db.session.flush()
+        version = payment.version
+        record_change('payments', payment.id, **moved_from)
+        queue_event('payments', payment_event('updated', payment.id, **payment_event_fields(payment)))
         db.session.commit()
-        return jsonify({
+        return versioned_response({
             'message': 'Payment updated successfully',
             'status': 'success'
-        })
+        }, version)
+    except ValueError as e:
+        return bad_request(e)
+    except StaleDataError:
+        return write_conflict()
     except Exception as e:
         print(f"Error updating payment: {e}")
         return jsonify({
@@ -636,14 +2104,18 @@ def update_payment(id):
         })
 
 #Delete a Paymnets
-@app.route('/api/payments/<int:id>', methods=['DELETE'])
+@api.route('/api/payments/<int:id>', methods=['DELETE'])
 def delete_payment(id):
     try:
-        payment = Payment.query.get(id)
+        payment = db.session.get(Payment, id)
         if not payment:
             return jsonify({'message': 'Payment not found', 'status': 'error'}), 404
 
+        total, pending = payment_amounts(payment)
         db.session.delete(payment)
+        bump_dashboard_totals(total_payments=-1, total_amount=-total, pending_amount=-pending)
+        record_change('payments', id, CHANGE_DELETE, client_id=payment.client_id, project_id=payment.project_id)
+        queue_event('payments', payment_event('deleted', id, client_id=payment.client_id, project_id=payment.project_id))
         db.session.commit()
         return jsonify({
             'message': 'Payment deleted successfully',
@@ -659,25 +2131,359 @@ def delete_payment(id):
 
 #=============================================================================================================================#
 
+#------------------Bulk Import Backend-------------------------------#
+
+BULK_CHUNK_SIZE = 1000
+
+# Schema per importable entity
+BULK_IMPORT_SCHEMAS = {
+    'clients': CLIENT_SCHEMA,
+    'team_members': TEAM_SCHEMA,
+    'payments': PAYMENT_SCHEMA,
+}
+
+# Search kind of the importable entities that are searchable
+BULK_SEARCH_KINDS = {
+    'clients': 'client',
+    'team_members': 'team_member',
+}
+
+# Rows come either as a JSON array (optionally wrapped in {"rows": [...]})
+# or as an uploaded CSV file whose header names the fields
+def bulk_rows():
+    if 'file' in request.files:
+        text = io.TextIOWrapper(request.files['file'].stream, encoding='utf-8-sig')
+        return [
+            {key: value for key, value in row.items() if value not in ('', None)}
+            for row in csv.DictReader(text)
+        ]
+
+    data = request.get_json(silent=True)
+    if isinstance(data, dict):
+        data = data.get('rows')
+    if not isinstance(data, list):
+        raise ValueError('Expected a JSON array of rows or a CSV file upload')
+    return data
+
+# Payment rows also need their client and project to exist; check a whole
+# chunk with one IN query per table
+def check_payment_references(chunk, errors):
+    client_ids = {values['client_id'] for _, values in chunk}
+    project_ids = {values['project_id'] for _, values in chunk}
+    known_clients = {row.id for row in db.session.query(Client.id).filter(Client.id.in_(client_ids), *live(Client))}
+    known_projects = {row.id for row in db.session.query(Project.id).filter(Project.id.in_(project_ids), *live(Project))}
+
+    valid = []
+    for index, values in chunk:
+        row_errors = {}
+        if values['client_id'] not in known_clients:
+            row_errors['client_id'] = 'client does not exist'
+        if values['project_id'] not in known_projects:
+            row_errors['project_id'] = 'project does not exist'
+        if row_errors:
+            errors.append({'row': index, 'errors': row_errors})
+        else:
+            valid.append((index, values))
+    return valid
+
+def dashboard_deltas(entity, rows):
+    if entity == 'clients':
+        return {'total_clients': len(rows)}
+    if entity == 'team_members':
+        return {'total_team_members': len(rows)}
+    total = sum(row['total_amount'] for row in rows)
+    paid = sum(row['paid_amount'] for row in rows)
+    return {'total_payments': len(rows), 'total_amount': total, 'pending_amount': total - paid}
+
+# Validate every row, then insert the valid ones with one executemany per
+# chunk. Each chunk runs in a savepoint, so a failing chunk is undone alone,
+# and is committed on its own unless the request is under @idempotent, where
+# the wrapper commits every chunk with the stored response.
+def bulk_import(entity, model):
+    rows = bulk_rows()
+    schema = BULK_IMPORT_SCHEMAS[entity]
+    errors, inserted = [], 0
+
+    for start in range(0, len(rows), BULK_CHUNK_SIZE):
+        chunk = []
+        for index, row in enumerate(rows[start:start + BULK_CHUNK_SIZE], start):
+            values, row_errors = schema.validate(row)
+            if row_errors:
+                errors.append({'row': index, 'errors': row_errors})
+            else:
+                chunk.append((index, values))
+
+        if chunk and entity == 'payments':
+            chunk = check_payment_references(chunk, errors)
+        if not chunk:
+            continue
+
+        mappings = [values for _, values in chunk]
+        try:
+            with db.session.begin_nested():
+                after_id = db.session.query(db.func.max(model.id)).scalar() or 0
+                db.session.execute(db.insert(model), mappings)
+                record_inserted_changes(entity, model, after_id)
+        except Exception as e:
+            errors.extend({'row': index, 'errors': {'_database': str(e)}} for index, _ in chunk)
+            continue
+
+        bump_dashboard_totals(**dashboard_deltas(entity, mappings))
+        if entity == 'payments':
+            queue_event('payments', {'op': 'imported', 'count': len(mappings)})
+        if entity in BULK_SEARCH_KINDS:
+            after_commit(invalidate_cached, entity)
+            index_inserted_for_search(BULK_SEARCH_KINDS[entity], after_id)
+        commit_write()
+        inserted += len(mappings)
+
+    errors.sort(key=lambda error: error['row'])
+    return jsonify({
+        'inserted': inserted,
+        'failed': len(errors),
+        'errors': errors,
+        'status': 'success' if not errors else 'partial'
+    })
+
+#Bulk import clients
+@api.route('/api/clients/bulk', methods=['POST'])
+@idempotent
+def bulk_import_clients():
+    try:
+        return bulk_import('clients', Client)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error importing clients: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+#Bulk import team members
+@api.route('/api/teams/bulk', methods=['POST'])
+@idempotent
+def bulk_import_teams():
+    try:
+        return bulk_import('team_members', TeamMember)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error importing team members: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+#Bulk import payments
+@api.route('/api/payments/bulk', methods=['POST'])
+@idempotent
+def bulk_import_payments():
+    try:
+        return bulk_import('payments', Payment)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error importing payments: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+
+#=============================================================================================================================#
+
+#------------------Partial Update Backend-------------------------------#
+
+# PATCH changes only the fields present in the body, with one
+# UPDATE ... SET ..., version = version + 1 WHERE id = ? [AND version IN (If-Match)]
+# and no read of the row beforehand. Fields are parsed with the entity's schema.
+PATCH_SCHEMAS = {
+    'clients': CLIENT_SCHEMA,
+    'projects': PROJECT_SCHEMA,
+    'payments': PAYMENT_SCHEMA,
+}
+
+def patch_values(entity):
+    values, errors = request_values(PATCH_SCHEMAS[entity], partial=True)
+    return values, errors or missing_references(values)
+
+# Returns the row's new version, or None when no row matched (missing, or
+# If-Match named another version). Databases without UPDATE ... RETURNING
+# read the version back by primary key.
+def conditional_update(model, id, values):
+    statement = db.update(model).where(model.id == id, *live(model)).values(**values, version=model.version + 1)
+    versions = expected_versions()
+    if versions is not None:
+        statement = statement.where(model.version.in_(versions))
+
+    options = {'synchronize_session': False}
+    if db.engine.dialect.update_returning:
+        return db.session.execute(statement.returning(model.version), execution_options=options).scalar()
+    if db.session.execute(statement, execution_options=options).rowcount == 0:
+        return None
+    return db.session.query(model.version).filter(model.id == id).scalar()
+
+def patch_failed(model, id, label):
+    db.session.rollback()
+    version = db.session.query(model.version).filter(model.id == id, *live(model)).scalar()
+    if version is None:
+        return jsonify({'message': f'{label} not found', 'status': 'error'}), 404
+    return precondition_failed(version)
+
+# Move the dashboard amounts by what a payment patch changes. The old amounts
+# are read by the same UPDATE, before the payment row itself is updated; if
+# that update then matches nothing the transaction is rolled back. Returns
+# False when the dashboard row doesn't exist yet.
+def patch_payment_totals(id, values):
+    condition = [Payment.id == id]
+    versions = expected_versions()
+    if versions is not None:
+        condition.append(Payment.version.in_(versions))
+
+    def current(column):
+        return db.select(column).where(*condition).scalar_subquery()
+
+    def patched(name, column):
+        if name in values:
+            return db.literal(values[name], column.type)
+        return current(column)
+
+    old_total, old_paid = current(Payment.total_amount), current(Payment.paid_amount)
+    new_total, new_paid = patched('total_amount', Payment.total_amount), patched('paid_amount', Payment.paid_amount)
+    result = db.session.execute(
+        db.update(DashboardTotals).where(DashboardTotals.id == DASHBOARD_TOTALS_ID).values(
+            total_amount=DashboardTotals.total_amount + db.func.coalesce(new_total - old_total, 0),
+            pending_amount=DashboardTotals.pending_amount + db.func.coalesce(
+                (new_total - new_paid) - (old_total - old_paid), 0
+            )
+        )
+    )
+    return result.rowcount > 0
+
+#Patch a client
+@api.route('/api/clients/<int:id>', methods=['PATCH'])
+def patch_client(id):
+    try:
+        values, errors = patch_values('clients')
+        if errors:
+            return invalid_fields(errors)
+
+        version = conditional_update(Client, id, values)
+        if version is None:
+            return patch_failed(Client, id, 'Client')
+        record_change('clients', id)
+        if 'name' in values:
+            record_client_renamed(id)
+        db.session.commit()
+        invalidate_cached('clients')
+        refresh_search_document('client', id)
+        return versioned_response({
+            'message': 'Client updated successfully',
+            'status': 'success'
+        }, version)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error patching client: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+#Patch a project
+@api.route('/api/projects/<int:id>', methods=['PATCH'])
+def patch_project(id):
+    try:
+        values, errors = patch_values('projects')
+        if errors:
+            return invalid_fields(errors)
+
+        version = conditional_update(Project, id, values)
+        if version is None:
+            return patch_failed(Project, id, 'Project')
+        record_change('projects', id)
+        if 'name' in values:
+            record_project_renamed(id)
+        db.session.commit()
+        invalidate_cached('projects')
+        refresh_search_document('project', id)
+        return versioned_response({
+            'message': 'Project updated successfully',
+            'status': 'success'
+        }, version)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error patching project: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+#Patch a payment
+@api.route('/api/payments/<int:id>', methods=['PATCH'])
+def patch_payment(id):
+    try:
+        values, errors = patch_values('payments')
+        if errors:
+            return invalid_fields(errors)
+
+        # Moving a payment to another client or project is rare enough to
+        # afford reading its current references for the change log
+        moved_from = {}
+        if 'client_id' in values or 'project_id' in values:
+            current = db.session.query(Payment.client_id, Payment.project_id).filter(Payment.id == id).first()
+            if current is not None:
+                moved_from = moved_payment_references(
+                    current._asdict(), values.get('client_id', current.client_id),
+                    values.get('project_id', current.project_id)
+                )
+
+        totals_updated = False
+        if 'total_amount' in values or 'paid_amount' in values:
+            totals_updated = patch_payment_totals(id, values)
+        version = conditional_update(Payment, id, values)
+        if version is None:
+            return patch_failed(Payment, id, 'Payment')
+        if totals_updated:
+            # The amounts moved inside the database, so listeners get the new
+            # totals rather than deltas
+            db.session.flush()
+            totals = db.session.get(DashboardTotals, DASHBOARD_TOTALS_ID, populate_existing=True)
+            queue_event('dashboard', dashboard_snapshot(totals))
+        record_change('payments', id, **moved_from)
+        queue_event('payments', payment_event('patched', id, **values))
+        db.session.commit()
+        return versioned_response({
+            'message': 'Payment updated successfully',
+            'status': 'success'
+        }, version)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error patching payment: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+#=============================================================================================================================#
+
 #------------------Drop Down Backend-------------------------------#
 
 #Get all Clients for DropDown
 
-@app.route('/api/clients-dropdown', methods=['GET'])
+@api.route('/api/clients-dropdown', methods=['GET'])
 def get_clients_dropdown():
     try:
-        clients = Client.query.order_by(Client.name).all()  # Fetch all clients ordered by name
-        clients_list = [
-            {
-                'id': client.id,
-                'name': client.name
+        def build():
+            clients = db.session.query(Client.id, Client.name).filter(*live(Client)).order_by(Client.name).all()  # Fetch all clients ordered by name
+            return {
+                'clients': [{'id': client.id, 'name': client.name} for client in clients],
+                'status': 'success'
             }
-            for client in clients
-        ]
-        return jsonify({
-            'clients': clients_list,
-            'status': 'success'
-        })
+        return cached_json_response('clients', build)
     except Exception as e:
         print(f"Error fetching clients: {e}")  # Debugging log
         return jsonify({
@@ -687,21 +2493,16 @@ def get_clients_dropdown():
 
 #Get All Team Members for Dropdown
 
-@app.route('/api/team-members', methods=['GET'])
+@api.route('/api/team-members', methods=['GET'])
 def get_team_members():
     try:
-        team_members = TeamMember.query.order_by(TeamMember.name).all()  # Fetch all team members ordered by name
-        team_members_list = [
-            {
-                'id': member.id,
-                'name': member.name
+        def build():
+            team_members = db.session.query(TeamMember.id, TeamMember.name).order_by(TeamMember.name).all()  # Fetch all team members ordered by name
+            return {
+                'team_members': [{'id': member.id, 'name': member.name} for member in team_members],
+                'status': 'success'
             }
-            for member in team_members
-        ]
-        return jsonify({
-            'team_members': team_members_list,
-            'status': 'success'
-        })
+        return cached_json_response('team_members', build)
     except Exception as e:
         print(f"Error fetching team members: {e}")  # Debugging log
         return jsonify({
@@ -711,66 +2512,445 @@ def get_team_members():
 
 # Get Projects for Dropdown
 
-@app.route('/api/projects-dropdown', methods=['GET'])
+@api.route('/api/projects-dropdown', methods=['GET'])
 def get_projects_dropdown():
     try:
-        projects = Project.query.order_by(Project.name).all()
-        projects_list = [
-            {
-                'id': project.id,
-                'name': project.name
+        def build():
+            projects = db.session.query(Project.id, Project.name).filter(*live(Project)).order_by(Project.name).all()
+            return {
+                'projects': [{'id': project.id, 'name': project.name} for project in projects],
+                'status': 'success'
             }
-            for project in projects
-        ]
+        return cached_json_response('projects', build)
+    except Exception as e:
+        print(f"Error fetching projects: {e}")
         return jsonify({
-            'projects': projects_list,
+            'error': str(e),
+            'status': 'error'
+        })
+
+
+#========================================================================================================================#
+
+#----------------------Search Backend-----------------------------------------------#
+
+DEFAULT_SEARCH_LIMIT = 20
+MAX_SEARCH_LIMIT = 100
+
+# Search through MySQL FULLTEXT indexes in boolean mode; every term must
+# match, as a word or a word prefix. Relevance comes from MATCH() itself.
+def fulltext_statement(terms, kinds, limit):
+    against = ' '.join(f'+{term}*' for term in terms)
+    selects = []
+    for kind in kinds:
+        source = SEARCH_SOURCES[kind]
+        model = source['model']
+        relevance = mysql_match(*(getattr(model, name) for name in source['fields']), against=against).in_boolean_mode()
+        selects.append(db.select(
+            db.literal(kind).label('type'),
+            model.id.label('id'),
+            model.name.label('name'),
+            getattr(model, source['detail']).label('detail'),
+            relevance.label('score')
+        ).where(relevance > 0, *live(model)))
+
+    ranked = db.union_all(*selects).subquery()
+    return db.select(ranked).order_by(ranked.c.score.desc(), ranked.c.type, ranked.c.id).limit(limit)
+
+def fulltext_search(terms, kinds, limit):
+    rows = db.session.execute(fulltext_statement(terms, kinds, limit)).all()
+    return [{'type': row.type, 'id': row.id, 'name': row.name, 'detail': row.detail,
+             'score': round(float(row.score), 3)} for row in rows]
+
+def memory_search(query, kinds, limit):
+    return [
+        {'type': kind, 'id': id, 'name': document['name'],
+         'detail': document[SEARCH_SOURCES[kind]['detail']], 'score': score}
+        for score, kind, id, document in get_search_index().search(query, kinds, limit)
+    ]
+
+# Search clients, projects and team members by name and the other text
+# fields in SEARCH_SOURCES. ?type=client,project narrows the kinds.
+@api.route('/api/search', methods=['GET'])
+def search():
+    try:
+        query = request.args.get('q', '').strip()
+        if not query:
+            raise ValueError('q is required')
+        limit = max(1, min(int_arg('limit') or DEFAULT_SEARCH_LIMIT, MAX_SEARCH_LIMIT))
+        kinds = list(SEARCH_SOURCES)
+        if request.args.get('type'):
+            kinds = request.args['type'].split(',')
+            unknown = [kind for kind in kinds if kind not in SEARCH_SOURCES]
+            if unknown:
+                raise ValueError(f"Unknown type: {', '.join(unknown)}")
+
+        terms = tokenize(query)
+        if not terms:
+            results = []
+        elif uses_fulltext_search():
+            results = fulltext_search(terms, kinds, limit)
+        else:
+            results = memory_search(query, kinds, limit)
+
+        return jsonify({
+            'query': query,
+            'results': results,
             'status': 'success'
         })
+    except ValueError as e:
+        return bad_request(e)
     except Exception as e:
-        print(f"Error fetching projects: {e}")
+        print(f"Error searching: {e}")
         return jsonify({
             'error': str(e),
             'status': 'error'
         })
 
-
 #========================================================================================================================#
 
-#----------------------Dashboard Page-----------------------------------------------#
-#Dashboard page
-@app.route('/api/dashboard-data', methods=['GET'])
-def get_dashboard_data():
+#----------------------Change Feed Backend-----------------------------------------------#
+
+# Entities in the feed: model, list columns and serializer, plus the joins
+# the columns need. Rows look exactly like they do in the list endpoints.
+CHANGE_FEED_ENTITIES = {
+    'clients': (Client, CLIENT_COLUMNS, CLIENT_SERIALIZER, []),
+    'team_members': (TeamMember, TEAM_COLUMNS, TEAM_SERIALIZER, []),
+    'projects': (Project, PROJECT_COLUMNS, PROJECT_SERIALIZER, [(Client, Project.client_id == Client.id)]),
+    'payments': (Payment, PAYMENT_COLUMNS, PAYMENT_SERIALIZER, [
+        (Client, Payment.client_id == Client.id), (Project, Payment.project_id == Project.id)
+    ]),
+}
+
+# Current rows of one entity, by id, with one IN query
+def changed_rows(entity, ids):
+    model, columns, serializer, joins = CHANGE_FEED_ENTITIES[entity]
+    query = db.session.query(*[column.label(name) for name, column in columns.items()]).select_from(model)
+    for target, condition in joins:
+        query = query.join(target, condition)
+    rows = query.filter(model.id.in_(ids)).order_by(model.id).all()
+
+    serialize = serializer.for_fields(list(columns))
+    items = [serialize(row) for row in rows]
+    if entity == 'projects':
+        members = team_members_by_project([row.id for row in rows])
+        for row, item in zip(rows, items):
+            item['team_members'] = members[row.id]
+    return items
+
+# Rows created, updated or deleted since a cursor. Without ?since= only the
+# current cursor is returned: take it before a full load, then poll with it.
+# Entries younger than CHANGE_FEED_SETTLE_SECONDS are held back so a
+# transaction that logged an earlier id but commits later isn't skipped.
+@api.route('/api/changes', methods=['GET'])
+def get_changes():
     try:
-        # Query for total clients
-        total_clients = db.session.query(Client).count()
+        settled = datetime.utcnow() - timedelta(seconds=current_app.config['CHANGE_FEED_SETTLE_SECONDS'])
+        since = request.args.get('since')
+        if not since:
+            latest = db.session.query(db.func.max(ChangeLog.id)).filter(ChangeLog.changed_at <= settled).scalar()
+            return jsonify({'next_cursor': encode_cursor([latest or 0]), 'status': 'success'})
+
+        since_id = decode_cursor(since, [ChangeLog.id])[0]
+        oldest = db.session.query(db.func.min(ChangeLog.id)).scalar()
+        if oldest is not None and since_id < oldest - 1:
+            return jsonify({
+                'error': 'The change log no longer reaches back to this cursor; reload everything',
+                'status': 'error'
+            }), 410
+
+        limit = page_limit()
+        entries = db.session.query(ChangeLog.id, ChangeLog.entity, ChangeLog.entity_id, ChangeLog.op).filter(
+            ChangeLog.id > since_id, ChangeLog.changed_at <= settled
+        ).order_by(ChangeLog.id).limit(limit + 1).all()
+        has_more = len(entries) > limit
+        entries = entries[:limit]
+
+        # Only the last change of each record matters
+        latest_ops = {}
+        for entry in entries:
+            latest_ops[(entry.entity, entry.entity_id)] = entry.op
+
+        changes = {}
+        for entity in CHANGE_FEED_ENTITIES:
+            upserted = [entity_id for (kind, entity_id), op in latest_ops.items()
+                        if kind == entity and op == CHANGE_UPSERT]
+            deleted = sorted(entity_id for (kind, entity_id), op in latest_ops.items()
+                             if kind == entity and op == CHANGE_DELETE)
+            if upserted or deleted:
+                changes[entity] = {
+                    'upserted': changed_rows(entity, upserted) if upserted else [],
+                    'deleted': deleted
+                }
 
-        # Query for total team members
-        total_team_members = db.session.query(TeamMember).count()
+        return jsonify({
+            'changes': changes,
+            'next_cursor': encode_cursor([entries[-1].id if entries else since_id]),
+            'has_more': has_more,
+            'status': 'success'
+        })
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error fetching changes: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
 
-        # Query for total projects
-        total_projects = db.session.query(Project).count()
+changes_cli = click.Group('changes', help='Maintain the change log behind /api/changes.')
+api.cli.add_command(changes_cli)
+
+@changes_cli.command('purge')
+@click.option('--max-age-days', default=30, show_default=True, help='Delete entries older than this.')
+def purge_changes_command(max_age_days):
+    """Delete old change log entries. Clients holding an older cursor get a
+    410 and reload; the newest entry is always kept so they can tell."""
+    cutoff = datetime.utcnow() - timedelta(days=max_age_days)
+    newest = db.session.query(db.func.max(ChangeLog.id)).scalar()
+    deleted = db.session.execute(
+        db.delete(ChangeLog).where(ChangeLog.changed_at < cutoff, ChangeLog.id < (newest or 0))
+    ).rowcount
+    db.session.commit()
+    click.echo(f'Deleted {deleted} change log entries.')
 
-        # Query for total amount
-        total_amount = db.session.query(db.func.sum(Payment.total_amount)).scalar() or 0
+#========================================================================================================================#
 
-        # Query for pending amount
-        pending_amount = db.session.query(
-            db.func.sum(Payment.total_amount - Payment.paid_amount)
-        ).scalar() or 0
+#----------------------Archive Backend-----------------------------------------------#
+
+ARCHIVE_BATCH_SIZE = 500
+
+ARCHIVE_COLUMNS = {
+    Client: (ArchivedClient, ['id', 'name', 'email', 'contact', 'address', 'company', 'deleted_at']),
+    Project: (ArchivedProject, ['id', 'name', 'client_id', 'description', 'start_date', 'end_date', 'status', 'deleted_at']),
+    Payment: (ArchivedPayment, ['id', 'client_id', 'project_id', 'total_amount', 'paid_amount', 'payment_date']),
+}
+
+# Copy rows into their archive table with one INSERT ... SELECT
+def copy_to_archive(model, condition, archived_at):
+    archive, columns = ARCHIVE_COLUMNS[model]
+    db.session.execute(db.insert(archive).from_select(
+        columns + ['archived_at'],
+        db.select(*[getattr(model, name) for name in columns], db.literal(archived_at, db.DateTime)).where(condition)
+    ))
+
+# Move one batch of projects, their team rows and their payments to the
+# archive tables in a single transaction. Payments get change log
+# tombstones and leave the dashboard totals, as if deleted one by one;
+# projects that weren't soft deleted yet are logged and counted too.
+def archive_projects(project_ids, archived_at):
+    payments = db.session.query(
+        Payment.id, Payment.client_id, Payment.project_id, Payment.total_amount, Payment.paid_amount
+    ).filter(Payment.project_id.in_(project_ids)).all()
+    live_projects = db.session.query(Project.id, Project.client_id).filter(
+        Project.id.in_(project_ids), *live(Project)
+    ).all()
+
+    in_batch = Payment.project_id.in_(project_ids)
+    copy_to_archive(Payment, in_batch, archived_at)
+    db.session.execute(db.insert(archived_project_team_members).from_select(
+        ['project_id', 'team_member_id', 'role', 'archived_at'],
+        db.select(
+            project_team_members.c.project_id, project_team_members.c.team_member_id,
+            project_team_members.c.role, db.literal(archived_at, db.DateTime)
+        ).where(project_team_members.c.project_id.in_(project_ids))
+    ))
+    copy_to_archive(Project, Project.id.in_(project_ids), archived_at)
+
+    options = {'synchronize_session': False}
+    db.session.execute(db.delete(Payment).where(in_batch), execution_options=options)
+    db.session.execute(project_team_members.delete().where(project_team_members.c.project_id.in_(project_ids)))
+    db.session.execute(db.delete(Project).where(Project.id.in_(project_ids)), execution_options=options)
+
+    tombstones = [
+        {'entity': 'payments', 'entity_id': payment.id, 'op': CHANGE_DELETE,
+         'payload': json.dumps({'client_id': payment.client_id, 'project_id': payment.project_id})}
+        for payment in payments
+    ] + [
+        {'entity': 'projects', 'entity_id': project.id, 'op': CHANGE_DELETE,
+         'payload': json.dumps({'client_id': project.client_id})}
+        for project in live_projects
+    ]
+    if tombstones:
+        db.session.execute(db.insert(ChangeLog), tombstones)
+
+    total = sum((payment.total_amount for payment in payments), Decimal('0'))
+    paid = sum((payment.paid_amount for payment in payments), Decimal('0'))
+    bump_dashboard_totals(
+        total_projects=-len(live_projects), total_payments=-len(payments),
+        total_amount=-total, pending_amount=-(total - paid)
+    )
+    db.session.commit()
+    for project_id in project_ids:
+        unindex_for_search('project', project_id)
+    return len(payments)
+
+# Move old projects to the archive tables in batches: completed ones whose
+# end date (or, without one, last update) is before the cutoff, and ones
+# soft deleted before it. A project with any payment still owed stays put,
+# so pending amounts never leave the hot tables or the dashboard. Soft-deleted
+# clients are archived afterwards once no project or payment refers to them.
+# Each batch commits on its own, so the job can be stopped and rerun at any
+# point.
+def archive_old_records(cutoff, batch_size=ARCHIVE_BATCH_SIZE):
+    archived_at = datetime.utcnow()
+    counts = {'projects': 0, 'payments': 0, 'clients': 0}
+    settled = ~db.exists().where(Payment.project_id == Project.id, Payment.total_amount > Payment.paid_amount)
+    candidates = [
+        db.and_(*live(Project), Project.status == 'Completed', db.or_(
+            Project.end_date < cutoff.date(), db.and_(Project.end_date.is_(None), Project.updated_at < cutoff)
+        )),
+        Project.deleted_at < cutoff,
+    ]
+    for condition in candidates:
+        while True:
+            project_ids = [
+                row.id for row in db.session.query(Project.id).filter(condition, settled).limit(batch_size)
+            ]
+            if not project_ids:
+                break
+            counts['payments'] += archive_projects(project_ids, archived_at)
+            counts['projects'] += len(project_ids)
+
+    unreferenced = db.and_(
+        Client.deleted_at < cutoff,
+        ~db.exists().where(Project.client_id == Client.id),
+        ~db.exists().where(Payment.client_id == Client.id)
+    )
+    while True:
+        client_ids = [row.id for row in db.session.query(Client.id).filter(unreferenced).limit(batch_size)]
+        if not client_ids:
+            break
+        copy_to_archive(Client, Client.id.in_(client_ids), archived_at)
+        db.session.execute(db.delete(Client).where(Client.id.in_(client_ids)),
+                           execution_options={'synchronize_session': False})
+        db.session.commit()
+        for client_id in client_ids:
+            unindex_for_search('client', client_id)
+        counts['clients'] += len(client_ids)
+
+    if counts['projects'] or counts['clients']:
+        invalidate_cached('clients', 'projects')
+    return counts
+
+archive_cli = click.Group('archive', help='Move old records out of the hot tables.')
+api.cli.add_command(archive_cli)
+
+@archive_cli.command('run')
+@click.option('--older-than-days', default=365, show_default=True,
+              help='Archive projects completed or deleted longer ago than this.')
+@click.option('--batch-size', default=ARCHIVE_BATCH_SIZE, show_default=True, help='Projects moved per transaction.')
+def archive_command(older_than_days, batch_size):
+    """Archive old completed and soft-deleted projects whose payments are
+    settled, then soft-deleted clients nothing refers to any more."""
+    counts = archive_old_records(datetime.utcnow() - timedelta(days=older_than_days), batch_size)
+    click.echo(f"Archived {counts['projects']} project(s), {counts['payments']} payment(s) "
+               f"and {counts['clients']} client(s).")
+
+#========================================================================================================================#
+
+#----------------------Event Stream Backend-----------------------------------------------#
+
+def event_channels():
+    names = [name.strip() for name in request.args.get('channels', ','.join(EVENT_CHANNELS)).split(',') if name.strip()]
+    unknown = set(names) - set(EVENT_CHANNELS)
+    if unknown or not names:
+        raise ValueError(f"Unknown channels: {', '.join(sorted(unknown))}" if unknown else 'No channels requested')
+    return names
+
+# Milliseconds an EventSource waits before reconnecting to a full worker
+EVENT_STREAM_RETRY_MS = 5000
+
+def sse_message(channel, data):
+    return f'event: {channel}\ndata: {json.dumps(data)}\n\n'
+
+# Server-sent events for open dashboards: "dashboard" carries deltas (or the
+# new totals) to apply to /api/dashboard-data, "payments" carries payment
+# writes. Every connection starts with a "dashboard" event holding all the
+# totals, read after subscribing so no later write is missed; a write that
+# commits while it is read may also arrive as a delta. Payment listeners
+# should load what they show once the stream is open. A client that falls
+# behind loses its oldest events and gets an "overflow" event, as does one
+# that reconnects (sends Last-Event-ID), since events sent while it was away
+# are gone; either way it should refetch what it shows.
+@api.route('/api/events', methods=['GET'])
+def stream_events():
+    try:
+        channels = event_channels()
+    except ValueError as e:
+        return bad_request(e)
+
+    bus = get_event_bus()
+    heartbeat = current_app.config['EVENT_STREAM_HEARTBEAT']
+    # Each open stream holds a server thread; past the limit the client is
+    # told to come back later, which EventSource does by itself
+    subscription = bus.subscribe(channels, limit=current_app.config['EVENT_STREAM_LIMIT'])
+    if subscription is None:
+        return Response(f': too many open streams\nretry: {EVENT_STREAM_RETRY_MS}\n\n', mimetype='text/event-stream')
 
-        # Query for total payments
-        total_payments = db.session.query(Payment).count()
+    try:
+        greeting = []
+        if request.headers.get('Last-Event-ID'):
+            greeting.append(sse_message('overflow', {'reconnected': True}))
+        if 'dashboard' in channels:
+            totals = db.session.get(DashboardTotals, DASHBOARD_TOTALS_ID)
+            if totals is not None:
+                greeting.append(sse_message('dashboard', dashboard_snapshot(totals)))
+    except Exception:
+        bus.unsubscribe(subscription)
+        raise
+
+    def stream():
+        try:
+            yield ': connected\n\n'
+            yield from greeting
+            while True:
+                event = subscription.get(heartbeat)
+                dropped = subscription.take_dropped()
+                if dropped:
+                    yield sse_message('overflow', {'dropped': dropped})
+                if event is None:
+                    yield ': keep-alive\n\n'
+                    continue
+                event_id, channel, data = event
+                yield f'id: {event_id}\nevent: {channel}\ndata: {data}\n\n'
+        finally:
+            bus.unsubscribe(subscription)
+
+    response = Response(stream(), mimetype='text/event-stream')
+    # Also covers clients that disconnect before the stream has started
+    response.call_on_close(lambda: bus.unsubscribe(subscription))
+    response.headers['Cache-Control'] = 'no-cache'
+    # Stop nginx from buffering the stream
+    response.headers['X-Accel-Buffering'] = 'no'
+    return response
+
+#========================================================================================================================#
+
+#----------------------Dashboard Page-----------------------------------------------#
+#Dashboard page. The totals row is built by "flask init-db" and "flask
+# dashboard rebuild", never by a request.
+@api.route('/api/dashboard-data', methods=['GET'])
+def get_dashboard_data():
+    try:
+        # Single primary key read of the materialized totals
+        totals = db.session.get(DashboardTotals, DASHBOARD_TOTALS_ID)
+        if totals is None:
+            return jsonify({
+                'error': 'Dashboard totals have not been built yet; run "flask dashboard rebuild"',
+                'status': 'error'
+            }), 503
 
         # Return the aggregated data
         return jsonify({
             'status': 'success',
             'dashboard': {
-                'totalClients': total_clients,
-                'totalTeamMembers': total_team_members,
-                'totalProjects': total_projects,
-                'totalAmount': total_amount,
-                'pendingAmount': pending_amount,
-                'totalPayments': total_payments
+                'totalClients': totals.total_clients,
+                'totalTeamMembers': totals.total_team_members,
+                'totalProjects': totals.total_projects,
+                'totalAmount': format_value(totals.total_amount),
+                'pendingAmount': format_value(totals.pending_amount),
+                'totalPayments': totals.total_payments
             }
         })
     except Exception as e:
@@ -781,54 +2961,436 @@ def get_dashboard_data():
         })
 
 
+#===========================================================================================================================#
+
+#----------------------Payment Reports-----------------------------------------------#
+
+# Paid/pending rollups grouped in SQL; only one row per group leaves the database
+@api.route('/api/reports/payments', methods=['GET'])
+def get_payment_report():
+    try:
+        group_by = request.args.get('group_by', 'client')
+        query = payments_query([])
+        totals = [
+            db.func.count(Payment.id).label('payment_count'),
+            db.func.sum(Payment.total_amount).label('total_amount'),
+            db.func.sum(Payment.paid_amount).label('paid_amount'),
+            db.func.sum(Payment.total_amount - Payment.paid_amount).label('pending_amount')
+        ]
+
+        if group_by == 'client':
+            keys = [Client.id.label('client_id'), Client.name.label('client_name')]
+            query = query.join(Client, Payment.client_id == Client.id)
+        elif group_by == 'project':
+            keys = [Project.id.label('project_id'), Project.name.label('project_name'),
+                    Project.client_id.label('client_id')]
+            query = query.join(Project, Payment.project_id == Project.id)
+        elif group_by == 'month':
+            keys = [db.extract('year', Payment.payment_date).label('year'),
+                    db.extract('month', Payment.payment_date).label('month')]
+        else:
+            raise ValueError('group_by must be client, project or month')
+
+        rows = query.with_entities(*keys, *totals).group_by(*keys).order_by(*keys).all()
+
+        report = []
+        for row in rows:
+            item = {key: format_value(value) for key, value in row._asdict().items()}
+            if group_by == 'month':
+                item['month'] = f"{int(item.pop('year')):04d}-{int(item['month']):02d}"
+            report.append(item)
+
+        return jsonify({
+            'group_by': group_by,
+            'report': report,
+            'status': 'success'
+        })
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error building payment report: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+#----------------------Receivables Aging-----------------------------------------------#
+
+AGING_REPORT = 'receivable_aging'
+
+# Bucket column and the oldest age in days it holds (None: no limit)
+AGING_BUCKETS = (('days_0_30', 30), ('days_31_60', 60), ('days_61_90', 90), ('days_over_90', None))
+
+AGING_BATCH_SIZE = 500
+
+# Pending amount per bucket, aged up to as_of. The bucket edges become
+# payment_date cutoffs, so every database compares plain dates.
+def aging_aggregates(as_of):
+    pending = Payment.total_amount - Payment.paid_amount
+    aggregates, younger_cutoff = [], None
+    for name, days in AGING_BUCKETS:
+        conditions = []
+        if younger_cutoff is not None:
+            conditions.append(Payment.payment_date < younger_cutoff)
+        if days is not None:
+            younger_cutoff = as_of - timedelta(days=days)
+            conditions.append(Payment.payment_date >= younger_cutoff)
+        aggregates.append(db.func.coalesce(db.func.sum(db.case((db.and_(*conditions), pending), else_=0)), 0))
+    return aggregates
+
+# Recompute the report rows of some (client_id, project_id) pairs, or of
+# all of them, with one DELETE and one INSERT ... SELECT per batch
+def write_aging_rows(as_of, pairs=None):
+    aging_columns = ['client_id', 'project_id', 'pending_count'] + [name for name, _ in AGING_BUCKETS]
+    select = db.select(
+        Payment.client_id, Payment.project_id, db.func.count(Payment.id), *aging_aggregates(as_of)
+    ).where(Payment.total_amount > Payment.paid_amount).group_by(Payment.client_id, Payment.project_id)
+
+    if pairs is None:
+        db.session.execute(db.delete(ReceivableAging))
+        db.session.execute(db.insert(ReceivableAging).from_select(aging_columns, select))
+        return
+
+    pairs = sorted(pairs)
+    for start in range(0, len(pairs), AGING_BATCH_SIZE):
+        batch = pairs[start:start + AGING_BATCH_SIZE]
+        db.session.execute(db.delete(ReceivableAging).where(
+            db.tuple_(ReceivableAging.client_id, ReceivableAging.project_id).in_(batch)
+        ))
+        db.session.execute(db.insert(ReceivableAging).from_select(aging_columns, select.where(
+            db.tuple_(Payment.client_id, Payment.project_id).in_(batch)
+        )))
+
+# Pairs whose payments were written after a change log id: the current
+# references of created or updated payments, the previous ones of moved
+# payments and the ones kept in delete tombstones
+def changed_payment_pairs(after_id, upto_id):
+    pairs, upserted = set(), set()
+    entries = db.session.query(ChangeLog.entity_id, ChangeLog.op, ChangeLog.payload).filter(
+        ChangeLog.entity == 'payments', ChangeLog.id > after_id, ChangeLog.id <= upto_id
+    )
+    for entry in entries.yield_per(AGING_BATCH_SIZE):
+        references = json.loads(entry.payload) if entry.payload else {}
+        if 'previous_client_id' in references:
+            pairs.add((references['previous_client_id'], references['previous_project_id']))
+        if entry.op == CHANGE_DELETE:
+            pairs.add((references['client_id'], references['project_id']))
+        else:
+            upserted.add(entry.entity_id)
+
+    upserted = sorted(upserted)
+    for start in range(0, len(upserted), AGING_BATCH_SIZE):
+        pairs.update(db.session.query(Payment.client_id, Payment.project_id).filter(
+            Payment.id.in_(upserted[start:start + AGING_BATCH_SIZE])
+        ).distinct().all())
+    return {tuple(pair) for pair in pairs}
+
+# Pairs with a pending payment that moved into an older bucket between two
+# report dates, i.e. whose age passed 30, 60 or 90 days
+def aged_payment_pairs(previous, as_of):
+    crossed = [
+        db.and_(Payment.payment_date >= previous - timedelta(days=days),
+                Payment.payment_date < as_of - timedelta(days=days))
+        for _, days in AGING_BUCKETS if days is not None
+    ]
+    rows = db.session.query(Payment.client_id, Payment.project_id).filter(
+        Payment.total_amount > Payment.paid_amount, db.or_(*crossed)
+    ).distinct().all()
+    return {tuple(row) for row in rows}
+
+# Bring the aging report up to date. Only the pairs touched by payment
+# writes since the previous run, or by payments changing bucket since its
+# date, are recomputed; without a previous run, or once the change log has
+# been purged past it, everything is rebuilt. Change log entries still
+# inside the settle window are left for the next run, like /api/changes
+# does.
+def refresh_receivable_aging(full=False, as_of=None):
+    as_of = as_of or date.today()
+    settled = datetime.utcnow() - timedelta(seconds=current_app.config['CHANGE_FEED_SETTLE_SECONDS'])
+    run = db.session.get(ReportRun, AGING_REPORT)
+    last_change_id = run.last_change_id if run else 0
+    upto_id = db.session.query(db.func.max(ChangeLog.id)).filter(ChangeLog.changed_at <= settled).scalar()
+    upto_id = max(upto_id or 0, last_change_id)
+
+    if run is not None and not full:
+        oldest = db.session.query(db.func.min(ChangeLog.id)).scalar()
+        full = (oldest is not None and last_change_id < oldest - 1) or as_of < run.as_of
+
+    if run is None or full:
+        write_aging_rows(as_of)
+        pairs = None
+    else:
+        pairs = changed_payment_pairs(last_change_id, upto_id)
+        if as_of > run.as_of:
+            pairs |= aged_payment_pairs(run.as_of, as_of)
+        write_aging_rows(as_of, pairs)
+
+    if run is None:
+        run = ReportRun(name=AGING_REPORT)
+        db.session.add(run)
+    run.last_change_id, run.as_of, run.finished_at = upto_id, as_of, datetime.utcnow()
+    db.session.commit()
+    return {'full': pairs is None, 'pairs': None if pairs is None else len(pairs), 'as_of': as_of}
+
+reports_cli = click.Group('reports', help='Refresh precomputed reports.')
+api.cli.add_command(reports_cli)
+
+@reports_cli.command('refresh-aging')
+@click.option('--full', is_flag=True, help='Rebuild every row instead of only the changed ones.')
+def refresh_aging_command(full):
+    """Refresh the receivables aging report; run it from cron, e.g. hourly."""
+    result = refresh_receivable_aging(full=full)
+    if result['full']:
+        click.echo(f"Aging report rebuilt as of {result['as_of']}.")
+    else:
+        click.echo(f"Aging report refreshed as of {result['as_of']}: {result['pairs']} client/project pair(s).")
+
+AGING_COLUMNS = {
+    'client_id': ReceivableAging.client_id,
+    'client_name': Client.name,
+    'project_id': ReceivableAging.project_id,
+    'project_name': Project.name,
+    'pending_count': ReceivableAging.pending_count,
+    'pending_amount': ReceivableAging.days_0_30 + ReceivableAging.days_31_60 +
+                      ReceivableAging.days_61_90 + ReceivableAging.days_over_90,
+    'days_0_30': ReceivableAging.days_0_30,
+    'days_31_60': ReceivableAging.days_31_60,
+    'days_61_90': ReceivableAging.days_61_90,
+    'days_over_90': ReceivableAging.days_over_90,
+}
+AGING_SERIALIZER = ModelSerializer(AGING_COLUMNS)
+
+# Precomputed aging buckets, read from the report table. The first page also
+# carries the bucket totals over every matching row. Like the payment list,
+# it keeps receivables of soft-deleted clients and projects. The report is built by
+# "flask init-db" and "flask reports refresh-aging", never by a request.
+@api.route('/api/reports/aging', methods=['GET'])
+def get_aging_report():
+    try:
+        run = db.session.get(ReportRun, AGING_REPORT)
+        if run is None:
+            return jsonify({
+                'error': 'The aging report has not been built yet; run "flask reports refresh-aging"',
+                'status': 'error'
+            }), 503
+
+        fields = selected_fields(AGING_COLUMNS)
+        query = db.session.query(ReceivableAging).join(
+            Client, ReceivableAging.client_id == Client.id
+        ).join(Project, ReceivableAging.project_id == Project.id)
+        client_id = int_arg('client_id')
+        if client_id is not None:
+            query = query.filter(ReceivableAging.client_id == client_id)
+
+        rows, next_cursor = keyset_page(query, AGING_COLUMNS, fields, ['client_id', 'project_id'])
+        serialize = AGING_SERIALIZER.for_fields(fields)
+        response = {
+            'as_of': format_value(run.as_of),
+            'refreshed_at': run.finished_at.isoformat(),
+            'aging': [serialize(row) for row in rows],
+            'next_cursor': next_cursor,
+            'status': 'success'
+        }
+        if not request.args.get('cursor'):
+            bucket_names = ['pending_count', 'pending_amount'] + [name for name, _ in AGING_BUCKETS]
+            totals = query.with_entities(
+                *[db.func.coalesce(db.func.sum(AGING_COLUMNS[name]), 0).label(name) for name in bucket_names]
+            ).one()
+            response['totals'] = {name: format_value(value) for name, value in totals._asdict().items()}
+        return jsonify(response)
+    except ValueError as e:
+        return bad_request(e)
+    except Exception as e:
+        print(f"Error fetching aging report: {e}")
+        return jsonify({
+            'error': str(e),
+            'status': 'error'
+        })
+
+
 #===========================================================================================================================#
 
 #---------------Generate the PDF Backend-----------------------------#
 
 
-@app.route('/api/projects/<int:project_id>/export', methods=['GET'])
+# Project, client and payment totals for one project in a single query: the
+# payment aggregate is a grouped subquery outer-joined onto the project row.
+# The last update time and the sum of the payment versions change with every
+# write to one of the project's payments, so the row doubles as their state.
+def project_summary(project_id):
+    totals = db.session.query(
+        Payment.project_id,
+        db.func.count(Payment.id).label('payment_count'),
+        db.func.sum(Payment.total_amount).label('total_amount'),
+        db.func.sum(Payment.paid_amount).label('paid_amount'),
+        db.func.sum(Payment.total_amount - Payment.paid_amount).label('pending_amount'),
+        db.func.min(Payment.payment_date).label('first_payment_date'),
+        db.func.max(Payment.payment_date).label('last_payment_date'),
+        db.func.max(Payment.id).label('last_payment_id'),
+        db.func.max(Payment.updated_at).label('last_payment_update'),
+        db.func.sum(Payment.version).label('payment_versions')
+    ).filter(
+        Payment.project_id == project_id
+    ).group_by(
+        Payment.project_id
+    ).subquery()
+
+    return db.session.query(
+        Project.id,
+        Project.name,
+        Project.status,
+        Project.start_date,
+        Project.end_date,
+        Client.name.label('client_name'),
+        Client.contact.label('contact_number'),
+        Client.email.label('client_email'),
+        Client.address.label('client_address'),
+        Client.company.label('client_company'),
+        db.func.coalesce(totals.c.payment_count, 0).label('payment_count'),
+        db.func.coalesce(totals.c.total_amount, 0).label('total_amount'),
+        db.func.coalesce(totals.c.paid_amount, 0).label('paid_amount'),
+        db.func.coalesce(totals.c.pending_amount, 0).label('pending_amount'),
+        totals.c.first_payment_date,
+        totals.c.last_payment_date,
+        totals.c.last_payment_id,
+        totals.c.last_payment_update,
+        totals.c.payment_versions
+    ).join(
+        Client, Project.client_id == Client.id
+    ).outerjoin(
+        totals, totals.c.project_id == Project.id
+    ).filter(
+        Project.id == project_id, *live(Project)
+    ).first()
+
+@api.route('/api/projects/<int:project_id>/export', methods=['GET'])
 def export_project_details(project_id):
     try:
-        # Get project with client information
-        project = db.session.query(
-            Project, Client.name.label('client_name'), Client.contact_number
-        ).join(
-            Client, Project.client_id == Client.id
-        ).filter(
-            Project.id == project_id
-        ).first()
-        
+        project = project_summary(project_id)
         if not project:
             return jsonify({'status': 'error', 'message': 'Project not found'}), 404
-            
-        # Get payment information
-        payments = db.session.query(
-            db.func.sum(Payment.amount).label('total_amount'),
-            db.func.sum(db.case([(Payment.status == 'Paid', Payment.amount)], else_=0)).label('paid_amount'),
-            db.func.sum(db.case([(Payment.status == 'Pending', Payment.amount)], else_=0)).label('pending_amount'),
-            db.func.min(Payment.payment_date).label('first_payment_date')
-        ).filter(
-            Payment.project_id == project_id
-        ).first()
-        
+
         # Prepare response data
         project_data = {
-            'id': project.Project.id,
-            'name': project.Project.name,
-            'client_name': project.client_name,
-            'contact_number': project.contact_number,
-            'status': project.Project.status,
-            'start_date': project.Project.start_date.strftime('%Y-%m-%d') if project.Project.start_date else None,
-            'end_date': project.Project.end_date.strftime('%Y-%m-%d') if project.Project.end_date else None,
-            'total_amount': float(payments.total_amount) if payments.total_amount else 0,
-            'paid_amount': float(payments.paid_amount) if payments.paid_amount else 0,
-            'pending_amount': float(payments.pending_amount) if payments.pending_amount else 0,
-            'first_payment_date': payments.first_payment_date.strftime('%Y-%m-%d') if payments.first_payment_date else None
+            key: format_value(project._mapping[key])
+            for key in (
+                'id', 'name', 'client_name', 'contact_number', 'status', 'start_date', 'end_date',
+                'payment_count', 'total_amount', 'paid_amount', 'pending_amount', 'first_payment_date'
+            )
         }
-        
+
         return jsonify({'status': 'success', 'project': project_data})
-        
+
+    except Exception as e:
+        return jsonify({'status': 'error', 'message': str(e)}), 500
+
+# Render an HTML invoice/receipt for a project. Rendered documents are cached
+# per project together with a fingerprint of the summary row, so repeat
+# downloads skip the payment line query and template rendering until a
+# payment (or the project or its client) changes. Every update bumps the
+# payment's version, so the fingerprint changes even when the totals don't,
+# e.g. when a payment's date is corrected or two amounts are swapped.
+@api.route('/api/projects/<int:project_id>/invoice', methods=['GET'])
+def project_invoice(project_id):
+    try:
+        project = project_summary(project_id)
+        if not project:
+            return jsonify({'status': 'error', 'message': 'Project not found'}), 404
+
+        fingerprint = hashlib.sha1(json.dumps(list(project), default=str).encode()).hexdigest()
+        cache_key = f'invoice:{project_id}'
+        entry = get_response_cache().get(cache_key)
+
+        if entry is None or entry['etag'] != fingerprint:
+            payments = db.session.query(
+                Payment.id,
+                Payment.payment_date,
+                Payment.total_amount,
+                Payment.paid_amount,
+                (Payment.total_amount - Payment.paid_amount).label('pending_amount')
+            ).filter(
+                Payment.project_id == project_id
+            ).order_by(Payment.payment_date, Payment.id).all()
+
+            body = render_template(
+                'invoice.html',
+                project=project,
+                payments=payments,
+                generated_on=date.today()
+            )
+            entry = {'etag': fingerprint, 'body': body}
+            get_response_cache().set(cache_key, entry)
+
+        response = current_app.response_class(entry['body'], mimetype='text/html')
+        response.set_etag(entry['etag'])
+        response.cache_control.no_cache = True
+        if request.args.get('download'):
+            response.headers['Content-Disposition'] = f'attachment; filename=invoice-{project_id}.html'
+        return response.make_conditional(request)
+
     except Exception as e:
         return jsonify({'status': 'error', 'message': str(e)}), 500
+
+#===========================================================================================================================#
+
+#---------------App Factory-----------------------------#
+
+@api.cli.command('init-db')
+def init_db_command():
+    """Create or upgrade the schema to the latest migration."""
+    upgrade(directory=MIGRATIONS_DIRECTORY)
+    rebuild_dashboard_totals()
+    refresh_receivable_aging(full=True)
+    click.echo('Database initialized.')
+
+@api.route('/api/_pool', methods=['GET'])
+def get_pool_status():
+    return jsonify({'pool': pool_status(db.engine), 'status': 'success'})
+
+@api.route('/api/_metrics', methods=['GET'])
+def get_metrics():
+    return jsonify({
+        'routes': current_app.extensions['route_metrics'].snapshot(),
+        'pool': pool_status(db.engine),
+        'status': 'success'
+    })
+
+# The FULLTEXT indexes only exist on MySQL and are created by their migration
+# rather than declared on the models; keep autogenerate from dropping them
+def include_in_autogenerate(object, name, type_, reflected, compare_to):
+    return not (type_ == 'index' and reflected and compare_to is None and name.startswith('ft_'))
+
+def create_app(config=None):
+    app = Flask(__name__)
+    app.config.from_object(Config)
+    if config:
+        app.config.update(config)
+    app.config['SQLALCHEMY_ENGINE_OPTIONS'] = engine_options(app.config)
+
+    CORS(app)
+    instrumentation.init_app(app)
+    db.init_app(app)
+    migrate.init_app(app, db, directory=MIGRATIONS_DIRECTORY, include_object=include_in_autogenerate)
+
+    cache_options = {'ttl': app.config['RESPONSE_CACHE_TTL']}
+    if app.config['RESPONSE_CACHE_BACKEND'] == 'sqlite':
+        cache_options['path'] = app.config['RESPONSE_CACHE_PATH'] or \
+            os.path.join(app.instance_path, 'response_cache.sqlite3')
+    app.extensions['response_cache'] = make_cache(app.config['RESPONSE_CACHE_BACKEND'], **cache_options)
+    app.extensions['search_index'] = make_search_index(app)
+    app.extensions['read_executor'] = make_read_executor(app)
+
+    event_options = {'max_queue': app.config['EVENT_QUEUE_SIZE']}
+    if app.config['EVENT_BUS_BACKEND'] == 'sqlite':
+        event_options['path'] = app.config['EVENT_BUS_PATH'] or \
+            os.path.join(app.instance_path, 'events.sqlite3')
+    app.extensions['event_bus'] = make_event_bus(app.config['EVENT_BUS_BACKEND'], **event_options)
+
+    app.register_blueprint(api)
+
+    # Nothing here touches the database: engines connect lazily on the first
+    # query, and the schema is managed with "flask init-db" / "flask db upgrade"
+    return app
+
 if __name__ == '__main__':
-    app.run(debug=True)
+    create_app().run(debug=True)
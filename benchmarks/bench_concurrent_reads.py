@@ -0,0 +1,100 @@
+"""Compare running a request's independent reads in series and concurrently.
+
+Two apps share one seeded database: one with READ_POOL_WORKERS=0, so
+run_concurrently executes its statements one after another on the session,
+and one with a read pool, so every statement gets its own connection. The
+benchmark times the dashboard recount (six aggregate scans) and the client
+payment history (client lookup, ledger page and per-project subtotals).
+
+In-memory SQLite has a single connection, so the default is a temporary
+SQLite file; pass --uri to measure against MySQL. A local SQLite file has no
+network round trip, which is where a real database server spends much of
+each statement; --latency-ms adds that wait to every statement to
+approximate one. Without that wait the concurrent run is slower, which is
+why READ_POOL_WORKERS defaults to 0 on SQLite; both apps here set it
+explicitly.
+
+    python benchmarks/bench_concurrent_reads.py --clients 2000 --repeat 5
+    python benchmarks/bench_concurrent_reads.py --clients 2000 --latency-ms 2
+"""
+import argparse
+import json
+import os
+import sys
+import tempfile
+import time
+import timeit
+
+from sqlalchemy import event
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import seed  # noqa: E402
+from app import compute_dashboard_totals, create_app, db  # noqa: E402
+
+
+def best_of(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000
+
+
+def measure(app, sizes, repeat):
+    client = app.test_client()
+    client_ids = range(1, sizes['clients'] + 1, max(1, sizes['clients'] // 20))
+
+    def client_history():
+        for client_id in client_ids:
+            assert client.get(f'/api/clients/{client_id}/payments').status_code == 200
+
+    with app.app_context():
+        dashboard = compute_dashboard_totals(concurrently=True)
+        results = {
+            'dashboard_recount_ms': round(best_of(lambda: compute_dashboard_totals(concurrently=True), repeat), 2),
+            'client_history_ms_per_request': round(best_of(client_history, repeat) / len(client_ids), 2),
+        }
+    return dashboard, results
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serial vs concurrent read benchmark.')
+    parser.add_argument('--uri', help='database to seed (default: a temporary SQLite file)')
+    parser.add_argument('--repeat', type=int, default=5)
+    parser.add_argument('--workers', type=int, default=6, help='READ_POOL_WORKERS for the concurrent run')
+    parser.add_argument('--latency-ms', type=float, default=0, help='simulated round trip added to every statement')
+    seed.add_arguments(parser)
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        uri = args.uri or f"sqlite:///{os.path.join(directory, 'reads.db')}"
+        serial = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'READ_POOL_WORKERS': 0})
+        concurrent = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'READ_POOL_WORKERS': args.workers})
+        with serial.app_context():
+            db.create_all()
+            sizes = seed.seed_from_args(args)
+
+        if args.latency_ms:
+            for app in (serial, concurrent):
+                with app.app_context():
+                    event.listen(db.engine, 'before_cursor_execute',
+                                 lambda *_: time.sleep(args.latency_ms / 1000))
+
+        serial_totals, before = measure(serial, sizes, args.repeat)
+        concurrent_totals, after = measure(concurrent, sizes, args.repeat)
+        assert serial_totals == concurrent_totals
+
+        for app in (serial, concurrent):
+            with app.app_context():
+                db.engine.dispose()
+
+    print(json.dumps({
+        'dataset': sizes,
+        'read_pool_workers': args.workers,
+        'latency_ms': args.latency_ms,
+        'serial': before,
+        'concurrent': after,
+        'speedup': {name: round(before[name] / after[name], 2) for name in before},
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,95 @@
+"""Compare the old per-object serialization path with the row serializer.
+
+The old path, as list handlers used to do it: hydrate ORM instances, build
+a dict per object with strftime per date, then encode with the stdlib
+encoder. The new path: select row tuples, convert them with the compiled
+ModelSerializer and encode with serializers.dumps_bytes (orjson when it is
+installed). Both run over the same seeded in-memory SQLite database.
+
+    python benchmarks/bench_serialization.py --clients 500 --repeat 5
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+import serializers  # noqa: E402
+import seed  # noqa: E402
+from app import (  # noqa: E402
+    PAYMENT_COLUMNS, PAYMENT_SERIALIZER, Client, Payment, Project, create_app, db
+)
+
+
+def old_payments():
+    payments = Payment.query.join(Client, Payment.client_id == Client.id) \
+                            .join(Project, Payment.project_id == Project.id) \
+                            .add_columns(
+                                Payment.id,
+                                Payment.total_amount,
+                                Payment.paid_amount,
+                                Payment.payment_date,
+                                Client.name.label('client_name'),
+                                Project.name.label('project_name'),
+                                (Payment.total_amount - Payment.paid_amount).label('pending_amount')
+                            ).order_by(Payment.payment_date.desc(), Payment.id.desc()).all()
+    payments_list = [
+        {
+            'id': payment.id,
+            'total_amount': float(payment.total_amount),
+            'paid_amount': float(payment.paid_amount),
+            'pending_amount': float(payment.pending_amount),
+            'payment_date': payment.payment_date.strftime('%Y-%m-%d'),
+            'client_name': payment.client_name,
+            'project_name': payment.project_name
+        }
+        for payment in payments
+    ]
+    return json.dumps({'payments': payments_list, 'status': 'success'}).encode()
+
+
+def new_payments():
+    fields = ['id', 'total_amount', 'paid_amount', 'pending_amount', 'payment_date', 'client_name', 'project_name']
+    rows = db.session.query(*[PAYMENT_COLUMNS[name].label(name) for name in fields]) \
+                     .select_from(Payment) \
+                     .join(Client, Payment.client_id == Client.id) \
+                     .join(Project, Payment.project_id == Project.id) \
+                     .order_by(Payment.payment_date.desc(), Payment.id.desc()).all()
+    serialize = PAYMENT_SERIALIZER.for_fields(fields)
+    return serializers.dumps_bytes({'payments': [serialize(row) for row in rows], 'status': 'success'})
+
+
+def best_of(function, repeat):
+    return min(timeit.repeat(function, number=1, repeat=repeat)) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Serialization microbenchmark.')
+    parser.add_argument('--repeat', type=int, default=5)
+    seed.add_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    with app.app_context():
+        db.create_all()
+        sizes = seed.seed_from_args(args)
+
+        assert json.loads(old_payments()) == json.loads(new_payments())
+
+        old_ms = best_of(lambda: (old_payments(), db.session.expunge_all()), args.repeat)
+        new_ms = best_of(lambda: (new_payments(), db.session.expunge_all()), args.repeat)
+
+    print(json.dumps({
+        'payments': sizes['payments'],
+        'encoder': 'orjson' if serializers.orjson else 'json',
+        'old_ms': round(old_ms, 2),
+        'new_ms': round(new_ms, 2),
+        'speedup': round(old_ms / new_ms, 2),
+    }, indent=2))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,76 @@
+"""Measure cold start: interpreter start -> import app -> create_app -> first response.
+
+Each run happens in a fresh interpreter against a SQLite file that was
+initialized once with "flask init-db". ``--create-all`` also runs
+db.create_all() before the first request, which is what every import of
+app.py used to do, so the two modes can be compared.
+
+    python benchmarks/bench_startup.py --runs 10
+    python benchmarks/bench_startup.py --runs 10 --create-all
+"""
+import argparse
+import json
+import os
+import statistics
+import subprocess
+import sys
+import tempfile
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+CHILD = r'''
+import sys, time, json
+start = time.perf_counter()
+sys.path.insert(0, {root!r})
+from app import create_app, db
+imported = time.perf_counter()
+app = create_app({{'SQLALCHEMY_DATABASE_URI': {uri!r}}})
+created = time.perf_counter()
+if {create_all!r}:
+    with app.app_context():
+        db.create_all()
+response = app.test_client().get('/api/dashboard-data')
+assert response.status_code == 200, response.status_code
+done = time.perf_counter()
+print(json.dumps({{
+    'import_ms': (imported - start) * 1000,
+    'create_app_ms': (created - imported) * 1000,
+    'first_response_ms': (done - created) * 1000,
+    'total_ms': (done - start) * 1000,
+}}))
+'''
+
+
+def init_database(uri):
+    env = dict(os.environ, SQLALCHEMY_DATABASE_URI=uri)
+    subprocess.run(
+        [sys.executable, '-m', 'flask', '--app', 'app', 'init-db'],
+        cwd=ROOT, env=env, check=True, capture_output=True
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument('--runs', type=int, default=5)
+    parser.add_argument('--create-all', action='store_true')
+    args = parser.parse_args()
+
+    with tempfile.TemporaryDirectory() as directory:
+        uri = f"sqlite:///{os.path.join(directory, 'bench.db')}"
+        init_database(uri)
+        code = CHILD.format(root=ROOT, uri=uri, create_all=args.create_all)
+
+        runs = []
+        for _ in range(args.runs):
+            output = subprocess.run([sys.executable, '-c', code], check=True, capture_output=True, text=True)
+            runs.append(json.loads(output.stdout.strip().splitlines()[-1]))
+
+    summary = {
+        key: round(statistics.median(run[key] for run in runs), 2)
+        for key in runs[0]
+    }
+    print(json.dumps({'runs': args.runs, 'create_all': args.create_all, 'median': summary}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
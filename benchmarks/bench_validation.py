@@ -0,0 +1,74 @@
+"""Per-request cost of validating write bodies.
+
+Times each schema's validate() on a typical body and, for payments, the
+inline parsing the handlers used to do (dict.get, to_money and strptime per
+field). "request" runs request_values() inside a request context, which
+adds the body lookup; Flask decodes the JSON once per request and caches it,
+so the decode itself is not repeated. No database is involved: validation
+runs before any query.
+
+    python benchmarks/bench_validation.py --number 20000
+"""
+import argparse
+import json
+import os
+import sys
+import timeit
+from datetime import datetime
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (  # noqa: E402
+    CLIENT_SCHEMA, PAYMENT_SCHEMA, PROJECT_SCHEMA, TEAM_SCHEMA, create_app, request_values
+)
+from validation import to_money  # noqa: E402
+
+BODIES = {
+    'clients': (CLIENT_SCHEMA, {'name': 'Acme Ltd', 'email': 'billing@acme.example', 'contact': '5550100',
+                                'address': '1 Main Street', 'company': 'Acme'}),
+    'team_members': (TEAM_SCHEMA, {'name': 'Ann Lee', 'job_role': 'Developer', 'email': 'ann@example.com',
+                                   'contact': '5550101'}),
+    'projects': (PROJECT_SCHEMA, {'name': 'Website', 'client_id': 1, 'description': 'Company website',
+                                  'start_date': '2024-01-01', 'end_date': '2024-06-30', 'status': 'Ongoing'}),
+    'payments': (PAYMENT_SCHEMA, {'client_id': 1, 'project_id': 1, 'total_amount': '1250.00',
+                                  'paid_amount': '250.50', 'payment_date': '2024-03-15'}),
+}
+
+
+def inline_payment(data):
+    return {
+        'client_id': data.get('client_id'),
+        'project_id': data.get('project_id'),
+        'total_amount': to_money(data.get('total_amount')),
+        'paid_amount': to_money(data.get('paid_amount', 0)),
+        'payment_date': datetime.strptime(data.get('payment_date'), '%Y-%m-%d'),
+    }
+
+
+def microseconds(function, number):
+    return round(min(timeit.repeat(function, number=number, repeat=5)) / number * 1e6, 2)
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Request validation overhead benchmark.')
+    parser.add_argument('--number', type=int, default=20000, help='validations per timing run')
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://'})
+    results = {}
+    for entity, (schema, body) in BODIES.items():
+        assert not schema.validate(body)[1]
+        with app.test_request_context(method='POST', data=json.dumps(body), content_type='application/json'):
+            results[entity] = {
+                'validate_us': microseconds(lambda: schema.validate(body), args.number),
+                'request_us': microseconds(lambda: request_values(schema), args.number),
+            }
+
+    payment = BODIES['payments'][1]
+    results['payments']['inline_parsing_us'] = microseconds(lambda: inline_payment(payment), args.number)
+
+    print(json.dumps({'number': args.number, 'results': results}, indent=2))
+
+
+if __name__ == '__main__':
+    main()
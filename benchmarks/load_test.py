@@ -0,0 +1,259 @@
+"""Drive every /api route with concurrent clients and record latency percentiles.
+
+By default a fresh SQLite database is seeded (see seed.py) and requests go
+through the WSGI app in-process, one test client per worker thread. Pass
+--uri to seed a different database (for example a local MySQL), or
+--base-url to load an already running server over HTTP instead.
+
+    python benchmarks/load_test.py --clients 500 --concurrency 8 --output results.json
+    python benchmarks/load_test.py --output new.json --baseline results.json
+
+Results hold p50/p95/p99 latency, throughput and the average SQL statement
+count per route (from the Server-Timing header), plus the git commit, so
+two result files can be diffed between commits. "errors" counts HTTP
+statuses of 400 and above; "app_errors" counts responses that succeeded at
+the HTTP level but carry "status": "error" in their JSON body, which is how
+the app reports unexpected failures.
+"""
+import argparse
+import json
+import os
+import random
+import re
+import statistics
+import subprocess
+import sys
+import tempfile
+import threading
+import time
+import urllib.request
+from concurrent.futures import ThreadPoolExecutor
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+sys.path.insert(0, os.path.dirname(os.path.abspath(__file__)))
+
+from app import create_app, db  # noqa: E402
+import seed  # noqa: E402
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+QUERY_COUNT = re.compile(r'db;dur=[\d.]+;desc="(\d+) queries"')
+
+
+def is_app_error(status, content_type, body):
+    """A 2xx/3xx JSON response whose body reports "status": "error"."""
+    if status >= 400 or not content_type.startswith('application/json'):
+        return False
+    try:
+        return json.loads(body).get('status') == 'error'
+    except (ValueError, AttributeError):
+        return False
+
+
+def payment_body(rng, sizes):
+    client_id = rng.randint(1, sizes['clients'])
+    return {
+        'client_id': client_id,
+        'project_id': rng.randint(1, sizes['projects']),
+        'total_amount': rng.randint(100, 100000),
+        'paid_amount': 0,
+        'payment_date': '2024-06-01',
+    }
+
+
+# name -> (method, path(rng, sizes), body(rng, sizes) or None)
+SCENARIOS = {
+    'get_clients': ('GET', lambda rng, s: '/api/clients', None),
+    'get_teams': ('GET', lambda rng, s: '/api/teams', None),
+    'team_summary': ('GET', lambda rng, s: f"/api/teams/{rng.randint(1, s['team_members'])}/summary", None),
+    'team_summaries': ('GET', lambda rng, s: '/api/teams/summary', None),
+    'get_projects': ('GET', lambda rng, s: '/api/projects', None),
+    'get_payments': ('GET', lambda rng, s: '/api/payments', None),
+    'export_payments': ('GET', lambda rng, s: '/api/payments/export?format=csv', None),
+    'get_dashboard_data': ('GET', lambda rng, s: '/api/dashboard-data', None),
+    'changes': ('GET', lambda rng, s: '/api/changes?since=WzBd', None),
+    'clients_dropdown': ('GET', lambda rng, s: '/api/clients-dropdown', None),
+    'team_members_dropdown': ('GET', lambda rng, s: '/api/team-members', None),
+    'projects_dropdown': ('GET', lambda rng, s: '/api/projects-dropdown', None),
+    'projects_by_client': ('GET', lambda rng, s: f"/api/projects-by-client/{rng.randint(1, s['clients'])}", None),
+    'client_payments': ('GET', lambda rng, s: f"/api/clients/{rng.randint(1, s['clients'])}/payments", None),
+    'payment_report': ('GET', lambda rng, s: '/api/reports/payments?group_by=month', None),
+    'aging_report': ('GET', lambda rng, s: '/api/reports/aging', None),
+    'search': ('GET', lambda rng, s: f"/api/search?q={rng.choice(['client+00', 'company', 'develop', 'projct', 'member+01'])}", None),
+    'project_export': ('GET', lambda rng, s: f"/api/projects/{rng.randint(1, s['projects'])}/export", None),
+    'project_invoice': ('GET', lambda rng, s: f"/api/projects/{rng.randint(1, s['projects'])}/invoice", None),
+    'create_client': ('POST', lambda rng, s: '/api/clients', lambda rng, s: {
+        'name': f'Load Client {rng.random()}', 'email': 'load@example.com', 'contact': '9000000000'}),
+    'update_client': ('PUT', lambda rng, s: f"/api/clients/{rng.randint(1, s['clients'])}", lambda rng, s: {
+        'name': f'Updated Client {rng.random()}', 'email': 'load@example.com', 'contact': '9000000000'}),
+    'create_payment': ('POST', lambda rng, s: '/api/payments', payment_body),
+    'update_payment': ('PUT', lambda rng, s: f"/api/payments/{rng.randint(1, s['payments'])}", payment_body),
+    'patch_payment': ('PATCH', lambda rng, s: f"/api/payments/{rng.randint(1, s['payments'])}", lambda rng, s: {
+        'paid_amount': f'{rng.randint(0, 100)}.00'}),
+}
+
+
+class InProcessClient:
+    def __init__(self, app):
+        self.client = app.test_client()
+
+    def request(self, method, path, body):
+        response = self.client.open(path, method=method, json=body)
+        app_error = is_app_error(response.status_code, response.content_type or '', response.get_data())
+        return response.status_code, response.headers.get('Server-Timing', ''), app_error
+
+
+class HTTPClient:
+    def __init__(self, base_url):
+        self.base_url = base_url.rstrip('/')
+
+    def request(self, method, path, body):
+        data = json.dumps(body).encode() if body is not None else None
+        request = urllib.request.Request(
+            self.base_url + path, data=data, method=method, headers={'Content-Type': 'application/json'}
+        )
+        try:
+            with urllib.request.urlopen(request) as response:
+                app_error = is_app_error(response.status, response.headers.get('Content-Type', ''), response.read())
+                return response.status, response.headers.get('Server-Timing', ''), app_error
+        except urllib.error.HTTPError as e:
+            return e.code, e.headers.get('Server-Timing', ''), False
+
+
+def percentile(values, fraction):
+    ordered = sorted(values)
+    index = min(len(ordered) - 1, max(0, round(fraction * (len(ordered) - 1))))
+    return ordered[index]
+
+
+def run_scenario(name, make_client, sizes, requests, concurrency, seed_value):
+    method, path_for, body_for = SCENARIOS[name]
+    latencies, query_counts, errors, app_errors = [], [], 0, 0
+    lock = threading.Lock()
+    local = threading.local()
+    counter = iter(range(requests))
+
+    def worker(worker_id):
+        nonlocal errors, app_errors
+        rng = random.Random(seed_value * 1000 + worker_id)
+        if not hasattr(local, 'client'):
+            local.client = make_client()
+        while True:
+            with lock:
+                if next(counter, None) is None:
+                    return
+            path = path_for(rng, sizes)
+            body = body_for(rng, sizes) if body_for else None
+            start = time.perf_counter()
+            status, timing, app_error = local.client.request(method, path, body)
+            elapsed = (time.perf_counter() - start) * 1000
+            match = QUERY_COUNT.search(timing)
+            with lock:
+                latencies.append(elapsed)
+                if match:
+                    query_counts.append(int(match.group(1)))
+                if status >= 400:
+                    errors += 1
+                if app_error:
+                    app_errors += 1
+
+    started = time.perf_counter()
+    with ThreadPoolExecutor(max_workers=concurrency) as pool:
+        list(pool.map(worker, range(concurrency)))
+    wall = time.perf_counter() - started
+
+    return {
+        'requests': len(latencies),
+        'errors': errors,
+        'app_errors': app_errors,
+        'throughput_rps': round(len(latencies) / wall, 2),
+        'p50_ms': round(percentile(latencies, 0.50), 3),
+        'p95_ms': round(percentile(latencies, 0.95), 3),
+        'p99_ms': round(percentile(latencies, 0.99), 3),
+        'mean_ms': round(statistics.fmean(latencies), 3),
+        'avg_queries': round(statistics.fmean(query_counts), 2) if query_counts else None,
+    }
+
+
+def git_commit():
+    try:
+        return subprocess.run(
+            ['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT, capture_output=True, text=True, check=True
+        ).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+
+def compare(results, baseline):
+    print(f"{'route':28} {'p50 ms':>18} {'p95 ms':>18} {'queries':>14}")
+    for name, current in results['routes'].items():
+        before = baseline.get('routes', {}).get(name)
+        if not before:
+            continue
+
+        def delta(key):
+            old, new = before.get(key), current.get(key)
+            if old is None or new is None:
+                return f'{new}'
+            return f'{old}->{new}'
+        print(f"{name:28} {delta('p50_ms'):>18} {delta('p95_ms'):>18} {delta('avg_queries'):>14}")
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Load test every /api route.')
+    parser.add_argument('--uri', help='database to seed (default: a temporary SQLite file)')
+    parser.add_argument('--base-url', help='load a running server over HTTP instead of in-process')
+    parser.add_argument('--requests', type=int, default=200, help='requests per route')
+    parser.add_argument('--concurrency', type=int, default=8)
+    parser.add_argument('--routes', help='comma separated subset of: ' + ', '.join(SCENARIOS))
+    parser.add_argument('--output', help='write results to this JSON file')
+    parser.add_argument('--baseline', help='print deltas against an earlier results file')
+    seed.add_arguments(parser)
+    args = parser.parse_args()
+
+    names = args.routes.split(',') if args.routes else list(SCENARIOS)
+    unknown = set(names) - set(SCENARIOS)
+    if unknown:
+        parser.error(f"unknown routes: {', '.join(sorted(unknown))}")
+
+    with tempfile.TemporaryDirectory() as directory:
+        uri = args.uri or f"sqlite:///{os.path.join(directory, 'load.db')}"
+        app = create_app({'SQLALCHEMY_DATABASE_URI': uri, 'DB_POOL_SIZE': args.concurrency})
+        with app.app_context():
+            db.create_all()
+            sizes = seed.seed_from_args(args)
+
+        if args.base_url:
+            make_client = lambda: HTTPClient(args.base_url)  # noqa: E731
+        else:
+            make_client = lambda: InProcessClient(app)  # noqa: E731
+
+        routes = {}
+        for index, name in enumerate(names):
+            routes[name] = run_scenario(name, make_client, sizes, args.requests, args.concurrency, args.seed + index)
+            print(f"{name:28} p50={routes[name]['p50_ms']:>9}ms p95={routes[name]['p95_ms']:>9}ms "
+                  f"p99={routes[name]['p99_ms']:>9}ms {routes[name]['throughput_rps']:>9} req/s "
+                  f"queries={routes[name]['avg_queries']} errors={routes[name]['errors']} "
+                  f"app_errors={routes[name]['app_errors']}")
+
+        with app.app_context():
+            db.engine.dispose()
+
+    results = {
+        'commit': git_commit(),
+        'database': 'custom' if args.uri else 'sqlite',
+        'mode': 'http' if args.base_url else 'in-process',
+        'concurrency': args.concurrency,
+        'requests_per_route': args.requests,
+        'dataset': sizes,
+        'routes': routes,
+    }
+    if args.output:
+        with open(args.output, 'w') as f:
+            json.dump(results, f, indent=2, sort_keys=True)
+    if args.baseline:
+        with open(args.baseline) as f:
+            compare(results, json.load(f))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,123 @@
+"""Seed a database with realistic fan-out for benchmarks.
+
+Creates clients, team members, projects per client, team assignments per
+project and payments per project, using bulk inserts with explicit ids so
+runs are reproducible for a given --seed.
+
+    python benchmarks/seed.py --uri sqlite:////tmp/bench.db --clients 500
+"""
+import argparse
+import os
+import random
+import sys
+from datetime import date, timedelta
+from decimal import Decimal
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import (  # noqa: E402
+    Client, Payment, Project, TeamMember, create_app, db, project_team_members, rebuild_dashboard_totals,
+    refresh_receivable_aging
+)
+
+STATUSES = ['Ongoing', 'Ongoing', 'Completed', 'On Hold']
+JOB_ROLES = ['Developer', 'Designer', 'Tester', 'Project Manager', 'DevOps']
+PROJECT_ROLES = ['Member', 'Lead', 'Reviewer']
+CHUNK = 5000
+
+
+def insert_chunked(target, rows):
+    for start in range(0, len(rows), CHUNK):
+        db.session.execute(db.insert(target), rows[start:start + CHUNK])
+
+
+def seed(clients=200, team_members=50, projects_per_client=3, members_per_project=5,
+         payments_per_project=10, random_seed=42):
+    """Insert the data set into the current app's database. Returns the row counts."""
+    rng = random.Random(random_seed)
+    today = date.today()
+
+    client_rows = [
+        {'id': i, 'name': f'Client {i:05d}', 'email': f'client{i}@example.com', 'contact': f'9{i:09d}',
+         'address': f'{i} Main Street', 'company': f'Company {i % 97}'}
+        for i in range(1, clients + 1)
+    ]
+    member_rows = [
+        {'id': i, 'name': f'Member {i:05d}', 'job_role': rng.choice(JOB_ROLES),
+         'email': f'member{i}@example.com', 'contact': f'8{i:09d}'}
+        for i in range(1, team_members + 1)
+    ]
+
+    project_rows, assignment_rows, payment_rows = [], [], []
+    for client_id in range(1, clients + 1):
+        for _ in range(projects_per_client):
+            project_id = len(project_rows) + 1
+            start = today - timedelta(days=rng.randint(30, 900))
+            project_rows.append({
+                'id': project_id, 'name': f'Project {project_id:06d}', 'client_id': client_id,
+                'description': f'Project {project_id} for client {client_id}',
+                'start_date': start, 'end_date': start + timedelta(days=rng.randint(30, 365)),
+                'status': rng.choice(STATUSES),
+            })
+            for member_id in rng.sample(range(1, team_members + 1), min(members_per_project, team_members)):
+                assignment_rows.append({
+                    'project_id': project_id, 'team_member_id': member_id, 'role': rng.choice(PROJECT_ROLES)
+                })
+            for _ in range(payments_per_project):
+                total = Decimal(rng.randint(1000, 500000)) / 100
+                paid = (total * Decimal(rng.choice([0, 25, 50, 100])) / 100).quantize(Decimal('0.01'))
+                payment_rows.append({
+                    'id': len(payment_rows) + 1, 'client_id': client_id, 'project_id': project_id,
+                    'total_amount': total, 'paid_amount': paid,
+                    'payment_date': start + timedelta(days=rng.randint(0, 400)),
+                })
+
+    insert_chunked(Client, client_rows)
+    insert_chunked(TeamMember, member_rows)
+    insert_chunked(Project, project_rows)
+    insert_chunked(project_team_members, assignment_rows)
+    insert_chunked(Payment, payment_rows)
+    db.session.commit()
+    rebuild_dashboard_totals()
+    refresh_receivable_aging(full=True)
+
+    return {
+        'clients': len(client_rows),
+        'team_members': len(member_rows),
+        'projects': len(project_rows),
+        'assignments': len(assignment_rows),
+        'payments': len(payment_rows),
+    }
+
+
+def add_arguments(parser):
+    parser.add_argument('--clients', type=int, default=200)
+    parser.add_argument('--team-members', type=int, default=50)
+    parser.add_argument('--projects-per-client', type=int, default=3)
+    parser.add_argument('--members-per-project', type=int, default=5)
+    parser.add_argument('--payments-per-project', type=int, default=10)
+    parser.add_argument('--seed', type=int, default=42)
+
+
+def seed_from_args(args):
+    return seed(
+        clients=args.clients, team_members=args.team_members, projects_per_client=args.projects_per_client,
+        members_per_project=args.members_per_project, payments_per_project=args.payments_per_project,
+        random_seed=args.seed,
+    )
+
+
+def main():
+    parser = argparse.ArgumentParser(description='Seed a database for benchmarks.')
+    parser.add_argument('--uri', required=True, help='SQLAlchemy URI of an empty database')
+    add_arguments(parser)
+    args = parser.parse_args()
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': args.uri})
+    with app.app_context():
+        db.create_all()
+        print(seed_from_args(args))
+
+
+if __name__ == '__main__':
+    main()
@@ -0,0 +1,119 @@
+"""Small response caches used by the API.
+
+Two backends share the same get/set/delete/clear interface:
+
+* ``MemoryCache`` keeps entries in-process with a TTL and LRU eviction.
+* ``SQLiteCache`` keeps entries in a local SQLite file, so several worker
+  processes on one host see the same entries and the same invalidations.
+
+Values must be JSON serializable so every backend can store them.
+"""
+import json
+import os
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+
+
+class MemoryCache:
+    def __init__(self, ttl=300, max_entries=128):
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._entries = OrderedDict()
+        self._lock = threading.Lock()
+
+    def get(self, key):
+        with self._lock:
+            entry = self._entries.get(key)
+            if entry is None:
+                return None
+            expires, value = entry
+            if expires < time.monotonic():
+                del self._entries[key]
+                return None
+            self._entries.move_to_end(key)
+            return value
+
+    def set(self, key, value):
+        with self._lock:
+            self._entries[key] = (time.monotonic() + self.ttl, value)
+            self._entries.move_to_end(key)
+            while len(self._entries) > self.max_entries:
+                self._entries.popitem(last=False)
+
+    def delete(self, key):
+        with self._lock:
+            self._entries.pop(key, None)
+
+    def clear(self):
+        with self._lock:
+            self._entries.clear()
+
+
+class SQLiteCache:
+    def __init__(self, path, ttl=300, max_entries=128):
+        self.path = path
+        self.ttl = ttl
+        self.max_entries = max_entries
+        self._local = threading.local()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS response_cache ('
+                'key TEXT PRIMARY KEY, value TEXT NOT NULL, expires REAL NOT NULL, used REAL NOT NULL)'
+            )
+
+    def _connect(self):
+        # sqlite3 connections can't be shared across threads, keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def get(self, key):
+        now = time.time()
+        conn = self._connect()
+        row = conn.execute(
+            'SELECT value FROM response_cache WHERE key = ? AND expires >= ?', (key, now)
+        ).fetchone()
+        if row is None:
+            return None
+        conn.execute('UPDATE response_cache SET used = ? WHERE key = ?', (now, key))
+        return json.loads(row[0])
+
+    def set(self, key, value):
+        now = time.time()
+        conn = self._connect()
+        conn.execute(
+            'INSERT OR REPLACE INTO response_cache (key, value, expires, used) VALUES (?, ?, ?, ?)',
+            (key, json.dumps(value), now + self.ttl, now)
+        )
+        conn.execute(
+            'DELETE FROM response_cache WHERE expires < ? OR key NOT IN '
+            '(SELECT key FROM response_cache ORDER BY used DESC LIMIT ?)',
+            (now, self.max_entries)
+        )
+
+    def delete(self, key):
+        self._connect().execute('DELETE FROM response_cache WHERE key = ?', (key,))
+
+    def clear(self):
+        self._connect().execute('DELETE FROM response_cache')
+
+
+CACHE_BACKENDS = {
+    'memory': MemoryCache,
+    'sqlite': SQLiteCache,
+}
+
+
+def make_cache(backend='memory', **options):
+    try:
+        cache_class = CACHE_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f'Unknown cache backend: {backend}')
+    return cache_class(**options)
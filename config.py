@@ -0,0 +1,77 @@
+"""Backend configuration, read from the environment.
+
+``create_app`` loads ``Config`` and then applies any overrides passed to it,
+so tests and scripts can point the app at SQLite without touching the
+environment.
+"""
+import os
+
+
+def env_bool(name, default):
+    value = os.environ.get(name)
+    if value is None:
+        return default
+    return value.strip().lower() in ('1', 'true', 'yes', 'on')
+
+
+class Config:
+    SQLALCHEMY_DATABASE_URI = os.environ.get('SQLALCHEMY_DATABASE_URI', 'mysql://root:@localhost/projects')
+    SQLALCHEMY_TRACK_MODIFICATIONS = False
+
+    # Connection pool, per worker process. Size it so that
+    # workers * (DB_POOL_SIZE + DB_MAX_OVERFLOW) stays below the server's
+    # max_connections.
+    DB_POOL_SIZE = int(os.environ.get('DB_POOL_SIZE', 10))
+    DB_MAX_OVERFLOW = int(os.environ.get('DB_MAX_OVERFLOW', 20))
+    DB_POOL_TIMEOUT = int(os.environ.get('DB_POOL_TIMEOUT', 30))
+    DB_POOL_RECYCLE = int(os.environ.get('DB_POOL_RECYCLE', 1800))
+    DB_POOL_PRE_PING = env_bool('DB_POOL_PRE_PING', True)
+
+    # Threads per worker process for running a request's independent reads
+    # concurrently (see run_concurrently). Each one holds a pooled connection
+    # while it runs, so keep gunicorn threads + READ_POOL_WORKERS within
+    # DB_POOL_SIZE + DB_MAX_OVERFLOW. Below 2 disables concurrent reads.
+    # Unset, it is 4 for a database server and 0 for SQLite, where a
+    # statement has no network round trip to overlap and the extra
+    # connections made reads slower (benchmarks/bench_concurrent_reads.py).
+    READ_POOL_WORKERS = int(os.environ['READ_POOL_WORKERS']) if 'READ_POOL_WORKERS' in os.environ else None
+
+    # Response cache for the dropdown endpoints and rendered documents. Use
+    # the sqlite backend to share entries between worker processes on one
+    # host. RESPONSE_CACHE_PATH defaults to the instance folder.
+    RESPONSE_CACHE_BACKEND = os.environ.get('RESPONSE_CACHE_BACKEND', 'memory')
+    RESPONSE_CACHE_TTL = int(os.environ.get('RESPONSE_CACHE_TTL', 300))
+    RESPONSE_CACHE_PATH = os.environ.get('RESPONSE_CACHE_PATH')
+
+    # Statements at or above this many milliseconds are logged with their
+    # parameters on the api.slow_queries logger
+    SLOW_QUERY_MS = float(os.environ.get('SLOW_QUERY_MS', 200))
+
+    # /api/search uses MySQL FULLTEXT indexes with "auto" on MySQL and an
+    # in-process index otherwise ("fulltext" or "memory" force one). Each
+    # worker rebuilds its in-process index in the background once it is
+    # SEARCH_INDEX_MAX_AGE seconds old, to pick up writes made by other
+    # workers; searches use the previous index until the new one is ready.
+    SEARCH_BACKEND = os.environ.get('SEARCH_BACKEND', 'auto')
+    SEARCH_INDEX_MAX_AGE = int(os.environ.get('SEARCH_INDEX_MAX_AGE', 300))
+
+    # /api/changes holds back entries younger than this many seconds, so a
+    # slow transaction that logged an earlier id can commit before readers
+    # move their cursor past it
+    CHANGE_FEED_SETTLE_SECONDS = float(os.environ.get('CHANGE_FEED_SETTLE_SECONDS', 1))
+
+    # /api/events pushes dashboard and payment updates. The memory bus only
+    # reaches subscribers of the worker that made the write; the sqlite bus
+    # fans events out to every worker on one host through EVENT_BUS_PATH
+    # (defaults to the instance folder). Each subscriber buffers at most
+    # EVENT_QUEUE_SIZE events before the oldest are dropped. Idle streams get
+    # a comment every EVENT_STREAM_HEARTBEAT seconds to keep proxies from
+    # closing them. Every open stream holds a server thread, so each worker
+    # process serves at most EVENT_STREAM_LIMIT of them and tells further
+    # clients to retry later; keep it below gunicorn's threads so normal
+    # requests always get one (see gunicorn.conf.py).
+    EVENT_BUS_BACKEND = os.environ.get('EVENT_BUS_BACKEND', 'memory')
+    EVENT_BUS_PATH = os.environ.get('EVENT_BUS_PATH')
+    EVENT_QUEUE_SIZE = int(os.environ.get('EVENT_QUEUE_SIZE', 100))
+    EVENT_STREAM_HEARTBEAT = float(os.environ.get('EVENT_STREAM_HEARTBEAT', 15))
+    EVENT_STREAM_LIMIT = int(os.environ.get('EVENT_STREAM_LIMIT', 2))
@@ -0,0 +1,87 @@
+"""Connection pool setup and utilization stats.
+
+``InstrumentedQueuePool`` is a regular ``QueuePool`` that also records how
+long each checkout waited for a free connection, which is what tells you
+whether the pool (or the worker count) is too small.
+"""
+import threading
+import time
+
+from sqlalchemy.engine import make_url
+from sqlalchemy.pool import QueuePool
+
+
+class InstrumentedQueuePool(QueuePool):
+    def __init__(self, *args, **kwargs):
+        super().__init__(*args, **kwargs)
+        self._stats_lock = threading.Lock()
+        self.checkouts = 0
+        self.checkout_timeouts = 0
+        self.total_wait = 0.0
+        self.max_wait = 0.0
+
+    def _do_get(self):
+        start = time.perf_counter()
+        try:
+            connection = super()._do_get()
+        except Exception:
+            with self._stats_lock:
+                self.checkout_timeouts += 1
+            raise
+        waited = time.perf_counter() - start
+        with self._stats_lock:
+            self.checkouts += 1
+            self.total_wait += waited
+            self.max_wait = max(self.max_wait, waited)
+        return connection
+
+
+def is_sqlite(uri):
+    return make_url(uri).get_backend_name() == 'sqlite'
+
+
+def is_memory_sqlite(uri):
+    url = make_url(uri)
+    return url.get_backend_name() == 'sqlite' and url.database in (None, '', ':memory:')
+
+
+def engine_options(config):
+    """Build SQLALCHEMY_ENGINE_OPTIONS from the DB_POOL_* settings."""
+    options = dict(config.get('SQLALCHEMY_ENGINE_OPTIONS') or {})
+    if is_memory_sqlite(config['SQLALCHEMY_DATABASE_URI']):
+        # Flask-SQLAlchemy keeps in-memory SQLite on a single static connection
+        return options
+
+    options.setdefault('poolclass', InstrumentedQueuePool)
+    options.setdefault('pool_size', config['DB_POOL_SIZE'])
+    options.setdefault('max_overflow', config['DB_MAX_OVERFLOW'])
+    options.setdefault('pool_timeout', config['DB_POOL_TIMEOUT'])
+    options.setdefault('pool_recycle', config['DB_POOL_RECYCLE'])
+    options.setdefault('pool_pre_ping', config['DB_POOL_PRE_PING'])
+    return options
+
+
+def pool_status(engine):
+    pool = engine.pool
+    status = {'pool_class': type(pool).__name__}
+    if not isinstance(pool, QueuePool):
+        return status
+
+    capacity = pool.size() + max(pool._max_overflow, 0)
+    status.update({
+        'size': pool.size(),
+        'max_overflow': pool._max_overflow,
+        'checked_out': pool.checkedout(),
+        'checked_in': pool.checkedin(),
+        'overflow': pool.overflow(),
+        'utilization': round(pool.checkedout() / capacity, 3) if capacity else None,
+    })
+    if isinstance(pool, InstrumentedQueuePool):
+        with pool._stats_lock:
+            status.update({
+                'checkouts': pool.checkouts,
+                'checkout_timeouts': pool.checkout_timeouts,
+                'avg_checkout_wait_ms': round(pool.total_wait / pool.checkouts * 1000, 3) if pool.checkouts else 0,
+                'max_checkout_wait_ms': round(pool.max_wait * 1000, 3),
+            })
+    return status
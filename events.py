@@ -0,0 +1,189 @@
+"""Publish/subscribe for the server-sent events stream.
+
+Every worker process has an ``EventBroker`` that hands events to the
+subscribers connected to that process. Each subscriber has a bounded queue:
+when a slow client falls behind, the oldest events are dropped and the
+subscriber is told how many it missed, so it can refetch instead of the
+broker buffering without limit.
+
+Two buses share the same publish/subscribe interface:
+
+* ``MemoryEventBus`` delivers to the subscribers of this process only.
+* ``SQLiteEventBus`` also appends every event to a local SQLite file, which
+  a background thread in each process polls, so subscribers connected to
+  any worker on one host see events published by every worker.
+
+Events are serialized once when they are published; subscribers get the
+same encoded string.
+"""
+import itertools
+import json
+import os
+import sqlite3
+import threading
+import time
+import uuid
+from collections import deque
+
+
+class Subscription:
+    def __init__(self, channels, max_queue):
+        self.channels = set(channels)
+        self._events = deque(maxlen=max_queue)
+        self._condition = threading.Condition()
+        self.dropped = 0
+
+    def deliver(self, event):
+        with self._condition:
+            if len(self._events) == self._events.maxlen:
+                self.dropped += 1
+            self._events.append(event)
+            self._condition.notify()
+
+    def get(self, timeout):
+        """Wait up to ``timeout`` seconds for the next ``(id, channel, data)``
+        event; returns None on timeout."""
+        with self._condition:
+            if not self._events:
+                self._condition.wait(timeout)
+            return self._events.popleft() if self._events else None
+
+    def take_dropped(self):
+        with self._condition:
+            dropped, self.dropped = self.dropped, 0
+            return dropped
+
+
+class EventBroker:
+    def __init__(self, max_queue=100):
+        self.max_queue = max_queue
+        self._subscriptions = set()
+        self._lock = threading.Lock()
+
+    def subscribe(self, channels, limit=None):
+        """Returns None when ``limit`` subscribers are already connected."""
+        subscription = Subscription(channels, self.max_queue)
+        with self._lock:
+            if limit is not None and len(self._subscriptions) >= limit:
+                return None
+            self._subscriptions.add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            self._subscriptions.discard(subscription)
+
+    def __len__(self):
+        return len(self._subscriptions)
+
+    def dispatch(self, event_id, channel, data):
+        with self._lock:
+            subscriptions = list(self._subscriptions)
+        for subscription in subscriptions:
+            if channel in subscription.channels:
+                subscription.deliver((event_id, channel, data))
+
+
+class MemoryEventBus:
+    def __init__(self, max_queue=100):
+        self.broker = EventBroker(max_queue)
+        self._ids = itertools.count(1)
+
+    def publish(self, channel, payload):
+        self.broker.dispatch(next(self._ids), channel, json.dumps(payload))
+
+    def subscribe(self, channels, limit=None):
+        return self.broker.subscribe(channels, limit)
+
+    def unsubscribe(self, subscription):
+        self.broker.unsubscribe(subscription)
+
+
+class SQLiteEventBus:
+    def __init__(self, path, max_queue=100, poll_interval=0.5, retention=300):
+        self.path = path
+        self.broker = EventBroker(max_queue)
+        self.poll_interval = poll_interval
+        self.retention = retention
+        self.origin = uuid.uuid4().hex
+        self._local = threading.local()
+        self._poller = None
+        self._poller_lock = threading.Lock()
+        directory = os.path.dirname(os.path.abspath(path))
+        os.makedirs(directory, exist_ok=True)
+        with self._connect() as conn:
+            conn.execute(
+                'CREATE TABLE IF NOT EXISTS events ('
+                'id INTEGER PRIMARY KEY AUTOINCREMENT, origin TEXT NOT NULL, channel TEXT NOT NULL, '
+                'data TEXT NOT NULL, created REAL NOT NULL)'
+            )
+        self._last_id = self._connect().execute('SELECT COALESCE(MAX(id), 0) FROM events').fetchone()[0]
+
+    def _connect(self):
+        # sqlite3 connections can't be shared across threads, keep one per thread
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=5, isolation_level=None)
+            conn.execute('PRAGMA journal_mode=WAL')
+            self._local.conn = conn
+        return conn
+
+    def publish(self, channel, payload):
+        data = json.dumps(payload)
+        cursor = self._connect().execute(
+            'INSERT INTO events (origin, channel, data, created) VALUES (?, ?, ?, ?)',
+            (self.origin, channel, data, time.time())
+        )
+        # Local subscribers get it straight away; the poller skips our own rows
+        self.broker.dispatch(cursor.lastrowid, channel, data)
+
+    def subscribe(self, channels, limit=None):
+        self._start_poller()
+        return self.broker.subscribe(channels, limit)
+
+    def unsubscribe(self, subscription):
+        self.broker.unsubscribe(subscription)
+
+    def _start_poller(self):
+        with self._poller_lock:
+            if self._poller is None:
+                self._poller = threading.Thread(target=self._poll_forever, name='event-bus-poller', daemon=True)
+                self._poller.start()
+
+    def poll(self):
+        """Deliver events other processes appended since the last poll."""
+        conn = self._connect()
+        rows = conn.execute(
+            'SELECT id, origin, channel, data FROM events WHERE id > ? ORDER BY id', (self._last_id,)
+        ).fetchall()
+        for event_id, origin, channel, data in rows:
+            self._last_id = event_id
+            if origin != self.origin:
+                self.broker.dispatch(event_id, channel, data)
+        return len(rows)
+
+    def _poll_forever(self):
+        last_trim = 0
+        while True:
+            try:
+                self.poll()
+                if time.time() - last_trim > self.retention:
+                    self._connect().execute('DELETE FROM events WHERE created < ?', (time.time() - self.retention,))
+                    last_trim = time.time()
+            except sqlite3.Error:
+                pass
+            time.sleep(self.poll_interval)
+
+
+EVENT_BUS_BACKENDS = {
+    'memory': MemoryEventBus,
+    'sqlite': SQLiteEventBus,
+}
+
+
+def make_event_bus(backend='memory', **options):
+    try:
+        bus_class = EVENT_BUS_BACKENDS[backend]
+    except KeyError:
+        raise ValueError(f'Unknown event bus backend: {backend}')
+    return bus_class(**options)
@@ -0,0 +1,43 @@
+"""Gunicorn settings for the Flask backend.
+
+Every setting can be overridden from the environment. Each worker process
+gets its own connection pool (see DB_POOL_SIZE / DB_MAX_OVERFLOW in
+config.py), so keep workers * (pool size + overflow) below the database's
+connection limit.
+
+An open /api/events stream holds one of a worker's threads until the
+client disconnects. EVENT_STREAM_LIMIT (config.py, default 2) caps the
+streams per worker below ``threads`` so the other threads stay free for
+normal requests; clients over the cap are told to reconnect a few seconds
+later. To serve many dashboards, give the streams their own pool, whose
+threads spend nearly all their time waiting:
+
+    EVENT_BUS_BACKEND=sqlite EVENT_STREAM_LIMIT=0 gunicorn -c gunicorn.conf.py wsgi:app
+    EVENT_BUS_BACKEND=sqlite GUNICORN_BIND=0.0.0.0:5001 GUNICORN_WORKERS=2 \
+        GUNICORN_THREADS=200 EVENT_STREAM_LIMIT=190 gunicorn -c gunicorn.conf.py wsgi:app
+
+and route /api/events to port 5001 at the proxy. Both pools need the
+sqlite event bus, so writes handled by the first one reach streams held by
+the second.
+"""
+import multiprocessing
+import os
+
+bind = os.environ.get('GUNICORN_BIND', '0.0.0.0:5000')
+
+# Processes scale across cores, threads overlap requests waiting on MySQL
+workers = int(os.environ.get('GUNICORN_WORKERS', multiprocessing.cpu_count() * 2 + 1))
+worker_class = os.environ.get('GUNICORN_WORKER_CLASS', 'gthread')
+threads = int(os.environ.get('GUNICORN_THREADS', 4))
+
+timeout = int(os.environ.get('GUNICORN_TIMEOUT', 60))
+graceful_timeout = int(os.environ.get('GUNICORN_GRACEFUL_TIMEOUT', 30))
+keepalive = int(os.environ.get('GUNICORN_KEEPALIVE', 5))
+
+# Recycle workers now and then to cap slow memory growth
+max_requests = int(os.environ.get('GUNICORN_MAX_REQUESTS', 2000))
+max_requests_jitter = int(os.environ.get('GUNICORN_MAX_REQUESTS_JITTER', 200))
+
+accesslog = os.environ.get('GUNICORN_ACCESSLOG', '-')
+errorlog = os.environ.get('GUNICORN_ERRORLOG', '-')
+loglevel = os.environ.get('GUNICORN_LOGLEVEL', 'info')
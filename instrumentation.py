@@ -0,0 +1,182 @@
+"""Per-request SQL and timing instrumentation.
+
+For every request this records the number of SQL statements, the time
+spent in the database and the time spent serializing JSON. The numbers are
+returned in a ``Server-Timing`` header, logged as one JSON line on the
+``api.requests`` logger and aggregated per route into latency histograms
+for ``/api/_metrics``. Statements slower than ``SLOW_QUERY_MS`` are logged
+with their parameters on the ``api.slow_queries`` logger.
+"""
+import json
+import logging
+import threading
+import time
+from bisect import bisect_left
+
+from flask import current_app, g, has_app_context, has_request_context, request
+from sqlalchemy import event
+from sqlalchemy.engine import Engine
+
+from serializers import FastJSONProvider
+
+request_logger = logging.getLogger('api.requests')
+slow_query_logger = logging.getLogger('api.slow_queries')
+
+# Upper bounds in milliseconds; the last bucket catches everything slower
+LATENCY_BUCKETS_MS = (5, 10, 25, 50, 100, 250, 500, 1000, 2500, 5000)
+
+_stats_lock = threading.Lock()
+
+
+class RouteMetrics:
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._routes = {}
+
+    def record(self, route, duration_ms, queries, db_ms):
+        with self._lock:
+            stats = self._routes.get(route)
+            if stats is None:
+                stats = self._routes[route] = {
+                    'count': 0,
+                    'total_ms': 0.0,
+                    'max_ms': 0.0,
+                    'queries': 0,
+                    'db_ms': 0.0,
+                    'buckets': [0] * (len(LATENCY_BUCKETS_MS) + 1),
+                }
+            stats['count'] += 1
+            stats['total_ms'] += duration_ms
+            stats['max_ms'] = max(stats['max_ms'], duration_ms)
+            stats['queries'] += queries
+            stats['db_ms'] += db_ms
+            stats['buckets'][bisect_left(LATENCY_BUCKETS_MS, duration_ms)] += 1
+
+    def snapshot(self):
+        with self._lock:
+            routes = {route: dict(stats, buckets=list(stats['buckets'])) for route, stats in self._routes.items()}
+
+        report = {}
+        for route, stats in sorted(routes.items()):
+            count = stats['count']
+            report[route] = {
+                'count': count,
+                'avg_ms': round(stats['total_ms'] / count, 3),
+                'max_ms': round(stats['max_ms'], 3),
+                'avg_queries': round(stats['queries'] / count, 2),
+                'avg_db_ms': round(stats['db_ms'] / count, 3),
+                'histogram': {
+                    f'le_{bound}ms' if bound is not None else 'le_inf': bucket
+                    for bound, bucket in zip(LATENCY_BUCKETS_MS + (None,), stats['buckets'])
+                },
+            }
+        return report
+
+    def reset(self):
+        with self._lock:
+            self._routes.clear()
+
+
+class TimedJSONProvider(FastJSONProvider):
+    """JSON provider that adds the time spent encoding to the request stats."""
+
+    def dumps(self, obj, **kwargs):
+        start = time.perf_counter()
+        try:
+            return super().dumps(obj, **kwargs)
+        finally:
+            record_serialization(time.perf_counter() - start)
+
+    def encode(self, obj):
+        start = time.perf_counter()
+        try:
+            return super().encode(obj)
+        finally:
+            record_serialization(time.perf_counter() - start)
+
+
+def record_serialization(seconds):
+    if has_request_context() and 'request_stats' in g:
+        g.request_stats['serialize'] += seconds
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    conn.info.setdefault('query_start_time', []).append(time.perf_counter())
+
+
+def _after_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    elapsed = time.perf_counter() - conn.info['query_start_time'].pop()
+
+    if has_request_context() and 'request_stats' in g:
+        # Concurrent reads report from pool threads into the same request
+        with _stats_lock:
+            g.request_stats['queries'] += 1
+            g.request_stats['db'] += elapsed
+
+    threshold_ms = current_app.config.get('SLOW_QUERY_MS') if has_app_context() else None
+    if threshold_ms is not None and elapsed * 1000 >= threshold_ms:
+        slow_query_logger.warning(json.dumps({
+            'duration_ms': round(elapsed * 1000, 3),
+            'statement': statement,
+            'parameters': repr(parameters)[:2000],
+            'executemany': executemany,
+            'path': request.path if has_request_context() else None,
+        }))
+
+
+def _start_request():
+    g.request_stats = {
+        'start': time.perf_counter(),
+        'queries': 0,
+        'db': 0.0,
+        'serialize': 0.0,
+    }
+
+
+def _finish_request(response):
+    stats = g.pop('request_stats', None)
+    if stats is None:
+        return response
+
+    total_ms = (time.perf_counter() - stats['start']) * 1000
+    db_ms = stats['db'] * 1000
+    serialize_ms = stats['serialize'] * 1000
+    response.headers['Server-Timing'] = ', '.join([
+        f'db;dur={db_ms:.2f};desc="{stats["queries"]} queries"',
+        f'serialize;dur={serialize_ms:.2f}',
+        f'total;dur={total_ms:.2f}',
+    ])
+
+    route = request.url_rule.rule if request.url_rule else '<unmatched>'
+    current_app.extensions['route_metrics'].record(
+        f'{request.method} {route}', total_ms, stats['queries'], db_ms
+    )
+    request_logger.info(json.dumps({
+        'method': request.method,
+        'path': request.path,
+        'route': route,
+        'status': response.status_code,
+        'duration_ms': round(total_ms, 3),
+        'queries': stats['queries'],
+        'db_ms': round(db_ms, 3),
+        'serialize_ms': round(serialize_ms, 3),
+    }))
+    return response
+
+
+_listeners_installed = False
+
+
+def init_app(app):
+    global _listeners_installed
+    app.json = TimedJSONProvider(app)
+    app.extensions['route_metrics'] = RouteMetrics()
+    app.before_request(_start_request)
+    app.after_request(_finish_request)
+
+    # Listen on the Engine class so every engine, including ones created
+    # later by Flask-SQLAlchemy, is covered
+    if not _listeners_installed:
+        event.listen(Engine, 'before_cursor_execute', _before_cursor_execute)
+        event.listen(Engine, 'after_cursor_execute', _after_cursor_execute)
+        _listeners_installed = True
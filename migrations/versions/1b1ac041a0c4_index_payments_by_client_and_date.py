@@ -0,0 +1,30 @@
+"""index payments by client and date
+
+Revision ID: 1b1ac041a0c4
+Revises: b1448bfe979c
+Create Date: 2026-10-18 00:53:33.387944
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '1b1ac041a0c4'
+down_revision = 'b1448bfe979c'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # The composite index covers every lookup the single-column one served,
+    # so build it first and only then drop the old one.
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_client_id_payment_date', ['client_id', 'payment_date', 'id'], unique=False)
+        batch_op.drop_index('ix_payments_client_id')
+
+
+def downgrade():
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_client_id', ['client_id'], unique=False)
+        batch_op.drop_index('ix_payments_client_id_payment_date')
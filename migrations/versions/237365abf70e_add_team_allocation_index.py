@@ -0,0 +1,30 @@
+"""add team allocation index
+
+Revision ID: 237365abf70e
+Revises: 1b1ac041a0c4
+Create Date: 2026-10-18 00:55:13.170352
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '237365abf70e'
+down_revision = '1b1ac041a0c4'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    # Covers the member -> (project, role) lookups, so the single-column index
+    # on team_member_id is no longer needed.
+    with op.batch_alter_table('project_team_members', schema=None) as batch_op:
+        batch_op.create_index('ix_project_team_members_allocation', ['team_member_id', 'project_id', 'role'], unique=False)
+        batch_op.drop_index('ix_project_team_members_team_member_id')
+
+
+def downgrade():
+    with op.batch_alter_table('project_team_members', schema=None) as batch_op:
+        batch_op.create_index('ix_project_team_members_team_member_id', ['team_member_id'], unique=False)
+        batch_op.drop_index('ix_project_team_members_allocation')
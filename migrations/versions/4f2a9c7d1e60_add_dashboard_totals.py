@@ -0,0 +1,36 @@
+"""add dashboard totals
+
+The materialized dashboard row. It is left empty here: "flask init-db"
+and "flask dashboard rebuild" fill it from a full recount.
+
+Revision ID: 4f2a9c7d1e60
+Revises: 5887d3e0e817
+Create Date: 2026-10-18 00:45:48.912734
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '4f2a9c7d1e60'
+down_revision = '5887d3e0e817'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('dashboard_totals',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('total_clients', sa.Integer(), nullable=False),
+    sa.Column('total_team_members', sa.Integer(), nullable=False),
+    sa.Column('total_projects', sa.Integer(), nullable=False),
+    sa.Column('total_payments', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('pending_amount', sa.Float(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+
+
+def downgrade():
+    op.drop_table('dashboard_totals')
@@ -0,0 +1,78 @@
+"""initial schema
+
+Tables as created by db.create_all() before migrations were introduced.
+Databases that were set up that way should be stamped with this revision
+(flask db stamp 5887d3e0e817) and then upgraded.
+
+Revision ID: 5887d3e0e817
+Revises: 
+Create Date: 2026-10-18 00:45:48.176152
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '5887d3e0e817'
+down_revision = None
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('clients',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('contact', sa.String(length=15), nullable=False),
+    sa.Column('address', sa.String(length=255), nullable=True),
+    sa.Column('company', sa.String(length=100), nullable=True),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('team_members',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('job_role', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('contact', sa.String(length=15), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('projects',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('payments',
+    sa.Column('id', sa.Integer(), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Float(), nullable=False),
+    sa.Column('paid_amount', sa.Float(), nullable=False),
+    sa.Column('payment_date', sa.Date(), nullable=False),
+    sa.ForeignKeyConstraint(['client_id'], ['clients.id'], ),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('project_team_members',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('team_member_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=True),
+    sa.ForeignKeyConstraint(['project_id'], ['projects.id'], ),
+    sa.ForeignKeyConstraint(['team_member_id'], ['team_members.id'], ),
+    sa.PrimaryKeyConstraint('project_id', 'team_member_id')
+    )
+
+
+def downgrade():
+    op.drop_table('project_team_members')
+    op.drop_table('payments')
+    op.drop_table('projects')
+    op.drop_table('team_members')
+    op.drop_table('clients')
@@ -0,0 +1,41 @@
+"""add receivable aging report
+
+Revision ID: 6acca9fd9fc9
+Revises: 707d1593da69
+Create Date: 2026-10-18 01:10:07.496899
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '6acca9fd9fc9'
+down_revision = '707d1593da69'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.create_table('receivable_aging',
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('pending_count', sa.Integer(), nullable=False),
+    sa.Column('days_0_30', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('days_31_60', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('days_61_90', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.Column('days_over_90', sa.Numeric(precision=14, scale=2), nullable=False),
+    sa.PrimaryKeyConstraint('client_id', 'project_id')
+    )
+    op.create_table('report_runs',
+    sa.Column('name', sa.String(length=50), nullable=False),
+    sa.Column('last_change_id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('as_of', sa.Date(), nullable=False),
+    sa.Column('finished_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('name')
+    )
+
+
+def downgrade():
+    op.drop_table('report_runs')
+    op.drop_table('receivable_aging')
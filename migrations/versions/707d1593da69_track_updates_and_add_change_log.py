@@ -0,0 +1,51 @@
+"""track updates and add change log
+
+Revision ID: 707d1593da69
+Revises: 3b633d2b0721
+Create Date: 2026-10-18 01:06:03.652842
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '707d1593da69'
+down_revision = '3b633d2b0721'
+branch_labels = None
+depends_on = None
+
+
+TRACKED_TABLES = ('clients', 'team_members', 'projects', 'payments')
+
+
+def upgrade():
+    op.create_table('change_log',
+    sa.Column('id', sa.BigInteger().with_variant(sa.Integer(), 'sqlite'), nullable=False),
+    sa.Column('entity', sa.String(length=20), nullable=False),
+    sa.Column('entity_id', sa.Integer(), nullable=False),
+    sa.Column('op', sa.String(length=10), nullable=False),
+    sa.Column('payload', sa.Text(), nullable=True),
+    sa.Column('changed_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.create_index('ix_change_log_changed_at', ['changed_at'], unique=False)
+
+    # SQLite can't ADD COLUMN with a non-constant default; copy the table there
+    recreate = 'always' if op.get_bind().dialect.name == 'sqlite' else 'auto'
+    for table in TRACKED_TABLES:
+        with op.batch_alter_table(table, schema=None, recreate=recreate) as batch_op:
+            batch_op.add_column(sa.Column('updated_at', sa.DateTime(), nullable=False,
+                                          server_default=sa.func.current_timestamp()))
+
+
+def downgrade():
+    for table in reversed(TRACKED_TABLES):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.drop_column('updated_at')
+
+    with op.batch_alter_table('change_log', schema=None) as batch_op:
+        batch_op.drop_index('ix_change_log_changed_at')
+
+    op.drop_table('change_log')
@@ -0,0 +1,29 @@
+"""store idempotent response headers
+
+Replayed Idempotency-Key responses carry the ETag and Location headers of
+the first attempt.
+
+Revision ID: 8c5e2b7a9f14
+Revises: d322bfbb6329
+Create Date: 2026-10-18 03:12:41.508230
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '8c5e2b7a9f14'
+down_revision = 'd322bfbb6329'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.add_column(sa.Column('response_headers', sa.Text(), nullable=True))
+
+
+def downgrade():
+    with op.batch_alter_table('idempotency_keys', schema=None) as batch_op:
+        batch_op.drop_column('response_headers')
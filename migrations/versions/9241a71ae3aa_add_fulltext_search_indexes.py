@@ -0,0 +1,39 @@
+"""add fulltext search indexes
+
+Revision ID: 9241a71ae3aa
+Revises: 237365abf70e
+Create Date: 2026-10-18 00:57:09.987239
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = '9241a71ae3aa'
+down_revision = '237365abf70e'
+branch_labels = None
+depends_on = None
+
+
+# FULLTEXT indexes backing /api/search. MySQL only: other databases are
+# searched through the application's in-process index.
+FULLTEXT_INDEXES = [
+    ('ft_clients_search', 'clients', ['name', 'company', 'email']),
+    ('ft_projects_search', 'projects', ['name', 'description']),
+    ('ft_team_members_search', 'team_members', ['name', 'job_role']),
+]
+
+
+def upgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for name, table, columns in FULLTEXT_INDEXES:
+        op.create_index(name, table, columns, unique=False, mysql_prefix='FULLTEXT')
+
+
+def downgrade():
+    if op.get_bind().dialect.name != 'mysql':
+        return
+    for name, table, _ in reversed(FULLTEXT_INDEXES):
+        op.drop_index(name, table_name=table)
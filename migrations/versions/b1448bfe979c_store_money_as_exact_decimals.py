@@ -0,0 +1,73 @@
+"""store money as exact decimals
+
+Payment amounts and the dashboard money totals move from FLOAT to
+NUMERIC. Existing amounts are rounded to cents first and the dashboard
+totals are re-summed from the converted payments so they carry no float
+drift.
+
+Revision ID: b1448bfe979c
+Revises: b6ab5d9a2613
+Create Date: 2026-10-18 00:47:08.086462
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b1448bfe979c'
+down_revision = 'b6ab5d9a2613'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    op.execute('UPDATE payments SET total_amount = ROUND(total_amount, 2), paid_amount = ROUND(paid_amount, 2)')
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column('total_amount',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=12, scale=2),
+               existing_nullable=False)
+        batch_op.alter_column('paid_amount',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=12, scale=2),
+               existing_nullable=False)
+
+    with op.batch_alter_table('dashboard_totals', schema=None) as batch_op:
+        batch_op.alter_column('total_amount',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=14, scale=2),
+               existing_nullable=False)
+        batch_op.alter_column('pending_amount',
+               existing_type=sa.Float(),
+               type_=sa.Numeric(precision=14, scale=2),
+               existing_nullable=False)
+
+    op.execute(
+        'UPDATE dashboard_totals SET '
+        'total_amount = (SELECT COALESCE(SUM(total_amount), 0) FROM payments), '
+        'pending_amount = (SELECT COALESCE(SUM(total_amount - paid_amount), 0) FROM payments)'
+    )
+
+
+def downgrade():
+    with op.batch_alter_table('dashboard_totals', schema=None) as batch_op:
+        batch_op.alter_column('pending_amount',
+               existing_type=sa.Numeric(precision=14, scale=2),
+               type_=sa.Float(),
+               existing_nullable=False)
+        batch_op.alter_column('total_amount',
+               existing_type=sa.Numeric(precision=14, scale=2),
+               type_=sa.Float(),
+               existing_nullable=False)
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.alter_column('paid_amount',
+               existing_type=sa.Numeric(precision=12, scale=2),
+               type_=sa.Float(),
+               existing_nullable=False)
+        batch_op.alter_column('total_amount',
+               existing_type=sa.Numeric(precision=12, scale=2),
+               type_=sa.Float(),
+               existing_nullable=False)
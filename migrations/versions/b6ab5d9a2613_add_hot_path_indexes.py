@@ -0,0 +1,64 @@
+"""add hot path indexes
+
+Revision ID: b6ab5d9a2613
+Revises: 4f2a9c7d1e60
+Create Date: 2026-10-18 00:45:49.310507
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'b6ab5d9a2613'
+down_revision = '4f2a9c7d1e60'
+branch_labels = None
+depends_on = None
+
+
+def upgrade():
+    with op.batch_alter_table('clients', schema=None) as batch_op:
+        batch_op.create_index('ix_clients_name', ['name'], unique=False)
+        batch_op.create_index('ix_clients_company', ['company'], unique=False)
+
+    with op.batch_alter_table('team_members', schema=None) as batch_op:
+        batch_op.create_index('ix_team_members_name', ['name'], unique=False)
+        batch_op.create_index('ix_team_members_job_role', ['job_role'], unique=False)
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.create_index('ix_projects_name', ['name'], unique=False)
+        batch_op.create_index('ix_projects_client_id_name', ['client_id', 'name'], unique=False)
+        batch_op.create_index('ix_projects_status', ['status'], unique=False)
+        batch_op.create_index('ix_projects_start_date', ['start_date'], unique=False)
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.create_index('ix_payments_payment_date_id', ['payment_date', 'id'], unique=False)
+        batch_op.create_index('ix_payments_client_id', ['client_id'], unique=False)
+        batch_op.create_index('ix_payments_project_id', ['project_id'], unique=False)
+
+    with op.batch_alter_table('project_team_members', schema=None) as batch_op:
+        batch_op.create_index('ix_project_team_members_team_member_id', ['team_member_id'], unique=False)
+
+
+def downgrade():
+    with op.batch_alter_table('project_team_members', schema=None) as batch_op:
+        batch_op.drop_index('ix_project_team_members_team_member_id')
+
+    with op.batch_alter_table('payments', schema=None) as batch_op:
+        batch_op.drop_index('ix_payments_project_id')
+        batch_op.drop_index('ix_payments_client_id')
+        batch_op.drop_index('ix_payments_payment_date_id')
+
+    with op.batch_alter_table('projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_projects_start_date')
+        batch_op.drop_index('ix_projects_status')
+        batch_op.drop_index('ix_projects_client_id_name')
+        batch_op.drop_index('ix_projects_name')
+
+    with op.batch_alter_table('team_members', schema=None) as batch_op:
+        batch_op.drop_index('ix_team_members_job_role')
+        batch_op.drop_index('ix_team_members_name')
+
+    with op.batch_alter_table('clients', schema=None) as batch_op:
+        batch_op.drop_index('ix_clients_company')
+        batch_op.drop_index('ix_clients_name')
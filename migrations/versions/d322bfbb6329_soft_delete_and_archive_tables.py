@@ -0,0 +1,115 @@
+"""soft delete and archive tables
+
+Revision ID: d322bfbb6329
+Revises: 6acca9fd9fc9
+Create Date: 2026-10-18 01:13:02.570125
+
+"""
+from alembic import op
+import sqlalchemy as sa
+
+
+# revision identifiers, used by Alembic.
+revision = 'd322bfbb6329'
+down_revision = '6acca9fd9fc9'
+branch_labels = None
+depends_on = None
+
+
+# Indexes rebuilt as partial indexes over live rows; MySQL has no partial
+# indexes and keeps the full ones
+LIVE_INDEXES = {
+    'clients': [('ix_clients_name', ['name']), ('ix_clients_company', ['company'])],
+    'projects': [
+        ('ix_projects_name', ['name']),
+        ('ix_projects_client_id_name', ['client_id', 'name']),
+        ('ix_projects_status', ['status']),
+        ('ix_projects_start_date', ['start_date']),
+    ],
+}
+
+
+def has_partial_indexes():
+    return op.get_bind().dialect.name in ('sqlite', 'postgresql')
+
+
+def upgrade():
+    live, deleted = sa.text('deleted_at IS NULL'), sa.text('deleted_at IS NOT NULL')
+    for table, indexes in LIVE_INDEXES.items():
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            batch_op.add_column(sa.Column('deleted_at', sa.DateTime(), nullable=True))
+            batch_op.create_index(f'ix_{table}_deleted_at', ['deleted_at'], unique=False,
+                                  sqlite_where=deleted, postgresql_where=deleted)
+            if has_partial_indexes():
+                for name, columns in indexes:
+                    batch_op.drop_index(name)
+                    batch_op.create_index(name, columns, unique=False, sqlite_where=live, postgresql_where=live)
+
+    op.create_table('archived_clients',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('email', sa.String(length=100), nullable=False),
+    sa.Column('contact', sa.String(length=15), nullable=False),
+    sa.Column('address', sa.String(length=255), nullable=True),
+    sa.Column('company', sa.String(length=100), nullable=True),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    op.create_table('archived_projects',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('name', sa.String(length=100), nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('description', sa.Text(), nullable=True),
+    sa.Column('start_date', sa.Date(), nullable=True),
+    sa.Column('end_date', sa.Date(), nullable=True),
+    sa.Column('status', sa.String(length=50), nullable=False),
+    sa.Column('deleted_at', sa.DateTime(), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_projects', schema=None) as batch_op:
+        batch_op.create_index('ix_archived_projects_client_id', ['client_id'], unique=False)
+
+    op.create_table('archived_payments',
+    sa.Column('id', sa.Integer(), autoincrement=False, nullable=False),
+    sa.Column('client_id', sa.Integer(), nullable=False),
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('total_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('paid_amount', sa.Numeric(precision=12, scale=2), nullable=False),
+    sa.Column('payment_date', sa.Date(), nullable=False),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('id')
+    )
+    with op.batch_alter_table('archived_payments', schema=None) as batch_op:
+        batch_op.create_index('ix_archived_payments_project_id', ['project_id'], unique=False)
+        batch_op.create_index('ix_archived_payments_client_id_payment_date', ['client_id', 'payment_date'], unique=False)
+
+    op.create_table('archived_project_team_members',
+    sa.Column('project_id', sa.Integer(), nullable=False),
+    sa.Column('team_member_id', sa.Integer(), nullable=False),
+    sa.Column('role', sa.String(length=50), nullable=True),
+    sa.Column('archived_at', sa.DateTime(), nullable=False),
+    sa.PrimaryKeyConstraint('project_id', 'team_member_id')
+    )
+
+
+def downgrade():
+    op.drop_table('archived_project_team_members')
+    with op.batch_alter_table('archived_payments', schema=None) as batch_op:
+        batch_op.drop_index('ix_archived_payments_client_id_payment_date')
+        batch_op.drop_index('ix_archived_payments_project_id')
+    op.drop_table('archived_payments')
+    with op.batch_alter_table('archived_projects', schema=None) as batch_op:
+        batch_op.drop_index('ix_archived_projects_client_id')
+    op.drop_table('archived_projects')
+    op.drop_table('archived_clients')
+
+    for table, indexes in reversed(list(LIVE_INDEXES.items())):
+        with op.batch_alter_table(table, schema=None) as batch_op:
+            if has_partial_indexes():
+                for name, columns in indexes:
+                    batch_op.drop_index(name)
+                    batch_op.create_index(name, columns, unique=False)
+            batch_op.drop_index(f'ix_{table}_deleted_at')
+            batch_op.drop_column('deleted_at')
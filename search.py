@@ -0,0 +1,235 @@
+"""In-process inverted index for the search endpoint.
+
+Used when the database has no FULLTEXT support (SQLite, or MySQL with
+``SEARCH_BACKEND=memory``). Documents are small dicts of text fields; each
+field has a weight and every token of a field points back at the document.
+
+Query terms match a token exactly, as a prefix of a longer token, or with one
+edit (insert, delete or substitution). Fuzzy lookups use a deletion
+neighbourhood: every token is also filed under each string obtained by
+deleting one of its characters, so candidates are found with dictionary
+lookups instead of a scan of the vocabulary. Every query term has to match
+for a document to be returned.
+
+The index is built on the first search and kept current by the write
+handlers of the worker process that owns it. Writes made by other worker
+processes are picked up when the index is rebuilt, at most ``max_age``
+seconds later. Rebuilds load into fresh structures without holding the
+lock and run in a background thread; searches keep using the current index
+until the new one is swapped in. Writes made while a rebuild is loading are
+replayed onto the new index before the swap, so none are lost. Only the very
+first build, when there is nothing to serve yet, runs in the searching
+thread.
+"""
+import bisect
+import logging
+import re
+import threading
+import time
+from collections import defaultdict
+
+logger = logging.getLogger('api.search')
+
+TOKEN_RE = re.compile(r'\w+', re.UNICODE)
+
+EXACT_SCORE = 3.0
+PREFIX_SCORE = 2.0
+FUZZY_SCORE = 1.0
+
+# Terms shorter than this are only matched exactly or as a prefix
+FUZZY_MIN_LENGTH = 4
+
+
+def tokenize(text):
+    if not text:
+        return []
+    return TOKEN_RE.findall(str(text).lower())
+
+
+def deletions(token):
+    return {token[:i] + token[i + 1:] for i in range(len(token))}
+
+
+class SearchIndex:
+    def __init__(self, fields, load, max_age=300):
+        """``fields`` maps a document kind to ``{field: weight}`` and ``load``
+        returns an iterable of ``(kind, id, document)`` for a full build."""
+        self.fields = fields
+        self.load = load
+        self.max_age = max_age
+        self._lock = threading.RLock()
+        # Held for the whole of a build, so only one runs at a time
+        self._build_lock = threading.Lock()
+        self._built_at = None
+        # Writes seen while a build is loading, replayed onto its result
+        self._pending = None
+        self._rebuild_thread = None
+        self._clear()
+
+    def _clear(self):
+        self._documents = {}
+        self._postings = defaultdict(dict)
+        self._vocabulary = []
+        self._neighbours = defaultdict(set)
+
+    def reset(self):
+        """Forget everything; the next search rebuilds from ``load``."""
+        with self._lock:
+            self._clear()
+            self._built_at = None
+
+    def ensure_built(self):
+        """Build the index if it has never been built; start a background
+        rebuild if it is older than ``max_age``."""
+        if self._built_at is None:
+            with self._build_lock:
+                if self._built_at is None:
+                    self._rebuild()
+        elif time.monotonic() - self._built_at >= self.max_age:
+            self.refresh()
+
+    def refresh(self):
+        """Rebuild from ``load`` in a background thread, unless a build is
+        already running. Returns the thread, or None."""
+        if not self._build_lock.acquire(blocking=False):
+            return None
+
+        def run():
+            try:
+                self._rebuild()
+            except Exception:
+                # The current index stays in use; the next search retries
+                logger.exception('Search index rebuild failed')
+            finally:
+                self._build_lock.release()
+
+        self._rebuild_thread = threading.Thread(target=run, name='search-index-rebuild', daemon=True)
+        self._rebuild_thread.start()
+        return self._rebuild_thread
+
+    def _rebuild(self):
+        with self._lock:
+            self._pending = []
+        try:
+            fresh = SearchIndex(self.fields, self.load)
+            for kind, doc_id, document in self.load():
+                fresh._add(kind, doc_id, document)
+        except Exception:
+            with self._lock:
+                self._pending = None
+            raise
+
+        with self._lock:
+            for key, document in self._pending:
+                fresh._remove(key)
+                if document is not None:
+                    fresh._add(*key, document)
+            self._documents, self._postings = fresh._documents, fresh._postings
+            self._vocabulary, self._neighbours = fresh._vocabulary, fresh._neighbours
+            self._pending = None
+            self._built_at = time.monotonic()
+
+    @property
+    def built(self):
+        return self._built_at is not None
+
+    def __len__(self):
+        return len(self._documents)
+
+    def put(self, kind, doc_id, document):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(((kind, doc_id), document))
+            if self._built_at is None:
+                return
+            self._remove((kind, doc_id))
+            self._add(kind, doc_id, document)
+
+    def remove(self, kind, doc_id):
+        with self._lock:
+            if self._pending is not None:
+                self._pending.append(((kind, doc_id), None))
+            if self._built_at is not None:
+                self._remove((kind, doc_id))
+
+    def _add(self, kind, doc_id, document):
+        key = (kind, doc_id)
+        weights = defaultdict(float)
+        for field, weight in self.fields[kind].items():
+            for token in tokenize(document.get(field)):
+                weights[token] = max(weights[token], weight)
+
+        self._documents[key] = (document, tuple(weights))
+        for token, weight in weights.items():
+            postings = self._postings[token]
+            if not postings:
+                bisect.insort(self._vocabulary, token)
+                for variant in deletions(token):
+                    self._neighbours[variant].add(token)
+            postings[key] = weight
+
+    def _remove(self, key):
+        entry = self._documents.pop(key, None)
+        if entry is None:
+            return
+        for token in entry[1]:
+            postings = self._postings[token]
+            postings.pop(key, None)
+            if postings:
+                continue
+            del self._postings[token]
+            position = bisect.bisect_left(self._vocabulary, token)
+            del self._vocabulary[position]
+            for variant in deletions(token):
+                tokens = self._neighbours[variant]
+                tokens.discard(token)
+                if not tokens:
+                    del self._neighbours[variant]
+
+    def _term_matches(self, term):
+        """Vocabulary tokens matching ``term`` with the score of the best kind of match."""
+        matches = {}
+        position = bisect.bisect_left(self._vocabulary, term)
+        while position < len(self._vocabulary) and self._vocabulary[position].startswith(term):
+            token = self._vocabulary[position]
+            matches[token] = EXACT_SCORE if token == term else PREFIX_SCORE
+            position += 1
+
+        if len(term) >= FUZZY_MIN_LENGTH:
+            candidates = set(self._neighbours.get(term, ()))
+            for variant in deletions(term):
+                if variant in self._postings:
+                    candidates.add(variant)
+                candidates.update(self._neighbours.get(variant, ()))
+            for token in candidates:
+                matches.setdefault(token, FUZZY_SCORE)
+        return matches
+
+    def search(self, query, kinds=None, limit=20):
+        """Ranked ``(score, kind, id, document)`` tuples matching every term of ``query``."""
+        terms = list(dict.fromkeys(tokenize(query)))
+        if not terms:
+            return []
+
+        self.ensure_built()
+        with self._lock:
+            scores = None
+            for term in terms:
+                term_scores = defaultdict(float)
+                for token, match_score in self._term_matches(term).items():
+                    for key, weight in self._postings[token].items():
+                        score = match_score * weight
+                        if score > term_scores[key]:
+                            term_scores[key] = score
+                if scores is None:
+                    scores = term_scores
+                else:
+                    scores = {key: score + term_scores[key] for key, score in scores.items() if key in term_scores}
+                if not scores:
+                    return []
+
+            if kinds is not None:
+                scores = {key: score for key, score in scores.items() if key[0] in kinds}
+            ranked = sorted(scores.items(), key=lambda item: (-item[1], item[0]))[:limit]
+            return [(score, kind, doc_id, self._documents[(kind, doc_id)][0])
+                    for (kind, doc_id), score in ranked]
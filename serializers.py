@@ -0,0 +1,109 @@
+"""Fast JSON serialization for API responses.
+
+``ModelSerializer`` turns SQLAlchemy ``Row`` tuples straight into dicts
+using a per-field converter list compiled once per field selection, so list
+endpoints never hydrate ORM instances or call ``strftime`` per value.
+
+When orjson is installed it is used for encoding (dates are handled
+natively); otherwise the stdlib encoder is used and dates are converted
+to ISO strings by the row converters instead. Decimals become JSON
+numbers in both cases.
+"""
+import json
+from datetime import date
+from decimal import Decimal
+
+from flask.json.provider import DefaultJSONProvider
+
+try:
+    import orjson
+except ImportError:  # pragma: no cover - depends on the environment
+    orjson = None
+
+ORJSON_OPTIONS = orjson.OPT_NON_STR_KEYS if orjson else 0
+
+
+def _default(value):
+    if isinstance(value, Decimal):
+        return float(value)
+    if isinstance(value, date):
+        return value.isoformat()
+    raise TypeError(f'Object of type {type(value).__name__} is not JSON serializable')
+
+
+def dumps_bytes(obj):
+    if orjson is not None:
+        return orjson.dumps(obj, default=_default, option=ORJSON_OPTIONS)
+    return json.dumps(obj, default=_default, separators=(',', ':')).encode()
+
+
+def dumps(obj):
+    return dumps_bytes(obj).decode()
+
+
+class FastJSONProvider(DefaultJSONProvider):
+    """Flask JSON provider backed by dumps_bytes(); used by jsonify()."""
+
+    sort_keys = False
+
+    def dumps(self, obj, **kwargs):
+        if kwargs:
+            return json.dumps(obj, default=_default, **kwargs)
+        return dumps(obj)
+
+    def encode(self, obj):
+        return dumps_bytes(obj)
+
+    def response(self, *args, **kwargs):
+        obj = self._prepare_response_obj(args, kwargs)
+        return self._app.response_class(self.encode(obj), mimetype=self.mimetype)
+
+
+def _converter_for(column):
+    try:
+        python_type = column.type.python_type
+    except NotImplementedError:
+        return None
+    if issubclass(python_type, Decimal):
+        return float
+    if issubclass(python_type, date) and orjson is None:
+        return date.isoformat
+    return None
+
+
+class ModelSerializer:
+    """Serialize query rows whose columns follow ``columns`` (name -> column)."""
+
+    def __init__(self, columns):
+        self.columns = columns
+        self._compiled = {}
+
+    def for_fields(self, fields):
+        """Return a function mapping a row to a dict of ``fields``.
+
+        The row's leading values must be the selected fields in order; any
+        trailing values (such as extra keyset columns) are ignored.
+        """
+        key = tuple(fields)
+        serialize = self._compiled.get(key)
+        if serialize is None:
+            serialize = self._compiled[key] = self._compile(key)
+        return serialize
+
+    def _compile(self, fields):
+        converters = [
+            (index, converter)
+            for index, converter in enumerate(_converter_for(self.columns[name]) for name in fields)
+            if converter is not None
+        ]
+        if not converters:
+            return lambda row: dict(zip(fields, row))
+
+        def serialize(row):
+            values = list(row[:len(fields)])
+            for index, converter in converters:
+                value = values[index]
+                if value is not None:
+                    values[index] = converter(value)
+            return dict(zip(fields, values))
+        return serialize
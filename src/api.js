@@ -0,0 +1,19 @@
+// The list endpoints (/api/clients, /api/teams, /api/projects, /api/payments)
+// return one page at a time: 100 rows unless ?limit= asks for more (up to
+// 1000), plus a next_cursor while more rows remain. fetchPage loads the page
+// after `cursor` (the first page without one); the list pages keep the
+// returned next_cursor and load the next page only when asked to. A body
+// whose status isn't 'success' is returned as is, so callers keep handling
+// API errors the way they already do.
+export async function fetchPage(url, cursor = null, options = {}) {
+  const pageUrl = new URL(url);
+  if (cursor) {
+    pageUrl.searchParams.set('cursor', cursor);
+  }
+
+  const response = await fetch(pageUrl, options);
+  if (!response.ok) {
+    throw new Error(`HTTP error! Status: ${response.status}`);
+  }
+  return response.json();
+}
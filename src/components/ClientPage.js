@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react'
 import Layout from '../components/Layout'
+import LoadMoreButton from '../components/LoadMoreButton';
+import { fetchPage } from '../api';
 
 import { FaPlus, FaTrash, FaEdit, FaSave, FaTimes } from 'react-icons/fa';
 import { Table, Tooltip } from 'flowbite-react';
@@ -9,7 +11,9 @@ import Swal from 'sweetalert2';
 
 function ClientPage() {
   const [clients, setClients] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
   const [isLoading, setIsLoading] = useState(true);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [error, setError] = useState(null);
 
   //    form state for adding/editing clients
@@ -31,13 +35,18 @@ function ClientPage() {
       fetchClients();
     }, []);
 
-  const fetchClients = async () => {
+  // Without a cursor the first page replaces the table, with one the next
+  // page is appended to it
+  const fetchClients = async (cursor = null) => {
+    if (cursor) {
+      setIsLoadingMore(true);
+    }
     try {
-      const response = await fetch('http://127.0.0.1:5000/api/clients');
-      const data = await response.json();
+      const data = await fetchPage('http://127.0.0.1:5000/api/clients', cursor);
 
       if (data.status === 'success') {
-        setClients(data.clients);
+        setClients((current) => cursor ? [...current, ...data.clients] : data.clients);
+        setNextCursor(data.next_cursor);
         console.log("Fetched clients:", data.clients); // Debug log
       } else {
         throw new Error(data.error || 'Failed to fetch clients')
@@ -51,6 +60,7 @@ function ClientPage() {
       });
     } finally {
       setIsLoading(false)
+      setIsLoadingMore(false);
     }
   };
 
@@ -301,6 +311,7 @@ function ClientPage() {
                         ))}
                       </Table.Body>
                     </Table>
+                    <LoadMoreButton cursor={nextCursor} isLoading={isLoadingMore} onLoadMore={fetchClients} />
                   </div>
                 </div>
               )}
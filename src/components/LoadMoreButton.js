@@ -0,0 +1,22 @@
+import React from 'react';
+
+// Shown under a paged table while the API reports a next_cursor
+function LoadMoreButton({ cursor, isLoading, onLoadMore }) {
+  if (!cursor) {
+    return null;
+  }
+
+  return (
+    <div className="flex justify-center py-3">
+      <button
+        onClick={() => onLoadMore(cursor)}
+        disabled={isLoading}
+        className="bg-gray-100 hover:bg-gray-200 text-gray-700 font-medium py-2 px-4 rounded-lg transition-colors disabled:opacity-50"
+      >
+        {isLoading ? 'Loading...' : 'Load more'}
+      </button>
+    </div>
+  );
+}
+
+export default LoadMoreButton;
@@ -4,9 +4,13 @@ import { FaPlus, FaEdit, FaTrash, FaCalendarAlt, FaMoneyBillWave } from 'react-i
 import { MdPayment, MdAttachMoney } from 'react-icons/md';
 import Swal from 'sweetalert2';
 import Layout from '../components/Layout';
+import LoadMoreButton from '../components/LoadMoreButton';
+import { fetchPage } from '../api';
 
 function PaymentDetailsPage() {
     const [payments, setPayments] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [clients, setClients] = useState([]);
     const [projects, setProjects] = useState([]);
     const [isModalOpen, setIsModalOpen] = useState(false);
@@ -76,24 +80,16 @@ useEffect(() => {
 
    
 
-    // Fetch all payments
-    const fetchPayments = async () => {
-        setIsLoading(true);
+    // Fetch payments newest first. Without a cursor the first page replaces
+    // the table, with one the next page is appended to it
+    const fetchPayments = async (cursor = null) => {
+        if (cursor) {
+            setIsLoadingMore(true);
+        } else {
+            setIsLoading(true);
+        }
         try {
-            const response = await fetch('http://127.0.0.1:5000/api/payments');
-    
-            // Check if response is ok
-            if (!response.ok) {
-                throw new Error(`HTTP error! Status: ${response.status}`);
-            }
-    
-            // Check content type to ensure it's JSON
-            const contentType = response.headers.get('content-type');
-            if (!contentType || !contentType.includes('application/json')) {
-                throw new Error('Response is not JSON');
-            }
-    
-            const paymentData = await response.json();
+            const paymentData = await fetchPage('http://127.0.0.1:5000/api/payments', cursor);
     
             if (paymentData.status === 'success') {
                 // Add debugging to check payment structure
@@ -121,7 +117,8 @@ useEffect(() => {
                 });
                 
                 console.log("Processed payments:", processedPayments);
-                setPayments(processedPayments);
+                setPayments((current) => cursor ? [...current, ...processedPayments] : processedPayments);
+                setNextCursor(paymentData.next_cursor);
             } else {
                 throw new Error(paymentData.error || 'Failed to fetch payments');
             }
@@ -135,6 +132,7 @@ useEffect(() => {
             });
         } finally {
             setIsLoading(false);
+            setIsLoadingMore(false);
         }
     };
 
@@ -636,6 +634,7 @@ const openModal = async (payment = null) => {
                                                 ))}
                                             </Table.Body>
                                         </Table>
+                                        <LoadMoreButton cursor={nextCursor} isLoading={isLoadingMore} onLoadMore={fetchPayments} />
                                     </div>
                                 </div>
                             )}
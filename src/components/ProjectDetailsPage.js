@@ -4,6 +4,8 @@ import { FaPlus, FaEdit, FaTrash, FaSave, FaTimes, FaUserPlus, FaUserMinus,FaFil
 import Swal from 'sweetalert2';
 
 import Layout from '../components/Layout';
+import LoadMoreButton from '../components/LoadMoreButton';
+import { fetchPage } from '../api';
 
 import {jsPDF} from 'jspdf';
 import 'jspdf-autotable';
@@ -12,6 +14,8 @@ import 'jspdf-autotable';
 function ProjectDetailsPage() {
   // State variables
   const [projects, setProjects] = useState([]);
+  const [nextCursor, setNextCursor] = useState(null);
+  const [isLoadingMore, setIsLoadingMore] = useState(false);
   const [clients, setClients] = useState([]);
   const [teamMembers, setTeamMembers] = useState([]);
   const [isLoading, setIsLoading] = useState(true);
@@ -55,27 +59,20 @@ function ProjectDetailsPage() {
     fetchTeamMembers();
   }, []);
 
-  // Fetch projects from API
-  const fetchProjects = async () => {
-    setIsLoading(true);
+  // Fetch projects from API. Without a cursor the first page replaces the
+  // table, with one the next page is appended to it
+  const fetchProjects = async (cursor = null) => {
+    if (cursor) {
+      setIsLoadingMore(true);
+    } else {
+      setIsLoading(true);
+    }
     try {
-      const response = await fetch('http://127.0.0.1:5000/api/projects');
-
-      // Check if response is ok
-      if (!response.ok) {
-        throw new Error(`HTTP error! Status: ${response.status}`);
-      }
-
-      // Check content type to ensure it's JSON
-      const contentType = response.headers.get('content-type');
-      if (!contentType || !contentType.includes('application/json')) {
-        throw new Error('Response is not JSON');
-      }
-
-      const data = await response.json();
+      const data = await fetchPage('http://127.0.0.1:5000/api/projects', cursor);
 
       if (data.status === 'success') {
-        setProjects(data.projects);
+        setProjects((current) => cursor ? [...current, ...data.projects] : data.projects);
+        setNextCursor(data.next_cursor);
       } else {
         throw new Error(data.error || 'Failed to fetch projects');
       }
@@ -88,6 +85,7 @@ function ProjectDetailsPage() {
       });
     } finally {
       setIsLoading(false);
+      setIsLoadingMore(false);
     }
   };
 
@@ -452,74 +450,19 @@ const fetchProjectDetailsForPDF = async (projectId) => {
     
     console.log("Using project from state:", projectFromState);
     
-    // Get payment information for this project
-    let paymentInfo = {
-      total_amount: 0,
-      paid_amount: 0,
-      pending_amount: 0,
-      first_payment_date: null
-    };
-    
-    try {
-      // Use GET method explicitly
-      const paymentResponse = await fetch(`http://127.0.0.1:5000/api/payments`, {
-        method: 'GET',
-        headers: {
-          'Accept': 'application/json'
-        }
-      });
-      
-      if (paymentResponse.ok) {
-        const paymentData = await paymentResponse.json();
-        
-        if (paymentData.status === 'success' && paymentData.payments) {
-          // Filter payments for this project
-          const projectPayments = paymentData.payments.filter(payment => 
-            // Match by project_id if available, otherwise try to match by project_name
-            (payment.project_id && payment.project_id === projectId) || 
-            (payment.project_name && projectFromState.name && 
-             payment.project_name.toLowerCase() === projectFromState.name.toLowerCase())
-          );
-          
-          if (projectPayments.length > 0) {
-            console.log(`Found ${projectPayments.length} payments for this project`);
-            
-            // Calculate totals
-            paymentInfo.total_amount = projectPayments.reduce(
-              (sum, p) => sum + parseFloat(p.total_amount || 0), 0
-            );
-            
-            paymentInfo.paid_amount = projectPayments.reduce(
-              (sum, p) => sum + parseFloat(p.paid_amount || 0), 0
-            );
-            
-            paymentInfo.pending_amount = paymentInfo.total_amount - paymentInfo.paid_amount;
-            
-            // Find earliest payment date
-            const dates = projectPayments
-              .filter(p => p.payment_date)
-              .map(p => new Date(p.payment_date));
-              
-            if (dates.length > 0) {
-              paymentInfo.first_payment_date = new Date(Math.min(...dates))
-                .toISOString().split('T')[0];
-            }
-          } else {
-            console.log("No payments found for this project");
-          }
-        }
-      } else {
-        console.warn(`Failed to fetch payments: ${paymentResponse.status}`);
-      }
-    } catch (paymentErr) {
-      console.warn("Error fetching payment info:", paymentErr);
-      // Continue with default payment values
+    // Payment totals are summed by the server for this project alone
+    const response = await fetch(`http://127.0.0.1:5000/api/projects/${projectId}/export`, {
+      headers: { 'Accept': 'application/json' }
+    });
+    const data = await response.json();
+    if (data.status !== 'success') {
+      throw new Error(data.message || 'Failed to fetch project payments');
     }
-    
+
     // Combine project and payment data
     const projectDetails = {
       ...projectFromState,
-      ...paymentInfo
+      ...data.project
     };
     
     console.log("Combined project data for PDF:", projectDetails);
@@ -840,6 +783,7 @@ const generateProjectPDF = async (project) => {
                           ))}
                         </Table.Body>
                       </Table>
+                      <LoadMoreButton cursor={nextCursor} isLoading={isLoadingMore} onLoadMore={fetchProjects} />
                     </div>
                   </div>
                 )}
@@ -1,5 +1,7 @@
 import React, { useState, useEffect } from 'react'
 import Layout from '../components/Layout'
+import LoadMoreButton from '../components/LoadMoreButton';
+import { fetchPage } from '../api';
 import { FaPlus, FaTrash, FaEdit, FaSave, FaTimes } from 'react-icons/fa';
 import { Table, Tooltip } from 'flowbite-react';
 import { Dialog, DialogContent, DialogTitle } from '@mui/material';
@@ -7,7 +9,9 @@ import Swal from 'sweetalert2';
 
 function TeamMemberPage() {
     const [teamMembers, setTeamMembers] = useState([]);
+    const [nextCursor, setNextCursor] = useState(null);
     const [isLoading, setIsLoading] = useState(true);
+    const [isLoadingMore, setIsLoadingMore] = useState(false);
     const [error, setError] = useState(null);
 
     const [formData, setFormData] = useState({
@@ -25,18 +29,19 @@ function TeamMemberPage() {
         fetchTeamMembers();
     }, []);
 
-    const fetchTeamMembers = async () => {
+    // Without a cursor the first page replaces the table, with one the next
+    // page is appended to it
+    const fetchTeamMembers = async (cursor = null) => {
+        if (cursor) {
+            setIsLoadingMore(true);
+        }
         try {
-            const response = await fetch('http://127.0.0.1:5000/api/teams');
-            
-            if (!response.ok) {
-                throw new Error(`HTTP error! status: ${response.status}`);
-            }
-            
-            const data = await response.json();
+            const data = await fetchPage('http://127.0.0.1:5000/api/teams', cursor);
             
             if (data.status === 'success') {
-                setTeamMembers(data.team_members || []);
+                const page = data.team_members || [];
+                setTeamMembers((current) => cursor ? [...current, ...page] : page);
+                setNextCursor(data.next_cursor);
             } else {
                 // Handle the specific error case we're seeing
                 const errorMessage = data.error === '0' ? 
@@ -64,6 +69,7 @@ function TeamMemberPage() {
             });
         } finally {
             setIsLoading(false);
+            setIsLoadingMore(false);
         }
     };
     const handleInputChange = (e) => {
@@ -296,6 +302,7 @@ function TeamMemberPage() {
                                                 ))}
                                             </Table.Body>
                                         </Table>
+                                        <LoadMoreButton cursor={nextCursor} isLoading={isLoadingMore} onLoadMore={fetchTeamMembers} />
                                     </div>
                                 </div>
                             )}
@@ -0,0 +1,52 @@
+import os
+import sys
+
+import pytest
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from app import create_app, db, rebuild_dashboard_totals  # noqa: E402
+
+
+@pytest.fixture(scope='session')
+def flask_app():
+    return create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite://', 'TESTING': True, 'CHANGE_FEED_SETTLE_SECONDS': 0})
+
+
+@pytest.fixture
+def app(flask_app):
+    with flask_app.app_context():
+        db.create_all()
+        rebuild_dashboard_totals()
+        flask_app.extensions['response_cache'].clear()
+        flask_app.extensions['search_index'].reset()
+        yield flask_app
+        db.session.remove()
+        db.drop_all()
+
+
+@pytest.fixture
+def client(app):
+    return app.test_client()
+
+
+@pytest.fixture
+def count_queries(app):
+    """Return a context manager that collects every SQL statement executed."""
+    from contextlib import contextmanager
+    from sqlalchemy import event
+
+    @contextmanager
+    def counter():
+        statements = []
+
+        def before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+            statements.append(statement)
+
+        event.listen(db.engine, 'before_cursor_execute', before_cursor_execute)
+        try:
+            yield statements
+        finally:
+            event.remove(db.engine, 'before_cursor_execute', before_cursor_execute)
+
+    return counter
@@ -0,0 +1,76 @@
+from types import SimpleNamespace
+
+import pytest
+
+from app import create_app, db, make_read_executor, rebuild_dashboard_totals
+
+
+def test_pool_settings_come_from_config(tmp_path):
+    app = create_app({
+        'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'pool.db'}",
+        'DB_POOL_SIZE': 3,
+        'DB_MAX_OVERFLOW': 2,
+    })
+
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.get('/api/clients')
+        status = client.get('/api/_pool').get_json()['pool']
+        db.engine.dispose()
+
+    assert status['pool_class'] == 'InstrumentedQueuePool'
+    assert (status['size'], status['max_overflow']) == (3, 2)
+    assert status['checkouts'] >= 1
+    assert status['checkout_timeouts'] == 0
+
+
+def test_create_app_does_not_connect():
+    # The database directory doesn't exist, so any connection attempt would fail
+    app = create_app({'SQLALCHEMY_DATABASE_URI': 'sqlite:////nonexistent/dir/projects.db'})
+
+    response = app.test_client().get('/api/_pool')
+
+    assert response.get_json()['pool']['checkouts'] == 0
+
+
+@pytest.mark.parametrize('uri, workers, pooled', [
+    ('sqlite:///projects.db', None, False),
+    ('mysql://root:@localhost/projects', None, True),
+    ('mysql://root:@localhost/projects', 0, False),
+    ('sqlite:///projects.db', 3, True),
+])
+def test_read_pool_is_only_on_by_default_for_database_servers(uri, workers, pooled):
+    app = SimpleNamespace(config={'SQLALCHEMY_DATABASE_URI': uri, 'READ_POOL_WORKERS': workers})
+    executor = make_read_executor(app)
+    assert (executor is not None) == pooled
+    if executor is not None:
+        executor.shutdown()
+
+
+def test_concurrent_reads_use_separate_connections(tmp_path):
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'reads.db'}", 'READ_POOL_WORKERS': 3})
+    assert app.extensions['read_executor'] is not None
+
+    with app.app_context():
+        db.create_all()
+        client = app.test_client()
+        client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+        client.post('/api/projects', json={'name': 'Website', 'client_id': 1})
+        for total in (100, 50):
+            client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': total,
+                                               'paid_amount': 40, 'payment_date': '2024-01-01'})
+        checkouts = app.test_client().get('/api/_pool').get_json()['pool']['checkouts']
+        rebuild_dashboard_totals()
+        dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+        history = client.get('/api/clients/1/payments')
+        assert client.get('/api/clients/2/payments').status_code == 404
+        status = client.get('/api/_pool').get_json()['pool']
+        db.engine.dispose()
+
+    assert (dashboard['totalPayments'], dashboard['totalAmount'], dashboard['pendingAmount']) == (2, 150, 70)
+    assert [p['running_total'] for p in history.get_json()['payments']] == [150.0, 100.0]
+    # reads made from pool threads still count towards the request
+    assert '"3 queries"' in history.headers['Server-Timing']
+    # six dashboard aggregates plus three ledger reads, each on its own checkout
+    assert status['checkouts'] - checkouts >= 9
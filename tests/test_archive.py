@@ -0,0 +1,100 @@
+from datetime import datetime
+
+from app import (db, archived_project_team_members, project_team_members, ArchivedClient, ArchivedPayment,
+                 ArchivedProject, Client, Payment, Project)
+
+
+def seed(client):
+    for name in ('Acme', 'Globex'):
+        client.post('/api/clients', json={'name': name, 'email': 'a@example.com', 'contact': '1'})
+    client.post('/api/teams', json={'name': 'Ann', 'email': 'b@example.com', 'contact': '1', 'job_role': 'Dev'})
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1, 'status': 'Completed',
+                                       'end_date': '2020-06-30', 'team_members': [{'team_member_id': 1}]})
+    client.post('/api/projects', json={'name': 'App', 'client_id': 1})
+    client.post('/api/projects', json={'name': 'Portal', 'client_id': 2, 'team_members': [{'team_member_id': 1}]})
+    for project_id, client_id, paid in [(1, 1, 100), (2, 1, 40), (3, 2, 100)]:
+        client.post('/api/payments', json={'client_id': client_id, 'project_id': project_id, 'total_amount': 100,
+                                           'paid_amount': paid, 'payment_date': '2020-01-01'})
+
+
+def test_deleting_a_client_hides_it_and_its_projects(app, client):
+    seed(client)
+
+    assert client.delete('/api/clients/2').get_json()['status'] == 'success'
+    assert client.delete('/api/clients/2').status_code == 404
+    assert db.session.get(Client, 2).deleted_at is not None
+
+    assert [c['id'] for c in client.get('/api/clients').get_json()['clients']] == [1]
+    assert [c['id'] for c in client.get('/api/clients-dropdown').get_json()['clients']] == [1]
+    assert [p['id'] for p in client.get('/api/projects').get_json()['projects']] == [1, 2]
+    assert client.get('/api/projects-by-client/2').get_json()['projects'] == []
+    assert client.get('/api/clients/2/payments').status_code == 404
+    assert client.patch('/api/projects/3', json={'name': 'Renamed'}).status_code == 404
+    assert client.put('/api/clients/2', json={'name': 'Globex', 'email': 'g@example.com',
+                                              'contact': '2'}).status_code == 404
+    summary = client.get('/api/teams/1/summary').get_json()['team_member']
+    assert [p['id'] for p in summary['projects']] == [1]
+
+    # Payments are financial records and stay until they are archived
+    assert len(client.get('/api/payments').get_json()['payments']) == 3
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert (dashboard['totalClients'], dashboard['totalProjects'], dashboard['totalPayments']) == (1, 2, 3)
+    assert app.test_cli_runner().invoke(args=['dashboard', 'verify']).exit_code == 0
+
+
+def test_payments_of_deleted_projects_stay_visible(app, client):
+    from app import refresh_receivable_aging
+
+    seed(client)
+    client.delete('/api/projects/2')
+    assert [p['id'] for p in client.get('/api/projects').get_json()['projects']] == [1, 3]
+
+    # The money is still owed, so every payment view keeps it
+    assert [p['project_id'] for p in client.get('/api/payments').get_json()['payments']] == [3, 2, 1]
+    report = client.get('/api/reports/payments?group_by=project').get_json()['report']
+    assert {row['project_id']: row['pending_amount'] for row in report} == {1: 0.0, 2: 60.0, 3: 0.0}
+    refresh_receivable_aging(full=True)
+    aging = client.get('/api/reports/aging').get_json()
+    assert [row['project_id'] for row in aging['aging']] == [2]
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert (dashboard['totalProjects'], dashboard['totalPayments'], dashboard['pendingAmount']) == (2, 3, 60)
+    assert app.test_cli_runner().invoke(args=['dashboard', 'verify']).exit_code == 0
+
+
+def test_archive_moves_old_projects_with_their_payments(app, client):
+    seed(client)
+    # Old and completed, but still owed money
+    client.post('/api/projects', json={'name': 'Intranet', 'client_id': 1, 'status': 'Completed',
+                                       'end_date': '2020-06-30'})
+    client.post('/api/payments', json={'client_id': 1, 'project_id': 4, 'total_amount': 100,
+                                       'paid_amount': 100, 'payment_date': '2020-01-01'})
+    client.post('/api/payments', json={'client_id': 1, 'project_id': 4, 'total_amount': 100,
+                                       'paid_amount': 90, 'payment_date': '2020-02-01'})
+    client.delete('/api/clients/2')
+    Client.query.filter_by(id=2).update({'deleted_at': datetime(2020, 1, 1)})
+    Project.query.filter_by(id=3).update({'deleted_at': datetime(2020, 1, 1)})
+    db.session.commit()
+    cursor = client.get('/api/changes').get_json()['next_cursor']
+    assert client.get('/api/search?q=website').get_json()['results'][0]['id'] == 1
+
+    result = app.test_cli_runner().invoke(args=['archive', 'run', '--batch-size', '1'])
+    assert result.exit_code == 0, result.output
+    assert 'Archived 2 project(s), 2 payment(s) and 1 client(s).' in result.output
+
+    assert [p.id for p in Project.query.all()] == [2, 4]
+    assert [p.project_id for p in Payment.query.all()] == [2, 4, 4]
+    assert [c.id for c in Client.query.all()] == [1]
+    assert sorted(p.id for p in ArchivedProject.query.all()) == [1, 3]
+    assert sorted(p.project_id for p in ArchivedPayment.query.all()) == [1, 3]
+    assert ArchivedClient.query.one().name == 'Globex'
+    assert client.get('/api/search?q=website').get_json()['results'] == []
+    assert db.session.query(project_team_members).count() == 0
+    assert sorted(db.session.query(archived_project_team_members.c.project_id).all()) == [(1,), (3,)]
+
+    changes = client.get(f'/api/changes?since={cursor}').get_json()['changes']
+    assert changes['payments']['deleted'] == [1, 3]
+    assert changes['projects']['deleted'] == [1]
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert (dashboard['totalClients'], dashboard['totalProjects'], dashboard['totalPayments']) == (1, 2, 3)
+    assert dashboard['pendingAmount'] == 70
+    assert app.test_cli_runner().invoke(args=['dashboard', 'verify']).exit_code == 0
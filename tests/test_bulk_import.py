@@ -0,0 +1,40 @@
+import io
+
+from app import db, Client, Payment
+
+
+def test_bulk_payments_report_row_errors(client):
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1})
+
+    rows = [
+        {'client_id': 1, 'project_id': 1, 'total_amount': 100, 'paid_amount': 40, 'payment_date': '2024-01-01'},
+        {'client_id': 1, 'project_id': 9, 'total_amount': 100, 'payment_date': '2024-01-01'},
+        {'client_id': 1, 'project_id': 1, 'total_amount': 'lots', 'payment_date': '01/01/2024'},
+        {'client_id': 1, 'project_id': 1, 'total_amount': 50, 'payment_date': '2024-02-01'},
+    ]
+    data = client.post('/api/payments/bulk', json=rows).get_json()
+
+    assert data['inserted'] == 2
+    assert data['errors'] == [
+        {'row': 1, 'errors': {'project_id': 'project does not exist'}},
+        {'row': 2, 'errors': {'total_amount': 'must be a number',
+                              'payment_date': 'must be a date in YYYY-MM-DD format'}},
+    ]
+    assert db.session.query(Payment).count() == 2
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert (dashboard['totalPayments'], dashboard['pendingAmount']) == (2, 110)
+
+
+def test_bulk_clients_from_csv(client):
+    upload = io.BytesIO(b'name,email,contact,company\nAcme,a@example.com,1,\nBeta,b@example.com,2,Beta Ltd\n')
+
+    data = client.post('/api/clients/bulk', data={'file': (upload, 'clients.csv')},
+                       content_type='multipart/form-data').get_json()
+
+    assert (data['inserted'], data['failed']) == (2, 0)
+    assert [c.company for c in db.session.query(Client).order_by(Client.id)] == [None, 'Beta Ltd']
+
+
+def test_bulk_rejects_non_array_payload(client):
+    assert client.post('/api/teams/bulk', json={'name': 'Ann'}).status_code == 400
@@ -0,0 +1,87 @@
+import json
+from datetime import datetime, timedelta
+
+from app import db, encode_cursor, ChangeLog
+
+
+def changes(client, cursor, **params):
+    query = ''.join(f'&{key}={value}' for key, value in params.items())
+    return client.get(f'/api/changes?since={cursor}{query}').get_json()
+
+
+def test_change_feed_returns_only_rows_changed_since_cursor(client):
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+    client.post('/api/clients', json={'name': 'Globex', 'email': 'g@example.com', 'contact': '2'})
+    cursor = client.get('/api/changes').get_json()['next_cursor']
+
+    client.patch('/api/clients/1', json={'company': 'Acme Ltd'})
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1})
+    client.put('/api/projects/1/team', json={'team_members': []})
+    client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': 10,
+                                       'paid_amount': 0, 'payment_date': '2024-01-01'})
+    client.delete('/api/payments/1')
+
+    data = changes(client, cursor)
+    assert set(data['changes']) == {'clients', 'projects', 'payments'}
+    assert [c['company'] for c in data['changes']['clients']['upserted']] == ['Acme Ltd']
+    project = data['changes']['projects']['upserted'][0]
+    assert (project['client_name'], project['team_members']) == ('Acme', [])
+    assert data['changes']['payments'] == {'upserted': [], 'deleted': [1]}
+    assert data['has_more'] is False
+
+    assert changes(client, data['next_cursor'])['changes'] == {}
+
+    tombstone = db.session.query(ChangeLog).filter_by(op='delete').one()
+    assert json.loads(tombstone.payload) == {'client_id': 1, 'project_id': 1}
+
+
+def test_change_feed_pages_and_bulk_inserts(client):
+    cursor = client.get('/api/changes').get_json()['next_cursor']
+    client.post('/api/teams/bulk', json=[
+        {'name': f'Member {i}', 'job_role': 'Dev', 'email': f'm{i}@example.com', 'contact': '1'} for i in range(5)
+    ])
+
+    first = changes(client, cursor, limit=3)
+    assert [m['id'] for m in first['changes']['team_members']['upserted']] == [1, 2, 3]
+    assert first['has_more'] is True
+    rest = changes(client, first['next_cursor'], limit=3)
+    assert [m['id'] for m in rest['changes']['team_members']['upserted']] == [4, 5]
+
+
+def test_purged_cursor_gets_410(app, client):
+    for name in ('A', 'B', 'C'):
+        client.post('/api/clients', json={'name': name, 'email': 'x@example.com', 'contact': '1'})
+    db.session.query(ChangeLog).update({'changed_at': datetime.utcnow() - timedelta(days=60)})
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['changes', 'purge'])
+    assert 'Deleted 2 change log entries.' in result.output
+
+    assert client.get(f'/api/changes?since={encode_cursor([0])}').status_code == 410
+    assert changes(client, encode_cursor([2]))['changes']['clients']['upserted'][0]['name'] == 'C'
+    assert client.get('/api/changes?since=nonsense').status_code == 400
+
+
+def test_change_feed_logs_rows_showing_renamed_or_removed_records(client):
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+    client.post('/api/teams', json={'name': 'Ann', 'email': 'b@example.com', 'contact': '1', 'job_role': 'Dev'})
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1, 'team_members': [{'team_member_id': 1}]})
+    client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': 10,
+                                       'paid_amount': 0, 'payment_date': '2024-01-01'})
+    cursor = client.get('/api/changes').get_json()['next_cursor']
+
+    client.delete('/api/teams/1')
+    client.patch('/api/clients/1', json={'name': 'Acme Corp'})
+    data = changes(client, cursor)
+    assert set(data['changes']) == {'clients', 'team_members', 'projects', 'payments'}
+    project = data['changes']['projects']['upserted'][0]
+    assert (project['client_name'], project['team_members']) == ('Acme Corp', [])
+    assert data['changes']['payments']['upserted'][0]['client_name'] == 'Acme Corp'
+
+    client.put('/api/projects/1', json={'name': 'Portal', 'client_id': 1})
+    data = changes(client, data['next_cursor'])
+    assert data['changes']['payments']['upserted'][0]['project_name'] == 'Portal'
+
+    # Changes nobody else shows don't touch the dependent rows
+    client.patch('/api/clients/1', json={'company': 'Acme Ltd'})
+    assert set(changes(client, data['next_cursor'])['changes']) == {'clients'}
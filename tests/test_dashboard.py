@@ -0,0 +1,65 @@
+from app import db, DashboardTotals
+
+
+def create_payment(client, total, paid):
+    return client.post('/api/payments', json={
+        'client_id': 1, 'project_id': 1, 'total_amount': total,
+        'paid_amount': paid, 'payment_date': '2024-01-01'
+    }).get_json()
+
+
+def seed(client):
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+    client.post('/api/teams', json={'name': 'Ann', 'email': 'b@example.com', 'contact': '1', 'job_role': 'Dev'})
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1})
+
+
+def test_write_handlers_keep_totals_current(client):
+    seed(client)
+    payment_id = create_payment(client, 100, 40)['payment_id']
+    create_payment(client, 50, 50)
+    client.put(f'/api/payments/{payment_id}', json={
+        'client_id': 1, 'project_id': 1, 'total_amount': 120,
+        'paid_amount': 100, 'payment_date': '2024-01-02'
+    })
+
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert dashboard == {
+        'totalClients': 1, 'totalTeamMembers': 1, 'totalProjects': 1,
+        'totalPayments': 2, 'totalAmount': 170, 'pendingAmount': 20
+    }
+
+    client.delete(f'/api/payments/{payment_id}')
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert (dashboard['totalPayments'], dashboard['totalAmount'], dashboard['pendingAmount']) == (1, 50, 0)
+
+
+def test_verify_reports_drift_and_rebuild_fixes_it(app, client):
+    seed(client)
+    runner = app.test_cli_runner()
+    assert runner.invoke(args=['dashboard', 'verify']).exit_code == 0
+
+    db.session.get(DashboardTotals, 1).total_clients = 7
+    db.session.commit()
+    result = runner.invoke(args=['dashboard', 'verify'])
+    assert result.exit_code != 0
+    assert 'total_clients: stored 7, actual 1' in result.output
+
+    assert runner.invoke(args=['dashboard', 'rebuild']).exit_code == 0
+    assert runner.invoke(args=['dashboard', 'verify']).exit_code == 0
+
+
+def test_dashboard_is_never_built_by_a_request(app, client):
+    db.session.query(DashboardTotals).delete()
+    db.session.commit()
+    seed(client)
+    create_payment(client, 100, 40)
+    client.patch('/api/payments/1', json={'paid_amount': 60})
+
+    response = client.get('/api/dashboard-data')
+    assert response.status_code == 503
+    assert db.session.get(DashboardTotals, 1) is None
+
+    assert app.test_cli_runner().invoke(args=['dashboard', 'rebuild']).exit_code == 0
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert (dashboard['totalPayments'], dashboard['pendingAmount']) == (1, 40)
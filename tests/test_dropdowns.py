@@ -0,0 +1,26 @@
+def test_dropdown_etag_and_invalidation(client):
+    client.post('/api/clients', json={'name': 'Beta', 'email': 'b@example.com', 'contact': '1'})
+
+    first = client.get('/api/clients-dropdown')
+    assert first.get_json()['clients'] == [{'id': 1, 'name': 'Beta'}]
+    etag = first.headers['ETag']
+
+    cached = client.get('/api/clients-dropdown', headers={'If-None-Match': etag})
+    assert cached.status_code == 304
+
+    client.post('/api/clients', json={'name': 'Alpha', 'email': 'a@example.com', 'contact': '1'})
+    fresh = client.get('/api/clients-dropdown', headers={'If-None-Match': etag})
+    assert fresh.status_code == 200
+    assert [c['name'] for c in fresh.get_json()['clients']] == ['Alpha', 'Beta']
+
+
+def test_sqlite_cache_is_shared_between_instances(tmp_path):
+    from cache import SQLiteCache
+
+    path = str(tmp_path / 'cache.sqlite3')
+    writer, reader = SQLiteCache(path), SQLiteCache(path)
+    writer.set('clients', {'etag': 'abc', 'body': '{}'})
+    assert reader.get('clients') == {'etag': 'abc', 'body': '{}'}
+
+    reader.delete('clients')
+    assert writer.get('clients') is None
@@ -0,0 +1,108 @@
+import json
+
+from events import EventBroker, SQLiteEventBus
+
+
+def read_event(chunks):
+    """Next SSE message from a streamed response, skipping comments."""
+    for chunk in chunks:
+        text = chunk.decode() if isinstance(chunk, bytes) else chunk
+        if text.startswith(':'):
+            continue
+        fields = dict(line.split(': ', 1) for line in text.strip().split('\n'))
+        return fields['event'], json.loads(fields['data'])
+
+
+def test_broker_drops_oldest_events_for_slow_subscribers():
+    broker = EventBroker(max_queue=2)
+    subscription = broker.subscribe(['payments'])
+    for event_id in range(1, 5):
+        broker.dispatch(event_id, 'payments', '{}')
+    broker.dispatch(5, 'dashboard', '{}')
+
+    assert subscription.take_dropped() == 2
+    assert [subscription.get(0)[0], subscription.get(0)[0]] == [3, 4]
+    assert subscription.get(0) is None
+
+    broker.unsubscribe(subscription)
+    assert len(broker) == 0
+
+
+def test_sqlite_bus_fans_out_between_processes(tmp_path):
+    path = str(tmp_path / 'events.sqlite3')
+    publisher, listener = SQLiteEventBus(path), SQLiteEventBus(path)
+    local = publisher.broker.subscribe(['dashboard'])
+    remote = listener.broker.subscribe(['dashboard'])
+
+    publisher.publish('dashboard', {'deltas': {'totalClients': 1}})
+    assert json.loads(local.get(0)[2]) == {'deltas': {'totalClients': 1}}
+    assert remote.get(0) is None
+
+    listener.poll()
+    assert json.loads(remote.get(0)[2]) == {'deltas': {'totalClients': 1}}
+    # A bus doesn't deliver its own events twice
+    publisher.poll()
+    assert local.get(0) is None
+
+
+def test_event_stream_pushes_committed_payment_writes(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'EVENT_STREAM_HEARTBEAT', 0.01)
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1})
+
+    response = client.get('/api/events?channels=dashboard,payments', buffered=False)
+    assert response.mimetype == 'text/event-stream'
+    chunks = iter(response.response)
+    assert next(chunks).startswith(b': connected')
+    assert read_event(chunks) == ('dashboard', {'totals': {
+        'totalClients': 1, 'totalTeamMembers': 0, 'totalProjects': 1,
+        'totalAmount': 0.0, 'pendingAmount': 0.0, 'totalPayments': 0
+    }})
+
+    client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': 100,
+                                       'paid_amount': 40, 'payment_date': '2024-01-01'})
+    assert read_event(chunks) == ('dashboard', {'deltas': {
+        'totalPayments': 1, 'totalAmount': 100.0, 'pendingAmount': 60.0
+    }})
+    assert read_event(chunks) == ('payments', {
+        'op': 'created', 'id': 1, 'client_id': 1, 'project_id': 1,
+        'total_amount': 100.0, 'paid_amount': 40.0, 'payment_date': '2024-01-01'
+    })
+
+    client.patch('/api/payments/1', json={'paid_amount': 100})
+    assert read_event(chunks) == ('dashboard', {'totals': {
+        'totalClients': 1, 'totalTeamMembers': 0, 'totalProjects': 1,
+        'totalAmount': 100.0, 'pendingAmount': 0.0, 'totalPayments': 1
+    }})
+    assert read_event(chunks) == ('payments', {'op': 'patched', 'id': 1, 'paid_amount': 100.0})
+
+    client.delete('/api/payments/1')
+    read_event(chunks)
+    assert read_event(chunks) == ('payments', {'op': 'deleted', 'id': 1, 'client_id': 1, 'project_id': 1})
+
+    response.close()
+    assert len(app.extensions['event_bus'].broker) == 0
+
+
+def test_event_stream_rejects_unknown_channels(client):
+    response = client.get('/api/events?channels=clients')
+    assert response.status_code == 400
+
+
+def test_reconnecting_clients_are_told_to_refetch(client):
+    response = client.get('/api/events?channels=payments', headers={'Last-Event-ID': '7'}, buffered=False)
+    chunks = iter(response.response)
+    next(chunks)
+    assert read_event(chunks) == ('overflow', {'reconnected': True})
+    response.close()
+
+
+def test_event_streams_per_worker_are_capped(app, client, monkeypatch):
+    monkeypatch.setitem(app.config, 'EVENT_STREAM_LIMIT', 1)
+    first = client.get('/api/events?channels=payments', buffered=False)
+
+    second = client.get('/api/events?channels=payments')
+    assert second.get_data(as_text=True) == ': too many open streams\nretry: 5000\n\n'
+
+    first.close()
+    assert len(app.extensions['event_bus'].broker) == 0
@@ -0,0 +1,105 @@
+import pytest
+from sqlalchemy import inspect, text
+
+from app import db, Client, TeamMember, Project, Payment, project_team_members
+
+
+def query_plan(statement):
+    sql = str(statement.compile(db.engine, compile_kwargs={'literal_binds': True}))
+    rows = db.session.execute(text(f'EXPLAIN QUERY PLAN {sql}')).all()
+    return ' | '.join(row[-1] for row in rows)
+
+
+@pytest.mark.parametrize('statement, index', [
+    (db.select(Payment.id).order_by(Payment.payment_date.desc(), Payment.id.desc()).limit(100),
+     'ix_payments_payment_date_id'),
+    (db.select(Project.id, Project.name).where(Project.client_id == 1, Project.deleted_at.is_(None))
+     .order_by(Project.name), 'ix_projects_client_id_name'),
+    (db.select(Payment.id).where(Payment.client_id == 1).order_by(Payment.payment_date, Payment.id),
+     'ix_payments_client_id_payment_date'),
+    (db.select(project_team_members.c.project_id, project_team_members.c.role)
+     .where(project_team_members.c.team_member_id == 1), 'COVERING INDEX ix_project_team_members_allocation'),
+    (db.select(Project.id).where(Project.status == 'Completed', Project.deleted_at.is_(None)), 'ix_projects_status'),
+    (db.select(Client.id, Client.name).where(Client.deleted_at.is_(None)).order_by(Client.name), 'ix_clients_name'),
+    (db.select(TeamMember.id, TeamMember.name).order_by(TeamMember.name), 'ix_team_members_name'),
+    (db.select(Project.id, Project.name).where(Project.deleted_at.is_(None)).order_by(Project.name),
+     'ix_projects_name'),
+    (db.select(Project.id).where(Project.deleted_at < '2024-01-01').limit(500), 'ix_projects_deleted_at'),
+])
+def test_hot_queries_use_an_index(app, statement, index):
+    plan = query_plan(statement)
+
+    assert index in plan
+    assert 'TEMP B-TREE' not in plan
+
+
+def test_migrations_match_models(app):
+    db.drop_all()
+    result = app.test_cli_runner().invoke(args=['init-db'])
+    assert result.exit_code == 0, result.output
+
+    inspector = inspect(db.engine)
+    for table in db.metadata.sorted_tables:
+        migrated = {index['name'] for index in inspector.get_indexes(table.name)}
+        assert migrated == {index.name for index in table.indexes}, table.name
+
+    db.session.execute(text('DROP TABLE alembic_version'))
+    db.session.commit()
+
+
+def test_create_all_databases_upgrade_from_the_initial_revision(tmp_path):
+    from datetime import date
+
+    import sqlalchemy as sa
+
+    from app import create_app, DashboardTotals
+
+    # The tables exactly as db.create_all() made them before migrations
+    baseline = sa.MetaData()
+    sa.Table('clients', baseline, sa.Column('id', sa.Integer, primary_key=True),
+             sa.Column('name', sa.String(100), nullable=False), sa.Column('email', sa.String(100), nullable=False),
+             sa.Column('contact', sa.String(15), nullable=False), sa.Column('address', sa.String(255)),
+             sa.Column('company', sa.String(100)))
+    sa.Table('team_members', baseline, sa.Column('id', sa.Integer, primary_key=True),
+             sa.Column('name', sa.String(100), nullable=False), sa.Column('job_role', sa.String(100), nullable=False),
+             sa.Column('email', sa.String(100), nullable=False), sa.Column('contact', sa.String(15), nullable=False))
+    sa.Table('projects', baseline, sa.Column('id', sa.Integer, primary_key=True),
+             sa.Column('name', sa.String(100), nullable=False),
+             sa.Column('client_id', sa.Integer, sa.ForeignKey('clients.id'), nullable=False),
+             sa.Column('description', sa.Text), sa.Column('start_date', sa.Date), sa.Column('end_date', sa.Date),
+             sa.Column('status', sa.String(50), nullable=False))
+    sa.Table('payments', baseline, sa.Column('id', sa.Integer, primary_key=True),
+             sa.Column('client_id', sa.Integer, sa.ForeignKey('clients.id'), nullable=False),
+             sa.Column('project_id', sa.Integer, sa.ForeignKey('projects.id'), nullable=False),
+             sa.Column('total_amount', sa.Float, nullable=False), sa.Column('paid_amount', sa.Float, nullable=False),
+             sa.Column('payment_date', sa.Date, nullable=False))
+    sa.Table('project_team_members', baseline,
+             sa.Column('project_id', sa.Integer, sa.ForeignKey('projects.id'), primary_key=True),
+             sa.Column('team_member_id', sa.Integer, sa.ForeignKey('team_members.id'), primary_key=True),
+             sa.Column('role', sa.String(50)))
+
+    app = create_app({'SQLALCHEMY_DATABASE_URI': f"sqlite:///{tmp_path / 'baseline.db'}"})
+    with app.app_context():
+        baseline.create_all(db.engine)
+        with db.engine.begin() as connection:
+            connection.execute(baseline.tables['clients'].insert(),
+                               {'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+            connection.execute(baseline.tables['projects'].insert(),
+                               {'name': 'Website', 'client_id': 1, 'status': 'Ongoing'})
+            connection.execute(baseline.tables['payments'].insert(), {
+                'client_id': 1, 'project_id': 1, 'total_amount': 100.004, 'paid_amount': 40,
+                'payment_date': date(2024, 1, 1)
+            })
+
+        runner = app.test_cli_runner()
+        result = runner.invoke(args=['db', 'stamp', '5887d3e0e817'])
+        assert result.exit_code == 0, result.output
+        result = runner.invoke(args=['init-db'])
+        assert result.exit_code == 0, result.output
+
+        totals = db.session.get(DashboardTotals, 1)
+        assert (totals.total_clients, totals.total_payments, totals.pending_amount) == (1, 1, 60)
+        assert db.session.get(Payment, 1).total_amount == 100
+        assert app.test_client().get('/api/projects').get_json()['projects'][0]['name'] == 'Website'
+        db.session.remove()
+        db.engine.dispose()
@@ -0,0 +1,30 @@
+import json
+import logging
+
+
+def test_server_timing_and_route_metrics(app, client):
+    app.extensions['route_metrics'].reset()
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+
+    response = client.get('/api/projects')
+
+    timing = response.headers['Server-Timing']
+    assert 'db;dur=' in timing and 'queries"' in timing
+    assert 'serialize;dur=' in timing
+
+    routes = client.get('/api/_metrics').get_json()['routes']
+    assert routes['GET /api/projects']['count'] == 1
+    assert routes['GET /api/projects']['avg_queries'] >= 1
+    assert sum(routes['POST /api/clients']['histogram'].values()) == 1
+
+
+def test_slow_queries_are_logged_with_parameters(app, client, caplog):
+    app.config['SLOW_QUERY_MS'] = 0
+    try:
+        with caplog.at_level(logging.WARNING, logger='api.slow_queries'):
+            client.get('/api/payments?client_id=42')
+    finally:
+        app.config['SLOW_QUERY_MS'] = 200
+
+    entries = [json.loads(record.getMessage()) for record in caplog.records if record.name == 'api.slow_queries']
+    assert any('42' in entry['parameters'] and entry['path'] == '/api/payments' for entry in entries)
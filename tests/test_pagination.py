@@ -0,0 +1,90 @@
+import json
+from datetime import date
+
+from app import db, Client, Project, Payment
+
+
+def seed_payments(count):
+    client = Client(name='Acme', email='acme@example.com', contact='1234567890')
+    db.session.add(client)
+    db.session.flush()
+    project = Project(name='Website', client_id=client.id, status='Ongoing')
+    db.session.add(project)
+    db.session.flush()
+    db.session.add_all([
+        Payment(client_id=client.id, project_id=project.id, total_amount=100, paid_amount=40,
+                payment_date=date(2024, 1, 1 + i % 3))
+        for i in range(count)
+    ])
+    db.session.commit()
+    return client, project
+
+
+def test_payments_keyset_pages_cover_every_row_once(client):
+    seed_payments(7)
+
+    seen, cursor = [], None
+    while True:
+        url = '/api/payments?limit=3' + (f'&cursor={cursor}' if cursor else '')
+        data = client.get(url).get_json()
+        seen.extend((p['payment_date'], p['id']) for p in data['payments'])
+        cursor = data['next_cursor']
+        if not cursor:
+            break
+
+    assert len(seen) == 7
+    assert seen == sorted(seen, reverse=True)
+    assert 'total' not in data
+
+
+def test_fields_projection_and_total(client):
+    seed_payments(2)
+
+    data = client.get('/api/payments?fields=id,pending_amount&include_total=1').get_json()
+
+    assert data['total'] == 2
+    assert data['payments'][0] == {'id': data['payments'][0]['id'], 'pending_amount': 60}
+
+
+def test_projects_filters(client):
+    acme, _ = seed_payments(0)
+    other = Client(name='Other', email='other@example.com', contact='1234567890')
+    db.session.add(other)
+    db.session.flush()
+    db.session.add(Project(name='Done', client_id=other.id, status='Completed'))
+    db.session.commit()
+
+    data = client.get('/api/projects?status=Completed&fields=name,client_name').get_json()
+    assert data['projects'] == [{'name': 'Done', 'client_name': 'Other'}]
+
+    data = client.get(f'/api/projects?client_id={acme.id}&fields=name').get_json()
+    assert data['projects'] == [{'name': 'Website'}]
+
+
+def test_invalid_arguments_return_400(client):
+    assert client.get('/api/clients?fields=password').status_code == 400
+    assert client.get('/api/payments?cursor=garbage').status_code == 400
+    assert client.get('/api/payments?date_from=yesterday').status_code == 400
+
+
+def test_payments_export_streams_csv(client):
+    seed_payments(3)
+
+    response = client.get('/api/payments/export?format=csv&fields=id,pending_amount,client_name')
+
+    assert response.is_streamed
+    lines = response.get_data(as_text=True).splitlines()
+    assert lines[0] == 'id,pending_amount,client_name'
+    assert len(lines) == 4
+    assert lines[1].endswith(',60.00,Acme')
+
+
+def test_projects_export_streams_ndjson(client):
+    seed_payments(0)
+
+    response = client.get('/api/projects/export')
+
+    assert response.mimetype == 'application/x-ndjson'
+    rows = [json.loads(line) for line in response.get_data(as_text=True).splitlines()]
+    assert rows[0]['name'] == 'Website'
+    assert rows[0]['client_name'] == 'Acme'
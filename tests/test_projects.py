@@ -0,0 +1,76 @@
+from app import db, Client, TeamMember, Project, project_team_members
+
+
+def seed_projects(count, members_per_project=3):
+    client = Client(name='Acme', email='acme@example.com', contact='1234567890')
+    db.session.add(client)
+    members = [
+        TeamMember(name=f'Member {i}', job_role='Developer', email=f'm{i}@example.com', contact='1234567890')
+        for i in range(members_per_project)
+    ]
+    db.session.add_all(members)
+    db.session.flush()
+
+    for i in range(count):
+        project = Project(name=f'Project {i}', client_id=client.id, status='Ongoing')
+        db.session.add(project)
+        db.session.flush()
+        db.session.execute(project_team_members.insert(), [
+            {'project_id': project.id, 'team_member_id': member.id, 'role': f'Role {j}'}
+            for j, member in enumerate(members)
+        ])
+    db.session.commit()
+    db.session.expunge_all()
+
+
+def test_get_projects_returns_roles(client):
+    seed_projects(2)
+
+    data = client.get('/api/projects').get_json()
+
+    assert data['status'] == 'success'
+    assert len(data['projects']) == 2
+    project = data['projects'][0]
+    assert project['client_name'] == 'Acme'
+    assert [m['role'] for m in project['team_members']] == ['Role 0', 'Role 1', 'Role 2']
+
+
+def test_get_projects_query_count_is_constant(client, count_queries):
+    seed_projects(2)
+    with count_queries() as small:
+        client.get('/api/projects')
+
+    seed_projects(20, members_per_project=5)
+    with count_queries() as large:
+        client.get('/api/projects')
+
+    assert len(large) == len(small)
+
+
+def test_replace_team_diffs_roster_and_keeps_roles(client, count_queries):
+    seed_projects(1, members_per_project=3)
+    client.post('/api/teams', json={'name': 'New', 'email': 'n@example.com', 'contact': '1', 'job_role': 'QA'})
+
+    with count_queries() as statements:
+        data = client.put('/api/projects/1/team', json={'team_members': [
+            {'team_member_id': 1},
+            {'team_member_id': 2, 'role': 'Lead'},
+            {'team_member_id': 4},
+            {'team_member_id': 99},
+        ]}).get_json()
+
+    assert data['unknown_team_member_ids'] == [99]
+    assert [(m['id'], m['role']) for m in data['team_members']] == [(1, 'Role 0'), (2, 'Lead'), (4, 'Member')]
+    writes = [s for s in statements if s.startswith(('INSERT', 'DELETE', 'UPDATE')) and 'project_team_members' in s]
+    assert len(writes) == 2
+
+
+def test_add_project_assigns_team_in_one_commit(client):
+    seed_projects(0, members_per_project=2)
+
+    client.post('/api/projects', json={'name': 'New', 'client_id': 1, 'team_members': [
+        {'team_member_id': 1, 'role': 'Lead'}, {'team_member_id': 2}
+    ]})
+
+    project = client.get('/api/projects').get_json()['projects'][0]
+    assert [(m['id'], m['role']) for m in project['team_members']] == [(1, 'Lead'), (2, 'Member')]
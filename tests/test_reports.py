@@ -0,0 +1,159 @@
+from datetime import date
+
+from test_pagination import seed_payments
+
+from app import db, Project, Payment
+
+
+def test_payment_report_by_month_and_client(client):
+    acme, project = seed_payments(3)
+    db.session.add(Payment(client_id=acme.id, project_id=project.id, total_amount='0.10',
+                           paid_amount='0.20', payment_date=date(2024, 3, 5)))
+    db.session.commit()
+
+    by_month = client.get('/api/reports/payments?group_by=month').get_json()['report']
+    assert by_month == [
+        {'month': '2024-01', 'payment_count': 3, 'total_amount': 300.0, 'paid_amount': 120.0, 'pending_amount': 180.0},
+        {'month': '2024-03', 'payment_count': 1, 'total_amount': 0.1, 'paid_amount': 0.2, 'pending_amount': -0.1},
+    ]
+
+    by_client = client.get('/api/reports/payments?group_by=client&date_to=2024-01-31').get_json()['report']
+    assert by_client == [
+        {'client_id': acme.id, 'client_name': 'Acme', 'payment_count': 3,
+         'total_amount': 300.0, 'paid_amount': 120.0, 'pending_amount': 180.0},
+    ]
+
+
+def test_payment_report_rejects_unknown_grouping(client):
+    assert client.get('/api/reports/payments?group_by=year').status_code == 400
+
+
+def test_project_export_uses_real_payment_columns(client):
+    seed_payments(2)
+
+    data = client.get('/api/projects/1/export').get_json()
+
+    assert data['status'] == 'success'
+    project = data['project']
+    assert (project['client_name'], project['contact_number']) == ('Acme', '1234567890')
+    assert (project['total_amount'], project['paid_amount'], project['pending_amount']) == (200, 80, 120)
+    assert project['first_payment_date'] == '2024-01-01'
+    assert client.get('/api/projects/99/export').status_code == 404
+
+
+def test_invoice_is_cached_until_payments_change(client, count_queries):
+    seed_payments(2)
+
+    first = client.get('/api/projects/1/invoice')
+    assert 'Invoice for Website' in first.get_data(as_text=True)
+
+    with count_queries() as statements:
+        repeat = client.get('/api/projects/1/invoice', headers={'If-None-Match': first.headers['ETag']})
+    assert repeat.status_code == 304
+    assert len(statements) == 1
+
+    client.put('/api/payments/1', json={
+        'client_id': 1, 'project_id': 1, 'total_amount': 500, 'paid_amount': 0, 'payment_date': '2024-01-01'
+    })
+    changed = client.get('/api/projects/1/invoice', headers={'If-None-Match': first.headers['ETag']})
+    assert changed.status_code == 200
+    assert '500.00' in changed.get_data(as_text=True)
+
+
+def test_invoice_changes_when_payment_totals_do_not(client):
+    seed_payments(3)
+    first = client.get('/api/projects/1/invoice')
+
+    # Same count, sums and date range
+    client.patch('/api/payments/2', json={'payment_date': '2024-01-03'})
+    redated = client.get('/api/projects/1/invoice', headers={'If-None-Match': first.headers['ETag']})
+    assert redated.status_code == 200
+
+    client.patch('/api/payments/1', json={'total_amount': 150})
+    client.patch('/api/payments/3', json={'total_amount': 50})
+    swapped = client.get('/api/projects/1/invoice', headers={'If-None-Match': redated.headers['ETag']})
+    assert swapped.status_code == 200
+    assert '150.00' in swapped.get_data(as_text=True)
+
+
+def test_client_payment_history_running_balances(client):
+    acme, website = seed_payments(3)
+    app_project = Project(name='App', client_id=acme.id, status='Ongoing')
+    db.session.add(app_project)
+    db.session.flush()
+    db.session.add(Payment(client_id=acme.id, project_id=app_project.id, total_amount='50.00',
+                           paid_amount='50.00', payment_date=date(2024, 2, 1)))
+    db.session.commit()
+
+    data = client.get(f'/api/clients/{acme.id}/payments?limit=2').get_json()
+    assert [(p['payment_date'], p['project_name']) for p in data['payments']] == [
+        ('2024-02-01', 'App'), ('2024-01-03', 'Website')
+    ]
+    latest = data['payments'][0]
+    assert (latest['running_total'], latest['running_paid'], latest['running_pending']) == (350.0, 170.0, 180.0)
+    assert data['projects'] == [
+        {'project_id': app_project.id, 'project_name': 'App', 'payment_count': 1,
+         'total_amount': 50.0, 'paid_amount': 50.0, 'pending_amount': 0.0},
+        {'project_id': website.id, 'project_name': 'Website', 'payment_count': 3,
+         'total_amount': 300.0, 'paid_amount': 120.0, 'pending_amount': 180.0},
+    ]
+
+    rest = client.get(f'/api/clients/{acme.id}/payments?cursor={data["next_cursor"]}').get_json()
+    assert [p['running_total'] for p in rest['payments']] == [200.0, 100.0]
+    assert rest['next_cursor'] is None
+    assert 'projects' not in rest
+
+
+def test_client_payment_history_unknown_client(client):
+    assert client.get('/api/clients/999/payments').status_code == 404
+
+
+def aging_rows(client):
+    data = client.get('/api/reports/aging').get_json()
+    return {row['project_id']: row for row in data['aging']}, data
+
+
+def test_aging_report_is_never_built_by_a_request(client, count_queries):
+    with count_queries() as statements:
+        response = client.get('/api/reports/aging')
+    assert response.status_code == 503
+    assert len(statements) == 1
+
+
+def test_aging_report_refreshes_only_changed_pairs(app, client):
+    from app import refresh_receivable_aging
+
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+    for name in ('Website', 'App'):
+        client.post('/api/projects', json={'name': name, 'client_id': 1})
+    for project_id, payment_date in [(1, '2024-03-20'), (1, '2024-01-15'), (2, '2023-11-01')]:
+        client.post('/api/payments', json={'client_id': 1, 'project_id': project_id, 'total_amount': 100,
+                                           'paid_amount': 25, 'payment_date': payment_date})
+
+    assert refresh_receivable_aging(as_of=date(2024, 4, 1))['full'] is True
+    rows, data = aging_rows(client)
+    assert data['as_of'] == '2024-04-01'
+    assert rows[1] == {
+        'client_id': 1, 'client_name': 'Acme', 'project_id': 1, 'project_name': 'Website', 'pending_count': 2,
+        'pending_amount': 150.0, 'days_0_30': 75.0, 'days_31_60': 0.0, 'days_61_90': 75.0, 'days_over_90': 0.0
+    }
+    assert (rows[2]['days_over_90'], data['totals']['pending_amount']) == (75.0, 225.0)
+
+    client.patch('/api/payments/1', json={'paid_amount': 100})
+    client.put('/api/payments/3', json={'client_id': 1, 'project_id': 1, 'total_amount': 100,
+                                        'paid_amount': 25, 'payment_date': '2023-11-01'})
+    result = refresh_receivable_aging(as_of=date(2024, 4, 1))
+    assert (result['full'], result['pairs']) == (False, 2)
+    rows, _ = aging_rows(client)
+    assert list(rows) == [1]
+    assert (rows[1]['pending_count'], rows[1]['days_0_30'], rows[1]['days_over_90']) == (2, 0.0, 75.0)
+
+    # Nothing was written, but the January payment passes 90 days
+    assert refresh_receivable_aging(as_of=date(2024, 4, 20))['pairs'] == 1
+    incremental, _ = aging_rows(client)
+    assert incremental[1]['days_over_90'] == 150.0
+
+    assert app.test_cli_runner().invoke(args=['reports', 'refresh-aging', '--full']).exit_code == 0
+    rebuilt, data = aging_rows(client)
+    assert data['as_of'] == date.today().isoformat()
+    assert rebuilt[1]['pending_amount'] == incremental[1]['pending_amount']
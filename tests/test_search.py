@@ -0,0 +1,101 @@
+import threading
+
+from sqlalchemy.dialects import mysql
+
+from app import fulltext_statement
+from search import SearchIndex
+
+
+def seed_search(client):
+    client.post('/api/clients', json={'name': 'Globex Corporation', 'email': 'info@globex.com',
+                                      'contact': '1', 'company': 'Globex'})
+    client.post('/api/clients', json={'name': 'Initech', 'email': 'hello@initech.com',
+                                      'contact': '2', 'company': 'Initech Software'})
+    client.post('/api/teams', json={'name': 'Grace Hopper', 'email': 'grace@example.com',
+                                    'contact': '3', 'job_role': 'Software Engineer'})
+    client.post('/api/projects', json={'name': 'Globex Portal', 'client_id': 1,
+                                       'description': 'Customer portal rebuild'})
+
+
+def search_results(client, query):
+    return [(r['type'], r['id']) for r in client.get(f'/api/search?{query}').get_json()['results']]
+
+
+def test_search_prefix_fuzzy_and_ranking(client):
+    seed_search(client)
+
+    assert search_results(client, 'q=glob') == [('client', 1), ('project', 1)]
+    assert search_results(client, 'q=softwre') == [('client', 2), ('team_member', 1)]
+    assert search_results(client, 'q=globex portal') == [('project', 1)]
+    assert search_results(client, 'q=glob&type=project') == [('project', 1)]
+    assert search_results(client, 'q=glob&limit=1') == [('client', 1)]
+
+    result = client.get('/api/search?q=grace').get_json()['results'][0]
+    assert (result['name'], result['detail']) == ('Grace Hopper', 'Software Engineer')
+
+
+def test_write_handlers_keep_search_index_current(client):
+    seed_search(client)
+    assert search_results(client, 'q=initech') == [('client', 2)]
+
+    client.put('/api/clients/2', json={'name': 'Umbrella', 'email': 'u@example.com', 'contact': '2'})
+    client.delete('/api/teams/1')
+    assert search_results(client, 'q=initech') == []
+    assert search_results(client, 'q=umbrella') == [('client', 2)]
+    assert search_results(client, 'q=hopper') == []
+
+    client.post('/api/clients/bulk', json=[{'name': 'Hooli', 'email': 'h@example.com', 'contact': '4'}])
+    assert search_results(client, 'q=hooli') == [('client', 3)]
+
+
+def test_search_rejects_bad_arguments(client):
+    assert client.get('/api/search').status_code == 400
+    assert client.get('/api/search?q=x&type=invoice').status_code == 400
+
+
+def test_index_removes_tokens_of_deleted_documents():
+    index = SearchIndex({'doc': {'name': 1.0}}, lambda: [('doc', 1, {'name': 'alpha beta'})])
+    index.ensure_built()
+    index.put('doc', 2, {'name': 'alphabet'})
+    assert [hit[2] for hit in index.search('alpha')] == [1, 2]
+
+    index.remove('doc', 1)
+    assert [hit[2] for hit in index.search('alpha')] == [2]
+    assert index.search('beta') == []
+    assert index._vocabulary == ['alphabet']
+
+
+def test_fulltext_query_uses_boolean_match():
+    statement = fulltext_statement(['glob'], ['client', 'project'], 5)
+    sql = str(statement.compile(dialect=mysql.dialect()))
+
+    assert 'MATCH (clients.name, clients.company, clients.email) AGAINST (%s IN BOOLEAN MODE)' in sql
+    assert 'MATCH (projects.name, projects.description) AGAINST (%s IN BOOLEAN MODE)' in sql
+
+
+def test_index_rebuilds_in_background_and_keeps_concurrent_writes():
+    documents = [('doc', 1, {'name': 'alpha'})]
+    loading, release = threading.Event(), threading.Event()
+
+    def load():
+        rows = list(documents)
+        if index.built:
+            loading.set()
+            release.wait(5)
+        return rows
+
+    index = SearchIndex({'doc': {'name': 1.0}}, load, max_age=0)
+    index.ensure_built()
+    documents.append(('doc', 2, {'name': 'alps'}))
+
+    # The expired index keeps answering while the rebuild loads
+    assert [hit[2] for hit in index.search('alp')] == [1]
+    assert loading.wait(5)
+    index.put('doc', 3, {'name': 'alpine'})
+    index.remove('doc', 1)
+    assert [hit[2] for hit in index.search('alp')] == [3]
+
+    release.set()
+    index._rebuild_thread.join(5)
+    index.max_age = 300
+    assert [hit[2] for hit in index.search('alp')] == [2, 3]
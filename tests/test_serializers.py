@@ -0,0 +1,20 @@
+import json
+from datetime import date
+from decimal import Decimal
+
+import serializers
+from app import PAYMENT_COLUMNS
+
+
+def test_rows_serialize_with_and_without_orjson(monkeypatch):
+    row = (7, Decimal('100.50'), date(2024, 1, 2), 'Acme', 'extra keyset value')
+    fields = ['id', 'total_amount', 'payment_date', 'client_name']
+    expected = {'id': 7, 'total_amount': 100.5, 'payment_date': '2024-01-02', 'client_name': 'Acme'}
+
+    fast = serializers.ModelSerializer(PAYMENT_COLUMNS).for_fields(fields)
+    assert json.loads(serializers.dumps_bytes(fast(row))) == expected
+
+    monkeypatch.setattr(serializers, 'orjson', None)
+    plain = serializers.ModelSerializer(PAYMENT_COLUMNS).for_fields(fields)
+    assert plain(row) == expected
+    assert json.loads(serializers.dumps_bytes(plain(row))) == expected
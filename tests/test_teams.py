@@ -0,0 +1,44 @@
+from datetime import date
+
+from test_projects import seed_projects
+
+from app import db, TeamMember, Project, Payment
+
+
+def test_team_summary_aggregates_projects_and_payments(client):
+    seed_projects(2, members_per_project=2)
+    first = Project.query.order_by(Project.id).first()
+    first.status = 'Completed'
+    db.session.add_all([
+        Payment(client_id=first.client_id, project_id=first.id, total_amount='100.00',
+                paid_amount='60.00', payment_date=date(2024, 1, 1)),
+        Payment(client_id=first.client_id, project_id=first.id, total_amount='50.00',
+                paid_amount='50.00', payment_date=date(2024, 1, 2)),
+        TeamMember(name='Idle', job_role='Designer', email='idle@example.com', contact='1234567890'),
+    ])
+    db.session.commit()
+
+    summary = client.get('/api/teams/1/summary').get_json()['team_member']
+    assert summary['project_count'] == 2
+    assert summary['projects_by_status'] == {'Completed': 1, 'Ongoing': 1}
+    assert (summary['total_amount'], summary['paid_amount'], summary['pending_amount']) == (150.0, 110.0, 40.0)
+    assert [(p['role'], p['payment_count'], p['pending_amount']) for p in summary['projects']] == [
+        ('Role 0', 2, 40.0), ('Role 0', 0, 0.0)
+    ]
+
+    idle = client.get('/api/teams/3/summary').get_json()['team_member']
+    assert (idle['project_count'], idle['projects'], idle['pending_amount']) == (0, [], 0.0)
+
+
+def test_bulk_team_summary_is_one_query(client, count_queries):
+    seed_projects(3, members_per_project=4)
+
+    with count_queries() as queries:
+        data = client.get('/api/teams/summary').get_json()
+    assert len(queries) == 1
+    assert [m['project_count'] for m in data['team_members']] == [3, 3, 3, 3]
+
+    subset = client.get('/api/teams/summary?ids=2,4').get_json()['team_members']
+    assert [m['id'] for m in subset] == [2, 4]
+    assert client.get('/api/teams/summary?ids=a').status_code == 400
+    assert client.get('/api/teams/99/summary').status_code == 404
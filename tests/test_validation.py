@@ -0,0 +1,74 @@
+from datetime import date
+from decimal import Decimal
+
+import pytest
+
+from app import CLIENT_SCHEMA, PAYMENT_SCHEMA, PROJECT_SCHEMA
+
+
+def test_schema_parses_and_defaults_fields():
+    values, errors = PAYMENT_SCHEMA.validate({
+        'client_id': '3', 'project_id': 4, 'total_amount': '10.006', 'payment_date': '2024-02-29', 'extra': 1
+    })
+    assert errors == {}
+    assert values == {'client_id': 3, 'project_id': 4, 'total_amount': Decimal('10.01'),
+                      'paid_amount': Decimal('0.00'), 'payment_date': date(2024, 2, 29)}
+
+    values, errors = PROJECT_SCHEMA.validate({'name': ' Website ', 'client_id': 1, 'start_date': ''})
+    assert (values['name'], values['start_date'], values['status']) == ('Website', None, 'Ongoing')
+
+
+@pytest.mark.parametrize('field, value, message', [
+    ('client_id', 'abc', 'must be an integer'),
+    ('client_id', True, 'must be an integer'),
+    ('client_id', 0, 'must be at least 1'),
+    ('total_amount', 'NaN', 'must be a number'),
+    ('total_amount', -1, 'must not be negative'),
+    ('total_amount', '1e12', 'must be less than 10000000000'),
+    ('payment_date', '2024-02-30', 'must be a date in YYYY-MM-DD format'),
+    ('payment_date', '20240101', 'must be a date in YYYY-MM-DD format'),
+    ('payment_date', 20240101, 'must be a date in YYYY-MM-DD format'),
+])
+def test_schema_reports_invalid_values(field, value, message):
+    body = {'client_id': 1, 'project_id': 1, 'total_amount': 10, 'payment_date': '2024-01-01', field: value}
+    assert PAYMENT_SCHEMA.validate(body)[1] == {field: message}
+
+
+def test_partial_validation_only_checks_present_fields():
+    assert CLIENT_SCHEMA.validate({'company': 'Acme'}, partial=True) == ({'company': 'Acme'}, {})
+    assert CLIENT_SCHEMA.validate({'name': '  ', 'id': 1}, partial=True)[1] == {
+        'name': 'is required', 'id': 'cannot be changed'
+    }
+
+
+def test_invalid_writes_are_rejected_before_any_query(client, count_queries):
+    with count_queries() as statements:
+        response = client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': 'ten'})
+        assert response.status_code == 400
+        assert response.get_json()['errors'] == {
+            'total_amount': 'must be a number', 'payment_date': 'is required'
+        }
+        assert client.post('/api/clients', json={'name': 'Acme'}).status_code == 400
+        assert client.put('/api/projects/1', json={'name': 'Website', 'client_id': 1,
+                                                   'end_date': '31/12/2024'}).status_code == 400
+        assert client.post('/api/teams', data='not json', content_type='application/json').status_code == 400
+    assert statements == []
+
+
+def test_writes_reject_unknown_references(client):
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1'})
+
+    response = client.post('/api/projects', json={'name': 'Website', 'client_id': 2,
+                                                  'team_members': [{'team_member_id': 'x'}]})
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == {'team_members': {'0': {'team_member_id': 'must be an integer'}}}
+
+    response = client.post('/api/projects', json={'name': 'Website', 'client_id': 2})
+    assert response.get_json()['errors'] == {'client_id': 'client does not exist'}
+
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1})
+    response = client.patch('/api/payments/1', json={'project_id': 5})
+    assert response.get_json()['errors'] == {'project_id': 'project does not exist'}
+    response = client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': 10,
+                                                  'payment_date': '2024-01-01'})
+    assert response.get_json()['status'] == 'success'
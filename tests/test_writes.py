@@ -0,0 +1,139 @@
+from datetime import datetime, timedelta
+
+from app import db, IdempotencyKey, Payment
+
+
+def seed(client):
+    client.post('/api/clients', json={'name': 'Acme', 'email': 'a@example.com', 'contact': '1', 'company': 'Acme'})
+    client.post('/api/projects', json={'name': 'Website', 'client_id': 1})
+    client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': 100,
+                                       'paid_amount': 40, 'payment_date': '2024-01-01'})
+
+
+def test_patch_changes_only_given_fields_in_one_update(client, count_queries):
+    seed(client)
+
+    with count_queries() as statements:
+        response = client.patch('/api/clients/1', json={'company': 'Acme Ltd'}, headers={'If-Match': '"1"'})
+    assert response.status_code == 200
+    assert response.headers['ETag'] == '"2"'
+    assert response.get_json()['version'] == 2
+    assert [statement.split(' (')[0].split(' SET')[0] for statement in statements] == [
+        'UPDATE clients', 'INSERT INTO change_log'
+    ]
+
+    listed = client.get('/api/clients').get_json()['clients'][0]
+    assert (listed['name'], listed['company'], listed['version']) == ('Acme', 'Acme Ltd', 2)
+
+
+def test_stale_if_match_is_rejected(client):
+    seed(client)
+    client.patch('/api/projects/1', json={'status': 'Completed'})
+
+    stale = client.patch('/api/projects/1', json={'status': 'On Hold'}, headers={'If-Match': '"1"'})
+    assert stale.status_code == 412
+    assert stale.get_json()['version'] == 2
+    assert client.put('/api/projects/1', json={'name': 'X', 'client_id': 1, 'status': 'Ongoing'},
+                      headers={'If-Match': '"1"'}).status_code == 412
+    assert client.get('/api/projects').get_json()['projects'][0]['status'] == 'Completed'
+
+    put = client.put('/api/projects/1', json={'name': 'Site', 'client_id': 1, 'status': 'Ongoing'},
+                     headers={'If-Match': '"2"'})
+    assert (put.status_code, put.headers['ETag']) == (200, '"3"')
+    assert client.patch('/api/projects/99', json={'status': 'Completed'}).status_code == 404
+
+
+def test_patch_validates_fields(client):
+    seed(client)
+
+    response = client.patch('/api/payments/1', json={'total_amount': 'lots', 'id': 5, 'client_id': None})
+    assert response.status_code == 400
+    assert response.get_json()['errors'] == {
+        'total_amount': 'must be a number', 'id': 'cannot be changed', 'client_id': 'is required'
+    }
+
+
+def test_payment_patch_keeps_dashboard_totals(client, monkeypatch):
+    seed(client)
+    client.patch('/api/payments/1', json={'paid_amount': '90.00'}, headers={'If-Match': '"1"'})
+    assert client.patch('/api/payments/1', json={'total_amount': 500}, headers={'If-Match': '"1"'}).status_code == 412
+
+    # Databases without UPDATE ... RETURNING read the new version back
+    monkeypatch.setattr(db.engine.dialect, 'update_returning', False)
+    response = client.patch('/api/payments/1', json={'total_amount': '120.00'})
+    assert response.get_json()['version'] == 3
+
+    dashboard = client.get('/api/dashboard-data').get_json()['dashboard']
+    assert (dashboard['totalAmount'], dashboard['pendingAmount']) == (120, 30)
+    payment = db.session.get(Payment, 1)
+    assert (payment.total_amount, payment.paid_amount, payment.version) == (120, 90, 3)
+
+
+def test_idempotency_key_replays_instead_of_duplicating(client):
+    seed(client)
+    body = {'client_id': 1, 'project_id': 1, 'total_amount': 10, 'paid_amount': 0, 'payment_date': '2024-02-01'}
+    headers = {'Idempotency-Key': 'pay-123'}
+
+    first = client.post('/api/payments', json=body, headers=headers)
+    retry = client.post('/api/payments', json=body, headers=headers)
+    assert retry.get_json() == first.get_json()
+    assert retry.headers['Idempotent-Replayed'] == 'true'
+    assert db.session.query(Payment).count() == 2
+
+    reused = client.post('/api/payments', json={**body, 'total_amount': 20}, headers=headers)
+    assert reused.status_code == 422
+
+
+def test_idempotent_replay_keeps_etag_and_location(client):
+    seed(client)
+    body = {'client_id': 1, 'project_id': 1, 'total_amount': 10, 'payment_date': '2024-02-01'}
+    headers = {'Idempotency-Key': 'pay-headers'}
+
+    first = client.post('/api/payments', json=body, headers=headers)
+    assert (first.headers['ETag'], first.headers['Location']) == ('"1"', '/api/payments/2')
+    retry = client.post('/api/payments', json=body, headers=headers)
+    assert (retry.headers['ETag'], retry.headers['Location']) == ('"1"', '/api/payments/2')
+
+
+def test_idempotent_write_and_response_commit_together(client, monkeypatch):
+    seed(client)
+    commit = db.session.commit
+    claims_at_commit = []
+
+    # Every commit that carries the key must also carry its response, or a
+    # crash between two commits would leave the key "in progress" for good
+    def checked_commit():
+        claims_at_commit.extend(
+            obj.status_code for obj in db.session.identity_map.values() if isinstance(obj, IdempotencyKey)
+        )
+        commit()
+    monkeypatch.setattr(db.session, 'commit', checked_commit)
+
+    client.post('/api/payments', json={'client_id': 1, 'project_id': 1, 'total_amount': 10,
+                                       'payment_date': '2024-02-01'}, headers={'Idempotency-Key': 'pay-1'})
+    client.post('/api/clients/bulk', json=[{'name': 'B', 'email': 'b@example.com', 'contact': '2'}],
+                headers={'Idempotency-Key': 'bulk-1'})
+    assert claims_at_commit == [200, 200]
+
+
+def test_failed_request_does_not_keep_its_idempotency_key(client):
+    seed(client)
+    headers = {'Idempotency-Key': 'bad-then-good'}
+    body = {'client_id': 1, 'project_id': 1, 'total_amount': 'x', 'payment_date': '2024-02-01'}
+
+    assert client.post('/api/payments', json=body, headers=headers).get_json()['status'] == 'error'
+    assert db.session.get(IdempotencyKey, 'bad-then-good') is None
+
+    good = client.post('/api/payments', json={**body, 'total_amount': 5}, headers={'Idempotency-Key': 'other'})
+    assert good.get_json()['status'] == 'success'
+
+
+def test_purge_idempotency_keys(app, client):
+    seed(client)
+    client.post('/api/clients', json={'name': 'B', 'email': 'b@example.com', 'contact': '2'},
+                headers={'Idempotency-Key': 'old'})
+    db.session.get(IdempotencyKey, 'old').created_at = datetime.utcnow() - timedelta(days=2)
+    db.session.commit()
+
+    result = app.test_cli_runner().invoke(args=['idempotency-keys', 'purge'])
+    assert 'Deleted 1 idempotency key(s).' in result.output